@@ -1,21 +1,4 @@
-from .application import BSPumpApplication
-from .service import BSPumpService
-from .pipeline import Pipeline
-from .pumpbuilder import PumpBuilder
-from .abc.source import Source
-from .abc.source import TriggerSource
-from .abc.sink import Sink
-from .abc.processor import Processor
-from .abc.generator import Generator
-from .abc.connection import Connection
-
-from .exception import ProcessingError
-from .abc.lookup import Lookup
-from .abc.lookup import MappingLookup
-from .abc.lookup import DictionaryLookup
-from .fileloader import load_json_file
-
-from .analyzer.analyzer import Analyzer
+from .lazy import lazy_import
 
 # from .matrix.matrix import Matrix, PersistentMatrix
 # from .matrix.namedmatrix import NamedMatrix, PersistentNamedMatrix
@@ -25,6 +8,32 @@ from .analyzer.analyzer import Analyzer
 
 from .__version__ import __version__, __build__
 
+# Components are imported when they are used for the first time, so `import bspump` is fast
+__getattr__, __dir__ = lazy_import(__name__, {
+	"BSPumpApplication": ".application",
+	"BSPumpService": ".service",
+	"Pipeline": ".pipeline",
+	"PumpBuilder": ".pumpbuilder",
+	"Source": ".abc.source",
+	"TriggerSource": ".abc.source",
+	"Sink": ".abc.sink",
+	"Processor": ".abc.processor",
+	"Generator": ".abc.generator",
+	"Connection": ".abc.connection",
+
+	"Analyzer": ".analyzer.analyzer",
+
+	"Context": ".context",
+	"ProcessingError": ".exception",
+	"FrozenDict": ".frozen",
+	"freeze": ".frozen",
+	"LatencyHistogram": ".histogram",
+	"Lookup": ".abc.lookup",
+	"MappingLookup": ".abc.lookup",
+	"DictionaryLookup": ".abc.lookup",
+	"load_json_file": ".fileloader",
+})
+
 __all__ = (
 	"BSPumpApplication",
 	"BSPumpService",
@@ -39,7 +48,11 @@ __all__ = (
 
 	"Analyzer",
 
+	"Context",
 	"ProcessingError",
+	"FrozenDict",
+	"freeze",
+	"LatencyHistogram",
 	"Lookup",
 	"MappingLookup",
 	"DictionaryLookup",
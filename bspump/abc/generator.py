@@ -1,8 +1,20 @@
+import asyncio
+
 from .processor import ProcessorBase
 
 
 class Generator(ProcessorBase):
 
+	ConfigDefaults = {
+		# Maximum number of events being generated at once by this generator, the pipeline is throttled above
+		# 0 means no limit other than `async_concurency_limit` of the pipeline
+		"concurrency": 0,
+		# Number of long-lived worker tasks that consume incoming events from a queue,
+		# 0 means that a new task is created for each event
+		"workers": 0,
+	}
+
+
 	def __init__(self, app, pipeline, id=None, config=None):
 		"""
 		Description:
@@ -26,6 +38,35 @@ class Generator(ProcessorBase):
 		# The correct depth is later set by the pipeline
 		self.PipelineDepth = None
 
+		self.Concurrency = int(self.Config["concurrency"])
+		self.Workers = int(self.Config["workers"])
+
+		self.InFlight = 0  # Number of events that are queued or being generated
+		self._inflight_peak = 0
+		self._wait_sum = 0.0
+		self._wait_max = 0.0
+		self._wait_count = 0
+		self._queue = None  # The queue of worker tasks, created with the first event
+
+		self.MetricsGauge = pipeline.MetricsService.create_gauge(
+			"bspump.pipeline.generator",
+			tags={
+				'pipeline': pipeline.Id,
+				'generator': self.Id,
+			},
+			init_values={
+				'inflight': 0,
+				'inflight.peak': 0,
+				'wait.avg': 0.0,
+				'wait.max': 0.0,
+			}
+		)
+		app.PubSub.subscribe("Metrics.flush!", self._on_metrics_flush)
+
+		if self.Workers > 0:
+			pipeline.PubSub.subscribe("bspump.pipeline.stop!", self._on_pipeline_stop)
+
+
 	def set_depth(self, depth):
 		"""
 		Description:
@@ -52,9 +93,22 @@ class Generator(ProcessorBase):
 
 
 		"""
-		self.Pipeline.ensure_future(
-			self.generate(context, event, self.PipelineDepth + 1)
-		)
+		self.InFlight += 1
+		if self.InFlight > self._inflight_peak:
+			self._inflight_peak = self.InFlight
+		if self.InFlight == self.Concurrency:
+			self.Pipeline.throttle(self, True)
+
+		if self.Workers > 0:
+			if self._queue is None:
+				self._start_workers()
+			self._queue.put_nowait((context, event, self.Loop.time()))
+
+		else:
+			self.Pipeline.ensure_future(
+				self._generate(context, event, self.PipelineDepth + 1, self.Loop.time())
+			)
+
 		return None
 
 
@@ -74,3 +128,84 @@ class Generator(ProcessorBase):
 
 		"""
 		raise NotImplementedError()
+
+
+	async def _generate(self, context, event, depth, enqueued):
+		self._generation_started(enqueued)
+		try:
+			await self.generate(context, event, depth)
+		finally:
+			self._generation_finished()
+
+
+	def _start_workers(self):
+		self._queue = asyncio.Queue()
+		for _ in range(self.Workers):
+			# Workers are futures of the pipeline, so the pipeline waits for them when it stops
+			self.Pipeline.ensure_future(self._worker(self._queue))
+
+
+	async def _worker(self, queue):
+		depth = self.PipelineDepth + 1
+		while True:
+			item = await queue.get()
+			if item is None:
+				# The pipeline is stopping and all events queued before were generated
+				return
+
+			context, event, enqueued = item
+			self._generation_started(enqueued)
+			try:
+				await self.generate(context, event, depth)
+			except Exception as e:
+				# The worker survives the failed event
+				self.Pipeline.set_error(context, event, e)
+			finally:
+				self._generation_finished()
+
+
+	def _generation_started(self, enqueued):
+		wait = self.Loop.time() - enqueued
+		self._wait_sum += wait
+		self._wait_count += 1
+		if wait > self._wait_max:
+			self._wait_max = wait
+
+
+	def _generation_finished(self):
+		if self.InFlight == self.Concurrency:
+			self.Pipeline.throttle(self, False)
+		self.InFlight -= 1
+
+
+	def _on_pipeline_stop(self, event_name, pipeline):
+		if self._queue is None:
+			return
+
+		for _ in range(self.Workers):
+			self._queue.put_nowait(None)
+
+		# Workers are started again with the next event
+		self._queue = None
+
+
+	def _on_metrics_flush(self, event_type):
+		self.MetricsGauge.set('inflight', self.InFlight)
+		self.MetricsGauge.set('inflight.peak', self._inflight_peak)
+		self.MetricsGauge.set('wait.avg', self._wait_sum / self._wait_count if self._wait_count > 0 else 0.0)
+		self.MetricsGauge.set('wait.max', self._wait_max)
+
+		self._inflight_peak = self.InFlight
+		self._wait_sum = 0.0
+		self._wait_max = 0.0
+		self._wait_count = 0
+
+
+	def rest_get(self):
+		rest = super().rest_get()
+		rest.update({
+			"InFlight": self.InFlight,
+			"Concurrency": self.Concurrency,
+			"Workers": self.Workers,
+		})
+		return rest
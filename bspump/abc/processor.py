@@ -90,6 +90,33 @@ class ProcessorBase(asab.ConfigObject):
 		raise NotImplementedError()
 
 
+	def process_batch(self, context, events):
+		"""
+		Processes a list of events that share the same context.
+		Override this method to implement a vectorized processing of the batch,
+		the default implementation calls `process()` for every event of the batch.
+
+		**Parameters**
+
+		context :
+				Additional information passed to the method, shared by all events of the batch.
+
+		events : list
+				List of events.
+
+		:return: list of events that continue in the :meth:`Pipeline <bspump.Pipeline()>`, consumed events are omitted.
+
+		:note: If the method raises an exception, the whole batch is discarded.
+
+		"""
+		result = []
+		for event in events:
+			event = self.process(context, event)
+			if event is not None:
+				result.append(event)
+		return result
+
+
 	def locate_address(self):
 		"""
 		Returns an ID of a :meth:`processor <bspump.Processor()>` and a :meth:`Pipeline <bspump.Pipeline()>`.
@@ -8,6 +8,10 @@ L = logging.getLogger(__name__)
 
 
 class Source(asab.ConfigObject):
+
+	# True if instances of the source in shard worker processes receive disjoint parts of the input, see `bspump.shard`
+	ShardSplit = False
+
 	def __init__(self, app, pipeline, id=None, config=None):
 		"""
 		Set the initial ID, :meth:`Pipeline <bspump.Pipeline()>` and Task.
@@ -56,6 +60,22 @@ class Source(asab.ConfigObject):
 		await self.Pipeline.process(event, context=context)
 
 
+	async def process_batch(self, events, context=None):
+		"""
+		This method is used to emit a batch of events into a :meth:`Pipeline <bspump.Pipeline()>`.
+
+		**Parameters**
+
+		events : list
+				List of events that share the same context.
+
+		context : default None
+				Additional information.
+
+		"""
+		await self.Pipeline.process_batch(events, context=context)
+
+
 	def start(self, loop):
 		"""
 		Starts the :meth:`Pipeline <bspump.Pipeline()>` through the _main method, but if main method is implemented
@@ -1,4 +1,8 @@
-from .hyperloglog import HyperLogLog
+from ..lazy import lazy_import
+
+__getattr__, __dir__ = lazy_import(__name__, {
+	"HyperLogLog": ".hyperloglog",
+})
 
 __all__ = [
 	"HyperLogLog",
@@ -1,6 +1,17 @@
-import numpy as np
+import struct
 import zlib
 
+import numpy as np
+
+###
+
+MAGIC = b'BSPHLL\x01'
+HEADER = struct.Struct('<7sBI')  # Magic, bits of the hash, number of registers
+
+SEED = np.uint64(0x9E3779B97F4A7C15)
+
+###
+
 
 class HyperLogLog(object):
 	'''
@@ -8,11 +19,16 @@ class HyperLogLog(object):
 		which estimates cardinality of the set with average 2%,
 		described in http://algo.inria.fr/flajolet/Publications/FlFuGaMe07.pdf
 		and https://storage.googleapis.com/pub-tools-public-publication-data/pdf/40671.pdf
+
+		Registers of the sketch are kept in an array provided by the caller, e.g. in a row of a matrix,
+		values are added one by one by `add()` or at once by `add_many()`.
+		Sketches of the same `m` and `num_bits` are merged by `merge()`, e.g. sketches of shards,
+		and stored by `serialize()`, which records both, so sketches of different hashes are never mixed.
 	'''
 
 	alphas = {16: 0.673, 32: 0.697, 64: 0.709}
 
-	def __init__(self, m=2048):
+	def __init__(self, m=2048, num_bits=32):
 
 		'''
 			`m` is number of registers. It is bounded with b, b = log2m. Higher `m` is,
@@ -21,9 +37,15 @@ class HyperLogLog(object):
 			up to 20%.
 			`b` is the number of last bits of the value to take.
 			`alpha` is the parameter from papers above.
+			`num_bits` is the size of the hash, 32 or 64. The 32 bit hash is CRC32, which is the default,
+			so registers filled by previous versions remain valid. The 64 bit hash is vectorized and more precise
+			for large sets, but its registers must not be mixed with registers of the 32 bit hash.
 		'''
 
-		self.num_bits = 32
+		if num_bits not in (32, 64):
+			raise RuntimeError("Incorrect num_bits, it should be 32 or 64")
+
+		self.num_bits = num_bits
 		self.b = int(np.ceil(np.log2(m)))
 		self.max = 2 ** self.num_bits
 		self.m = m
@@ -47,7 +69,19 @@ class HyperLogLog(object):
 		hashed_value = self.hash_data(value)
 		position = self._compute_position(hashed_value)
 		rho = self._compute_rho(hashed_value)
-		array[position] = np.max([array[position], rho])
+		if rho > array[position]:
+			array[position] = rho
+
+
+	def add_many(self, values, array):
+		'''
+			Vectorized `add()`, `values` is a list or a NumPy array of values of the same type.
+		'''
+
+		hashed_values = self.hash_many(values)
+		positions = self._compute_position(hashed_values).astype(np.intp)
+		rhos = self._compute_rhos(hashed_values)
+		np.maximum.at(array, positions, rhos.astype(array.dtype))
 
 
 	def count(self, array):
@@ -60,17 +94,101 @@ class HyperLogLog(object):
 		return int(e)
 
 
+	def merge(self, array, *others):
+		'''
+			Merges registers of `others` into `array`, so it counts the union of all sets.
+			Returns `array`.
+		'''
+
+		for other in others:
+			other = np.asarray(other)
+			if other.shape != array.shape:
+				raise ValueError("Registers of shape {} cannot be merged into {}".format(other.shape, array.shape))
+			np.maximum(array, other.astype(array.dtype, copy=False), out=array)
+
+		return array
+
+
+	def serialize(self, array):
+		'''
+			Returns bytes with registers in `array` and parameters of the sketch.
+		'''
+
+		return HEADER.pack(MAGIC, self.num_bits, self.m) + np.asarray(array, dtype='u1').tobytes()
+
+
+	def deserialize(self, data, array=None):
+		'''
+			Loads registers from `serialize()` output into `array`, a new array is created if `array` is None.
+			Returns the array.
+		'''
+
+		if len(data) < HEADER.size:
+			raise ValueError("Data is not a HyperLogLog sketch")
+
+		magic, num_bits, m = HEADER.unpack_from(data)
+		if magic != MAGIC:
+			raise ValueError("Data is not a HyperLogLog sketch")
+
+		if num_bits != self.num_bits or m != self.m:
+			raise ValueError("Sketch with {} registers and {} bit hash does not match {} registers and {} bit hash".format(
+				m, num_bits, self.m, self.num_bits
+			))
+
+		registers = np.frombuffer(data, dtype='u1', count=m, offset=HEADER.size)
+		if array is None:
+			return registers.copy()
+
+		array[:] = registers
+		return array
+
+
 	def hash_data(self, value):
 		'''
-			Override it, if you want to use different hash.
-			Hash must be 32bit and fast (don't use cryptographic hashes then)
+			Override it together with `hash_many()`, if you want to use different hash.
+			Hash must be `num_bits` long and fast (don't use cryptographic hashes then)
+		'''
+
+		if self.num_bits == 32:
+			if not isinstance(value, str):
+				value = str(value)
+
+			value = value.encode('utf8')
+			return zlib.crc32(value)
+
+		return int(self.hash_many([value])[0])
+
+
+	def hash_many(self, values):
+		'''
+			Returns hashes of `values` as a NumPy array of `uint64`.
+
+			The 64 bit hash is computed by NumPy operations over the whole array:
+			integers are hashed by their value, bytes by their content and other values by characters of `str(value)`.
 		'''
 
-		if not isinstance(value, str):
-			value = str(value)
+		if self.num_bits == 32:
+			return np.fromiter(map(self.hash_data, values), dtype='u8', count=len(values))
+
+		values = np.asarray(values)
+		kind = values.dtype.kind
+		if kind in 'iub':
+			return _fmix64(values.astype('u8') ^ SEED)
 
-		value = value.encode('utf8')
-		return zlib.crc32(value)
+		if kind == 'S':
+			values = np.ascontiguousarray(values)
+			data = values.view('u1').reshape(values.shape[0], values.dtype.itemsize)
+			return _hash_units(data, np.char.str_len(values))
+
+		if kind == 'O':
+			values = np.array([str(value) for value in values.tolist()], dtype=np.str_)
+		elif kind != 'U':
+			values = values.astype(np.str_)
+
+		# Characters of strings are UCS4 code points
+		values = np.ascontiguousarray(values)
+		data = values.view('u4').reshape(values.shape[0], values.dtype.itemsize // 4)
+		return _hash_units(data, np.char.str_len(values))
 
 
 	def compute_error(self, ground_truth, hll_count):
@@ -82,8 +200,7 @@ class HyperLogLog(object):
 
 
 	def _compute_z(self, array):
-		twos = [0.5] * len(array)
-		z = 1 / float(np.sum(np.power(twos, array)))
+		z = 1 / float(np.sum(np.exp2(-np.asarray(array, dtype='f8'))))
 		return z
 
 
@@ -106,7 +223,7 @@ class HyperLogLog(object):
 
 
 	def _get_zeros(self, array):
-		return len(array[array == 0])
+		return int(np.count_nonzero(array == 0))
 
 
 	def _linear_count(self, v):
@@ -115,7 +232,7 @@ class HyperLogLog(object):
 
 	def _compute_position(self, hashed_value):
 		'''
-			takes b right bits.
+			takes b right bits, works for a scalar and an array.
 		'''
 		move = hashed_value & (self.max - 1) >> (self.num_bits - self.b)
 		return move
@@ -124,12 +241,63 @@ class HyperLogLog(object):
 	def _compute_rho(self, hashed_value):
 		'''
 			rho = 1 + <leftmost 1 position>
+			The 64 bit hash is split, rho is computed from bits that are not used by the position.
 		'''
-		# SLOW: TODO: find the way to do it better
-		x = hashed_value
-		pos = self.num_bits
-		while x > 1:
-			x = x >> 1
-			pos -= 1
+		if self.num_bits == 32:
+			return self.num_bits + 1 - max(hashed_value.bit_length(), 1)
+
+		return self.num_bits - self.b + 1 - (hashed_value >> self.b).bit_length()
+
 
-		return pos
+	def _compute_rhos(self, hashed_values):
+		'''
+			Vectorized `_compute_rho()`.
+		'''
+		if self.num_bits == 32:
+			return self.num_bits + 1 - np.maximum(_bit_length(hashed_values), 1)
+
+		return self.num_bits - self.b + 1 - _bit_length(hashed_values >> np.uint64(self.b))
+
+
+def _fmix64(h):
+	# Finalizer of MurmurHash3, multiplications of uint64 arrays wrap around
+	h = h ^ (h >> np.uint64(33))
+	h = h * np.uint64(0xff51afd7ed558ccd)
+	h = h ^ (h >> np.uint64(33))
+	h = h * np.uint64(0xc4ceb9fe1a85ec53)
+	return h ^ (h >> np.uint64(33))
+
+
+def _hash_units(data, lengths):
+	'''
+	Hashes rows of `data`, a 2D array of code units, only the first `lengths` units of a row are hashed.
+	Rows are hashed by 8 bytes at once, so the loop goes over the longest row and not over values.
+	'''
+	count, size = data.shape
+	per_word = 8 // data.dtype.itemsize
+	words = -(-size // per_word)
+	padded = np.zeros((count, words * per_word), dtype=data.dtype)
+	padded[:, :size] = data
+	padded = padded.view('u8')
+
+	lengths = lengths.astype('u8')
+	hashed = np.full(count, SEED, dtype='u8')
+	for word in range(words):
+		hashed = np.where(lengths > word * per_word, _fmix64(hashed ^ padded[:, word]), hashed)
+
+	return _fmix64(hashed ^ lengths)
+
+
+def _bit_length(values):
+	'''
+	`int.bit_length()` of every item of an `uint64` array, by a binary search over shifts.
+	'''
+	values = values.astype('u8')
+	lengths = (values != 0).astype('i8')
+	for shift in (32, 16, 8, 4, 2, 1):
+		shifted = values >> np.uint64(shift)
+		higher = shifted != 0
+		lengths += higher * shift
+		values = np.where(higher, shifted, values)
+
+	return lengths
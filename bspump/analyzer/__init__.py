@@ -1,20 +1,24 @@
-from .analyzer import Analyzer
-# from .timewindowanalyzer import TimeWindowAnalyzer
-# from .timedriftanalyzer import TimeDriftAnalyzer
-# from .sessionanalyzer import SessionAnalyzer
-# from .geoanalyzer import GeoAnalyzer
-# from .latch import LatchAnalyzer
-# from .analyzingsource import AnalyzingSource
-# from .threshold import ThresholdAnalyzer
+from ..lazy import lazy_import
+
+__getattr__, __dir__ = lazy_import(__name__, {
+	"Analyzer": ".analyzer",
+	"TimeWindowAnalyzer": ".timewindowanalyzer",
+	"TimeDriftAnalyzer": ".timedriftanalyzer",
+	"SessionAnalyzer": ".sessionanalyzer",
+	"GeoAnalyzer": ".geoanalyzer",
+	"LatchAnalyzer": ".latch",
+	"AnalyzingSource": ".analyzingsource",
+	"ThresholdAnalyzer": ".threshold",
+})
 
 
 __all__ = (
- 	'Analyzer',
-# 	'TimeWindowAnalyzer',
-# 	'TimeDriftAnalyzer',
-# 	'SessionAnalyzer',
-# 	'GeoAnalyzer',
-# 	'LatchAnalyzer',
-# 	'AnalyzingSource',
-# 	'ThresholdAnalyzer',
+	'Analyzer',
+	'TimeWindowAnalyzer',
+	'TimeDriftAnalyzer',
+	'SessionAnalyzer',
+	'GeoAnalyzer',
+	'LatchAnalyzer',
+	'AnalyzingSource',
+	'ThresholdAnalyzer',
 )
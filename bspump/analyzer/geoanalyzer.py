@@ -2,6 +2,7 @@ import logging
 
 from .analyzer import Analyzer
 from ..matrix.geomatrix import GeoMatrix, PersistentGeoMatrix
+from ..matrix.utils.geoindex import GeoIndex
 
 
 L = logging.getLogger(__name__)
@@ -13,6 +14,8 @@ class GeoAnalyzer(Analyzer):
 
 		`GeoAnalyzer` operates over the `GeoMatrix` object.
 		`matrix_id` is an id of `GeoMatrix` object defined alternatively.
+		`GeoIndex` keeps positions of entities bucketed by cells of the matrix,
+		use it to find entities within a radius, e.g. in `analyze()`.
 
 		**Config Defaults**
 
@@ -78,3 +81,51 @@ class GeoAnalyzer(Analyzer):
 			svc.add_matrix(self.GeoMatrix)
 		else:
 			self.GeoMatrix = svc.locate_matrix(matrix_id)
+
+		self.GeoIndex = GeoIndex(self.GeoMatrix)
+
+
+	def process_batch(self, context, events):
+		"""
+		Evaluates events of the batch that match the predicate by `evaluate_batch()`.
+
+		**Parameters**
+
+		context :
+
+		events : list
+				List of events.
+
+		:return: events
+		"""
+		selected = [event for event in events if self.predicate(context, event)]
+		if len(selected) > 0:
+			self.evaluate_batch(context, selected)
+
+		return events
+
+
+	def evaluate_batch(self, context, events):
+		"""
+		Records a list of events, the default implementation calls `evaluate()` for each event.
+		Override it to process positions in bulk, e.g.:
+
+		.. code:: python
+
+			def evaluate_batch(self, context, events):
+				lats = [event['lat'] for event in events]
+				lons = [event['lon'] for event in events]
+				self.GeoIndex.update([event['id'] for event in events], lats, lons)
+				rows, columns = self.GeoMatrix.project_many(lats, lons)
+				inside = rows >= 0
+				np.add.at(self.GeoMatrix.Array, (rows[inside], columns[inside]), 1)
+
+		**Parameters**
+
+		context :
+
+		events : list
+				List of events that match the predicate.
+		"""
+		for event in events:
+			self.evaluate(context, event)
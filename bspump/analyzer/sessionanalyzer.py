@@ -86,3 +86,45 @@ class SessionAnalyzer(Analyzer):
 			svc.add_matrix(self.Sessions)
 		else:
 			self.Sessions = svc.locate_matrix(matrix_id)
+
+
+	def process_batch(self, context, events):
+		"""
+		Evaluates events of the batch that match the predicate by `evaluate_batch()`.
+
+		**Parameters**
+
+		context :
+
+		events : list
+				List of events.
+
+		:return: events
+		"""
+		selected = [event for event in events if self.predicate(context, event)]
+		if len(selected) > 0:
+			self.evaluate_batch(context, selected)
+
+		return events
+
+
+	def evaluate_batch(self, context, events):
+		"""
+		Records a list of events into the session matrix, the default implementation calls `evaluate()` for each event.
+		Override it to store sessions in bulk, e.g.:
+
+		.. code:: python
+
+			def evaluate_batch(self, context, events):
+				rows = self.Sessions.resolve_rows([event['id'] for event in events])
+				self.Sessions.store_events(rows, events)
+
+		**Parameters**
+
+		context :
+
+		events : list
+				List of events that match the predicate.
+		"""
+		for event in events:
+			self.evaluate(context, event)
@@ -83,7 +83,7 @@ class ThresholdAnalyzer(TimeWindowAnalyzer):
 		self.EventValue = self.Config['event_value']
 		self.Lower = float(self.Config['lower_bound'])
 		self.Upper = float(self.Config['upper_bound'])
-		self.SymptomOccurrence = int(self.Config['symptom_occurrence'])
+		self.SymptomOccurrence = int(self.Config['anomaly_occurrence'])
 
 		self.WarmingUpLimit = int()
 
@@ -139,16 +139,49 @@ class ThresholdAnalyzer(TimeWindowAnalyzer):
 		self.TimeWindow.Array[row, column] = event[self.EventValue]
 
 
+	def process_batch(self, context, events):
+		"""
+		Evaluates the whole batch at once, rows and columns of events are resolved in bulk
+		and values are stored by :meth:`TimeWindowMatrix.update_batch() <bspump.matrix.TimeWindowMatrix.update_batch()>`.
+
+		**Parameters**
+
+		context :
+
+		events : list
+			List of events with timestamps.
+
+		:return: events
+		"""
+		if type(self).evaluate is not ThresholdAnalyzer.evaluate:
+			# A custom evaluation is applied to every event
+			return super().process_batch(context, events)
+
+		selected = [event for event in events if self.predicate(context, event)]
+		if len(selected) > 0:
+			row_names = [event[self.EventAttribute] for event in selected]
+			# Rows are added also for events outside of the window, the same way as by `evaluate()`
+			self.TimeWindow.resolve_rows(row_names)
+			self.TimeWindow.update_batch(
+				row_names,
+				[event["@timestamp"] for event in selected],
+				[event[self.EventValue] for event in selected],
+			)
+
+		return events
+
+
 	def analyze(self):
 		# Checking an empty array
 		if self.TimeWindow.Array.shape[0] == 0:
 			return
 
-		data = self.TimeWindow.Array
-		# Warming up the matrix to avoid procedures on not fully filled matrix and resizing warming_up dimension
+		# Columns of the ring buffer in the time order, so `y` passed to `alarm()` is 0 for the oldest time slot
+		data = self.TimeWindow.Array[:, self.TimeWindow.get_ordered_columns()]
+		# Warming up the matrix to avoid procedures on not fully filled matrix, counts of rows are broadcast over columns
 		# to avoid ValueError when checking the conditions of exceedance/subceedance/range.
 		self.WarmingUpLimit = self.TimeWindow.Columns - 1
-		warming_up = np.resize(self.TimeWindow.WarmingUpCount <= self.WarmingUpLimit, data.shape)
+		warming_up = (self.TimeWindow.WarmingUpCount.WUC[:data.shape[0]] <= self.WarmingUpLimit)[:, np.newaxis]
 
 		# Exceedance
 		if self.Lower == float('-inf') and self.Upper != float('inf'):
@@ -193,5 +226,10 @@ class ThresholdAnalyzer(TimeWindowAnalyzer):
 
 
 	def alarm(self, *args):
+		"""
+		Description: Called with `x, y, count, index` for `count` occurrences of the symptom in the row `x[index]`.
+		`x` are row indexes and `y` are column indexes in the time order, 0 is the oldest time slot.
+		The column in `TimeWindow.Array` is `(y + TimeWindow.Head) % TimeWindow.Array.shape[1]`.
 
+		"""
 		pass
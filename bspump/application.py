@@ -1,10 +1,10 @@
+import os
 import signal
 import sys
 
 import asab
-import asab.web
-import asab.api
 
+from .scheduler import Scheduler
 from .service import BSPumpService
 from .__version__ import __version__, __build__
 
@@ -13,6 +13,16 @@ import logging
 L = logging.getLogger(__name__)
 
 
+asab.Config.add_defaults(
+	{
+		"bspump:sharding": {
+			"workers": 0,  # The number of shard worker processes, 0 means that sharding is disabled
+			"restart_delay": 5.0,  # Delay before a terminated shard worker is restarted
+		},
+	}
+)
+
+
 class BSPumpApplication(asab.Application):
 
 
@@ -34,11 +44,32 @@ class BSPumpApplication(asab.Application):
 		from asab.metrics import Module
 		self.add_module(Module)
 
+		import asab.api
 		self.ASABApiService = asab.api.ApiService(self)
 
+		self.Scheduler = Scheduler(self)
 		self.PumpService = BSPumpService(self)
 		self.WebContainer = None
 
+		# Sharding, the application is a supervisor of shard workers, a shard worker or it runs standalone
+		self.ShardId = None
+		self.ShardCount = None
+		self.ShardSupervisor = None
+		self.ShardWorker = None
+
+		if "BSPUMP_SHARD_ID" in os.environ:
+			from .shard import ShardWorker
+			self.ShardId = int(os.environ["BSPUMP_SHARD_ID"])
+			self.ShardCount = int(os.environ["BSPUMP_SHARD_COUNT"])
+			self.ShardWorker = ShardWorker(self, int(os.environ["BSPUMP_SHARD_METRICS_FD"]))
+
+		else:
+			workers = asab.Config["bspump:sharding"].getint("workers")
+			if workers > 1:
+				from .shard import ShardSupervisor
+				self.ShardCount = workers
+				self.ShardSupervisor = ShardSupervisor(self, workers)
+
 		try:
 			# Signals are not available on Windows
 			self.Loop.add_signal_handler(signal.SIGUSR1, self._on_signal_usr1)
@@ -46,9 +77,11 @@ class BSPumpApplication(asab.Application):
 			pass
 
 		# Register bspump API endpoints, if requested (the web service is present)
-		if "web" in asab.Config and asab.Config["web"].get("listen"):
+		# Shard workers leave the web API to the supervisor
+		if self.ShardId is None and "web" in asab.Config and asab.Config["web"].get("listen"):
 
 			# Initialize API service
+			import asab.web
 			self.add_module(asab.web.Module)
 
 			self.WebService = self.get_service("asab.WebService")
@@ -58,7 +91,7 @@ class BSPumpApplication(asab.Application):
 			self.ASABApiService.initialize_web()
 
 		# Initialize zookeeper container
-		if "zookeeper" in asab.Config.sections():
+		if self.ShardId is None and "zookeeper" in asab.Config.sections():
 			from asab.zookeeper import Module
 			self.add_module(Module)
 
@@ -1,7 +1,11 @@
-from .sink import AvroSink
-from .source import AvroSource
-from .serializer import AvroSerializer
-from .deserializer import AvroDeserializer
+from ..lazy import lazy_import
+
+__getattr__, __dir__ = lazy_import(__name__, {
+	"AvroSink": ".sink",
+	"AvroSource": ".source",
+	"AvroSerializer": ".serializer",
+	"AvroDeserializer": ".deserializer",
+})
 __all__ = (
 	'AvroSink',
 	'AvroSource',
@@ -0,0 +1,8 @@
+from .runner import BenchmarkRunner, compare
+from .source import BenchmarkSource
+
+__all__ = (
+	'BenchmarkRunner',
+	'BenchmarkSource',
+	'compare',
+)
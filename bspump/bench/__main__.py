@@ -0,0 +1,94 @@
+import argparse
+import contextlib
+import json
+import sys
+
+from .runner import BenchmarkRunner, compare
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(
+		prog="python -m bspump.bench",
+		description="Measures the performance of a pump described by a PumpBuilder definition.",
+	)
+	parser.add_argument('definition', help="JSON or YAML definition of the pump")
+	parser.add_argument('-p', '--pipeline', help="ID of the benchmarked pipeline, the first pipeline by default")
+	parser.add_argument('-n', '--events', type=int, help="number of measured events")
+	parser.add_argument('-w', '--warmup', type=int, help="number of events processed before the measurement")
+	parser.add_argument('-s', '--sample', help="sample file, each line is an event")
+	parser.add_argument('-f', '--format', choices=BenchmarkRunner.SampleFormats, help="format of the sample file lines")
+	parser.add_argument('-g', '--generator', help="module:function that returns an iterable of events")
+	parser.add_argument('-o', '--output', help="file to store the results into, as JSON")
+	parser.add_argument('-b', '--baseline', help="results of an earlier benchmark to compare with")
+	parser.add_argument('-t', '--tolerance', type=float, default=0.1, help="relative change that is not a regression (default: 0.1)")
+	args = parser.parse_args(argv)
+
+	try:
+		runner = BenchmarkRunner(
+			args.definition,
+			pipeline=args.pipeline,
+			events=args.events,
+			warmup=args.warmup,
+			sample=args.sample,
+			sample_format=args.format,
+			generator=args.generator,
+		)
+		# The standard output is left for the results
+		with contextlib.redirect_stdout(sys.stderr):
+			results = runner.run()
+	except (ValueError, RuntimeError, OSError) as e:
+		print("Benchmark failed: {}".format(e), file=sys.stderr)
+		return 2
+
+	regressions = []
+	if args.baseline is not None:
+		with open(args.baseline) as f:
+			baseline = json.load(f)
+		regressions = compare(results, baseline, tolerance=args.tolerance)
+		results['regressions'] = regressions
+
+	if args.output is not None:
+		with open(args.output, 'w') as f:
+			json.dump(results, f, indent=2)
+
+	print_results(results)
+
+	return 1 if len(regressions) > 0 else 0
+
+
+def print_results(results):
+	print("Pipeline {}: {} events in {:.3f} s".format(results['pipeline'], results['events'], results['duration']))
+	print("  EPS:       {:.0f}".format(results['eps']))
+	print("  CPU time:  {:.3f} s".format(results['cpu_time']))
+	if results['rss_peak'] is not None:
+		print("  Peak RSS:  {:.1f} MB".format(results['rss_peak'] / 1048576))
+	print("  Latency:   p50 {} p99 {}".format(_us(results['latency']['p50']), _us(results['latency']['p99'])))
+
+	for pipeline_id, pipeline in results['pipelines'].items():
+		print()
+		print("{:<40} {:>10} {:>12} {:>12} {:>12}".format(pipeline_id, "events", "time [s]", "p50", "p99"))
+		for processor_id, processor in pipeline['processors'].items():
+			print("  {:<38} {:>10} {:>12.4f} {:>12} {:>12}".format(
+				processor_id, processor['count'], processor['time'], _us(processor['p50']), _us(processor['p99'])
+			))
+
+	regressions = results.get('regressions')
+	if regressions is None:
+		return
+
+	print()
+	if len(regressions) == 0:
+		print("No regressions against the baseline.")
+		return
+
+	print("Regressions against the baseline:")
+	for regression in regressions:
+		print("  {:<50} {:>+8.1f} %".format(regression['metric'], regression['change'] * 100))
+
+
+def _us(seconds):
+	return "{:.1f} us".format(seconds * 1e6)
+
+
+if __name__ == '__main__':
+	sys.exit(main())
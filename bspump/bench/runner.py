@@ -0,0 +1,397 @@
+import asyncio
+import copy
+import importlib
+import itertools
+import json
+import logging
+import sys
+import time
+
+import asab
+
+from ..__version__ import __version__
+from ..application import BSPumpApplication
+from ..common.routing import InternalSource
+from ..pumpbuilder import PumpBuilder
+
+try:
+	import resource
+except ImportError:
+	resource = None  # Not available on Windows
+
+#
+
+L = logging.getLogger(__name__)
+
+#
+
+
+class BenchmarkRunner(object):
+	"""
+	BenchmarkRunner measures the performance of a pump described by a :meth:`PumpBuilder <bspump.PumpBuilder()>` definition.
+
+	Sources of the benchmarked pipeline are replaced by a :meth:`BenchmarkSource <bspump.bench.BenchmarkSource()>`,
+	which feeds events read from a sample file or produced by a generator function.
+	Events routed to other pipelines of the pump, e.g. by a `RouterSink`, are processed and measured as well.
+
+	The benchmark has a warmup phase, which is not measured, followed by the measured phase.
+	The results contain EPS, CPU time and peak RSS of the process, the latency of each pipeline
+	and the time and latency of each processor, see `run()`.
+
+	The benchmark can be configured by the `bench` section of the definition, arguments of the runner take precedence.
+
+	.. code:: json
+
+		{
+			"bench": {
+				"pipeline": "MyPipeline",
+				"sample": "./sample.jsonl",
+				"format": "json",
+				"events": 100000,
+				"warmup": 10000
+			},
+			"pipelines": [...]
+		}
+
+	|
+
+	"""
+
+	SampleFormats = ('bytes', 'text', 'json')
+	DrainTimeout = 1.0  # Seconds, how long a drain waits for a pipeline before it checks errors again
+
+
+	def __init__(self, definition, pipeline=None, events=None, warmup=None, sample=None, sample_format=None, generator=None):
+		"""
+		**Parameters**
+
+		definition : str or dict
+				Path to the JSON or YAML definition of the pump, or the definition itself.
+
+		pipeline : str, default None
+				ID of the benchmarked pipeline, the first pipeline of the definition by default.
+
+		events : int, default None
+				Number of measured events, 100000 by default.
+
+		warmup : int, default None
+				Number of events processed before the measurement starts, 10000 by default.
+
+		sample : str, default None
+				Path to the sample file, each line is an event.
+
+		sample_format : str, default None
+				`bytes` (default), `text` or `json`, how lines of the sample file are turned into events.
+				JSON events are decoded for every event again, so processors can modify them.
+
+		generator : str or callable, default None
+				`module:function` or a callable without arguments that returns an iterable of events.
+				It is called again when the iterable is exhausted.
+
+		"""
+		self.Definition = copy.deepcopy(PumpBuilder(definition).Definition)
+		bench = self.Definition.pop('bench', None) or {}
+
+		pipelines = self.Definition.get('pipelines') or []
+		if len(pipelines) == 0:
+			raise ValueError("The definition of the benchmark contains no pipelines")
+
+		self.PipelineId = _first(pipeline, bench.get('pipeline'), pipelines[0]['id'])
+		self.Events = int(_first(events, bench.get('events'), 100000))
+		self.Warmup = int(_first(warmup, bench.get('warmup'), 10000))
+		self.Sample = _first(sample, bench.get('sample'))
+		self.SampleFormat = _first(sample_format, bench.get('format'), 'bytes')
+		self.Generator = _first(generator, bench.get('generator'))
+
+		if self.PipelineId not in [pipeline_definition['id'] for pipeline_definition in pipelines]:
+			raise ValueError("Pipeline '{}' is not in the definition of the benchmark".format(self.PipelineId))
+
+		if self.SampleFormat not in self.SampleFormats:
+			raise ValueError("Unknown sample format '{}', use one of {}".format(self.SampleFormat, ", ".join(self.SampleFormats)))
+
+		if (self.Sample is None) == (self.Generator is None):
+			raise ValueError("The benchmark requires either a sample file or a generator")
+
+		if self.Events <= 0:
+			raise ValueError("The benchmark requires a positive number of events")
+
+		self.App = None
+		self.Results = None
+		self.Error = None
+
+
+	def run(self):
+		"""
+		Constructs the pump, runs the benchmark and returns its results.
+
+		.. code:: json
+
+			{
+				"pipeline": "MyPipeline",
+				"events": 100000,
+				"eps": 152301.2,
+				"cpu_time": 0.71,
+				"rss_peak": 52838400,
+				"latency": {"count": 100000, "mean": 6.1e-06, "p50": 5.7e-06, "p90": 6.9e-06, "p99": 1.6e-05, "max": 0.0012},
+				"pipelines": {
+					"MyPipeline": {
+						"latency": {...},
+						"processors": {
+							"MyProcessor": {"time": 0.21, "count": 100000, "mean": 2.1e-06, "p50": ..., "p99": ..., "max": ...}
+						}
+					}
+				}
+			}
+
+		Durations are in seconds, `cpu_time` of the process includes user and system time, `rss_peak` is in bytes.
+		The `time` of a processor is the wall time spent in its `process()` method.
+
+		:return: dictionary with the results.
+
+		"""
+		for pipeline_definition in self.Definition['pipelines']:
+			if pipeline_definition['id'] == self.PipelineId:
+				pipeline_definition['sources'] = [{
+					'module': 'bspump.bench',
+					'class': 'BenchmarkSource',
+					'id': 'BenchmarkSource',
+					'args': {'runner': self},
+				}]
+
+			# Every event is profiled and the results are not reset by metrics flushes during the benchmark,
+			# the configuration of the pipeline is given to its constructor, so the global configuration is not changed
+			pipeline_definition['config'] = dict(
+				pipeline_definition.get('config') or {},
+				profiler="full",
+				latency_sampling="1",
+				reset_profiler="no",
+			)
+
+		self.App = BSPumpApplication(args=[])
+		self.Results = None
+		self.Error = None
+
+		svc = self.App.get_service("bspump.PumpService")
+		PumpBuilder(self.Definition).construct_pump(self.App, svc)
+		for pipeline in svc.Pipelines.values():
+			pipeline.PubSub.subscribe("bspump.pipeline.error!", self._on_pipeline_error)
+
+		self.App.run()
+
+		if self.Error is not None:
+			raise RuntimeError(self.Error)
+
+		if self.Results is None:
+			raise RuntimeError("The benchmark of '{}' has not finished".format(self.PipelineId))
+
+		return self.Results
+
+
+	async def execute(self, source):
+		"""
+		Runs the warmup and the measured phase, it is called by the `BenchmarkSource`.
+
+		"""
+		svc = self.App.get_service("bspump.PumpService")
+		events = self._iter_events()
+
+		L.log(asab.LOG_NOTICE, "Warming up '{}' with {} events".format(self.PipelineId, self.Warmup))
+		await self._feed(source.Pipeline, events, self.Warmup)
+		await self._drain(svc)
+
+		for pipeline in svc.Pipelines.values():
+			pipeline.LatencyHistogram.reset()
+			for histogram in pipeline.ProfilerHistogram.values():
+				histogram.reset()
+
+		L.log(asab.LOG_NOTICE, "Measuring '{}' with {} events".format(self.PipelineId, self.Events))
+		cpu_start = time.process_time()
+		start = time.perf_counter()
+
+		await self._feed(source.Pipeline, events, self.Events)
+		await self._drain(svc)
+
+		duration = time.perf_counter() - start
+		cpu_time = time.process_time() - cpu_start
+
+		if self.Error is None:
+			self.Results = self._collect(svc, duration, cpu_time)
+
+
+	async def _feed(self, pipeline, events, count):
+		for event in itertools.islice(events, count):
+			await pipeline.process(event)
+
+
+	async def _drain(self, svc):
+		# Waits until events routed to other pipelines and generated events are processed.
+		# Pipelines are drained in rounds; an event that was being processed when a round started may route new events
+		# into queues that were already drained in the round, so the pump is idle after two consecutive rounds
+		# in which no pipeline received an event and all queues are empty.
+		idle_rounds = 0
+		while self.Error is None and idle_rounds < 2:
+			received = _received_events(svc)
+
+			for pipeline in svc.Pipelines.values():
+				if len(pipeline.AsyncFutures) > 0:
+					await asyncio.wait(pipeline.AsyncFutures, timeout=self.DrainTimeout)
+				for source in pipeline.Sources:
+					if isinstance(source, InternalSource):
+						try:
+							await asyncio.wait_for(source.Queue.join(), timeout=self.DrainTimeout)
+						except asyncio.TimeoutError:
+							pass  # Checked again in the next round, unless the pipeline failed
+
+			idle = received == _received_events(svc) and all(
+				len(pipeline.AsyncFutures) == 0 and all(
+					source.Queue.qsize() == 0
+					for source in pipeline.Sources if isinstance(source, InternalSource)
+				)
+				for pipeline in svc.Pipelines.values()
+			)
+			idle_rounds = idle_rounds + 1 if idle else 0
+
+
+	def _iter_events(self):
+		if self.Generator is not None:
+			generator = self.Generator
+			if isinstance(generator, str):
+				module_name, _, function_name = generator.partition(':')
+				generator = getattr(importlib.import_module(module_name), function_name)
+
+			while True:
+				empty = True
+				for event in generator():
+					empty = False
+					yield event
+				if empty:
+					raise ValueError("The generator '{}' of the benchmark produced no events".format(self.Generator))
+
+		with open(self.Sample, 'rb') as f:
+			lines = [line.rstrip(b'\r\n') for line in f]
+		lines = [line for line in lines if len(line) > 0]
+		if len(lines) == 0:
+			raise ValueError("The sample file '{}' of the benchmark is empty".format(self.Sample))
+
+		if self.SampleFormat == 'text':
+			lines = [line.decode('utf-8') for line in lines]
+
+		for line in itertools.cycle(lines):
+			if self.SampleFormat == 'json':
+				yield json.loads(line)
+			else:
+				yield line
+
+
+	def _collect(self, svc, duration, cpu_time):
+		pipelines = {}
+		for pipeline in svc.Pipelines.values():
+			processors = {}
+			for processor_id, histogram in pipeline.ProfilerHistogram.items():
+				processors[processor_id] = dict(histogram.summary(), time=histogram.Sum)
+
+			pipelines[pipeline.Id] = {
+				'latency': pipeline.LatencyHistogram.summary(),
+				'processors': processors,
+			}
+
+		return {
+			'version': __version__,
+			'pipeline': self.PipelineId,
+			'events': self.Events,
+			'warmup': self.Warmup,
+			'duration': duration,
+			'eps': self.Events / duration if duration > 0 else 0.0,
+			'cpu_time': cpu_time,
+			'rss_peak': _rss_peak(),
+			'latency': pipelines[self.PipelineId]['latency'],
+			'pipelines': pipelines,
+		}
+
+
+	def _on_pipeline_error(self, event_name, pipeline):
+		context, event, exc, timestamp = pipeline._error
+		self.Error = "Pipeline '{}' failed during the benchmark: {} ({})".format(pipeline.Id, exc, type(exc).__name__)
+		self.App.stop()
+
+
+def compare(results, baseline, tolerance=0.1):
+	"""
+	Compares results of a benchmark with the baseline, i.e. results of an earlier benchmark.
+
+	**Parameters**
+
+	results : dict
+			Results of `BenchmarkRunner.run()`.
+
+	baseline : dict
+			Results of the baseline benchmark.
+
+	tolerance : float, default 0.1
+			Relative change that is not considered to be a regression.
+
+	:return: list of regressions, dictionaries with the `metric`, its `baseline` and `current` value and the relative `change`.
+
+	|
+
+	"""
+	regressions = []
+
+	def check(metric, current, base, higher_is_better=False):
+		if current is None or base is None or base <= 0:
+			return
+		change = (current - base) / base
+		if (-change if higher_is_better else change) > tolerance:
+			regressions.append({
+				'metric': metric,
+				'baseline': base,
+				'current': current,
+				'change': change,
+			})
+
+	check('eps', results.get('eps'), baseline.get('eps'), higher_is_better=True)
+	check('cpu_time_per_event', _per_event(results, 'cpu_time'), _per_event(baseline, 'cpu_time'))
+	check('latency.p50', results.get('latency', {}).get('p50'), baseline.get('latency', {}).get('p50'))
+	check('latency.p99', results.get('latency', {}).get('p99'), baseline.get('latency', {}).get('p99'))
+
+	for pipeline_id, pipeline in results.get('pipelines', {}).items():
+		base_processors = baseline.get('pipelines', {}).get(pipeline_id, {}).get('processors', {})
+		for processor_id, processor in pipeline.get('processors', {}).items():
+			base_processor = base_processors.get(processor_id)
+			if base_processor is None:
+				continue
+			check('{}.{}.mean'.format(pipeline_id, processor_id), processor.get('mean'), base_processor.get('mean'))
+
+	return regressions
+
+
+def _first(*values):
+	for value in values:
+		if value is not None:
+			return value
+	return None
+
+
+def _per_event(results, metric):
+	value = results.get(metric)
+	events = results.get('events')
+	if value is None or not events:
+		return None
+	return value / events
+
+
+def _received_events(svc):
+	# Counts of events received by pipelines, they grow as long as events are processed
+	return [
+		field["actuals"]["event.in"]
+		for pipeline in svc.Pipelines.values()
+		for field in pipeline.MetricsCounter.Storage["fieldset"]
+	]
+
+
+def _rss_peak():
+	if resource is None:
+		return None
+	rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+	# Linux reports kilobytes, macOS bytes
+	return rss if sys.platform == 'darwin' else rss * 1024
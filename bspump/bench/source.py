@@ -0,0 +1,34 @@
+import logging
+
+from ..abc.source import Source
+
+#
+
+L = logging.getLogger(__name__)
+
+#
+
+
+class BenchmarkSource(Source):
+	"""
+	BenchmarkSource feeds synthetic events of a :meth:`BenchmarkRunner <bspump.bench.BenchmarkRunner()>`
+	into the benchmarked :meth:`Pipeline <bspump.Pipeline()>`, it replaces the sources of the pipeline definition.
+
+	The source runs the warmup phase and the measured phase and it stops the application when the benchmark is done.
+
+	|
+
+	"""
+
+	def __init__(self, app, pipeline, runner, id=None, config=None):
+		super().__init__(app, pipeline, id=id, config=config)
+		self.App = app
+		self.Runner = runner
+
+
+	async def main(self):
+		try:
+			await self.Pipeline.ready()
+			await self.Runner.execute(self)
+		finally:
+			self.App.stop()
@@ -1,27 +1,44 @@
-from .aggregator import AggregationStrategy, Aggregator, ListAggregationStrategy, ListEventAggregationStrategy, \
-	StringAggregationStrategy
-from .bytes import BytesToStringParser
-from .bytes import StringToBytesParser
-from .flatten import FlattenDictProcessor
-from .hexlify import HexlifyProcessor
-from .iterator import IteratorGenerator
-from .iterator import IteratorSource
-from .json import CySimdJsonParser
-from .json import StdDictToJsonParser
-from .json import StdJsonToDictParser
-from .json import DictToJsonBytesParser
-from .mapping import MappingKeysGenerator, MappingValuesGenerator, MappingItemsGenerator
-from .mapping import MappingKeysProcessor, MappingValuesProcessor, MappingItemsProcessor
-from .null import NullSink
-from .print import PrintSink, PPrintSink, PrintProcessor, PPrintProcessor, PrintContextProcessor, PPrintContextProcessor
-from .routing import DirectSource
-from .routing import InternalSource
-from .routing import RouterProcessor
-from .routing import RouterSink
-from .tee import TeeProcessor
-from .tee import TeeSource
-from .time import TimeZoneNormalizer
-from .transfr import MappingTransformator
+from ..lazy import lazy_import
+
+__getattr__, __dir__ = lazy_import(__name__, {
+	"AggregationStrategy": ".aggregator",
+	"Aggregator": ".aggregator",
+	"ListAggregationStrategy": ".aggregator",
+	"ListEventAggregationStrategy": ".aggregator",
+	"StringAggregationStrategy": ".aggregator",
+	"BytesToStringParser": ".bytes",
+	"StringToBytesParser": ".bytes",
+	"FlattenDictProcessor": ".flatten",
+	"HexlifyProcessor": ".hexlify",
+	"IteratorGenerator": ".iterator",
+	"IteratorSource": ".iterator",
+	"CySimdJsonParser": ".json",
+	"StdDictToJsonParser": ".json",
+	"StdJsonToDictParser": ".json",
+	"DictToJsonBytesParser": ".json",
+	"MappingKeysGenerator": ".mapping",
+	"MappingValuesGenerator": ".mapping",
+	"MappingItemsGenerator": ".mapping",
+	"MappingKeysProcessor": ".mapping",
+	"MappingValuesProcessor": ".mapping",
+	"MappingItemsProcessor": ".mapping",
+	"NullSink": ".null",
+	"OffloadProcessor": ".offload",
+	"PrintSink": ".print",
+	"PPrintSink": ".print",
+	"PrintProcessor": ".print",
+	"PPrintProcessor": ".print",
+	"PrintContextProcessor": ".print",
+	"PPrintContextProcessor": ".print",
+	"DirectSource": ".routing",
+	"InternalSource": ".routing",
+	"RouterProcessor": ".routing",
+	"RouterSink": ".routing",
+	"TeeProcessor": ".tee",
+	"TeeSource": ".tee",
+	"TimeZoneNormalizer": ".time",
+	"MappingTransformator": ".transfr",
+})
 
 __all__ = (
 	'BytesToStringParser',
@@ -30,7 +47,6 @@ __all__ = (
 	'HexlifyProcessor',
 	'IteratorGenerator',
 	'IteratorSource',
-	'JsonToDictParser',
 	'CySimdJsonParser',
 	'StdDictToJsonParser',
 	'StdJsonToDictParser',
@@ -42,6 +58,7 @@ __all__ = (
 	'MappingValuesProcessor',
 	'MappingItemsProcessor',
 	'NullSink',
+	'OffloadProcessor',
 	'PrintSink',
 	'PPrintSink',
 	'PrintProcessor',
@@ -1,5 +1,5 @@
 import json
-import cysimdjson
+
 from ..abc.processor import Processor
 
 
@@ -14,6 +14,7 @@ class CySimdJsonParser(Processor):
 
 	def __init__(self, app, pipeline, id=None, config=None):
 		super().__init__(app, pipeline, id, config)
+		import cysimdjson  # Loaded when the parser is used
 		self._parser = cysimdjson.JSONParser()
 
 	def process(self, context, event: bytes):
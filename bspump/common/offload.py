@@ -0,0 +1,247 @@
+import concurrent.futures
+import logging
+import multiprocessing
+
+from ..abc.generator import Generator
+
+
+L = logging.getLogger(__name__)
+
+
+# The inner processor of a worker process of the `process` executor, see `_initialize_worker()`
+_WorkerProcessor = None
+
+
+def _process_offloaded_batch(processor, batch):
+	result = []
+	for context, event in batch:
+		try:
+			result.append((context, processor.process(context, event), None))
+		except Exception as e:
+			result.append((context, event, e))
+	return result
+
+
+def _initialize_worker(processor_factory):
+	global _WorkerProcessor
+	_WorkerProcessor = processor_factory()
+
+
+def _process_worker_batch(batch):
+	return _process_offloaded_batch(_WorkerProcessor, batch)
+
+
+class OffloadProcessor(Generator):
+	"""
+	OffloadProcessor runs a CPU-bound inner processor in a pool of threads or worker processes,
+	so the event loop is not blocked by it.
+
+	Events are collected into batches, which are processed by the inner processor in the pool.
+	Results are injected into the next depth of the :meth:`Pipeline <bspump.Pipeline()>`, the same way as the generator does.
+	When `max_inflight` batches are being processed, the pipeline is throttled.
+
+	.. code:: python
+
+		self.build(
+			bspump.kafka.KafkaSource(app, self, "KafkaConnection"),
+			bspump.common.OffloadProcessor(app, self, MyHeavyProcessor(app, self), executor="process"),
+			bspump.kafka.KafkaSink(app, self, "KafkaConnection"),
+		)
+
+	The `process` executor starts new worker processes by `spawn` (or `forkserver`, see `start_method`),
+	they do not inherit the running event loop of the application. The inner processor is then given
+	as a picklable factory, e.g. a class or `functools.partial`, which is called once in every worker process.
+	It returns an object with the `process(context, event)` method, which does not need the application or the pipeline.
+	Contexts and events are pickled. Changes made by the inner processor to its own state are not visible in the application.
+
+	.. code:: python
+
+		bspump.common.OffloadProcessor(app, self, functools.partial(MyHeavyTransformation, model="model.bin"), executor="process")
+
+	|
+
+	"""
+
+	ConfigDefaults = {
+		'executor': 'thread',  # 'thread' or 'process'
+		'start_method': 'spawn',  # 'spawn' or 'forkserver', how worker processes of the 'process' executor are started
+		'max_workers': 0,  # 0 means the default of `concurrent.futures`
+		'max_inflight': 4,  # Maximum number of batches being processed at once
+		'ordered': True,  # Results are injected in the order of incoming events
+		'batch_size': 1000,
+		'batch_timeout': 0.1,  # Seconds, an incomplete batch is submitted after that time
+	}
+
+
+	def __init__(self, app, pipeline, inner_processor, executor=None, max_inflight=None, ordered=None, id=None, config=None):
+		"""
+		Initializes the parameters.
+
+		**Parameters**
+
+		app : Application
+				Name of the Application.
+
+		pipeline : Pipeline
+				Name of the Pipeline.
+
+		inner_processor : Processor or callable
+				Processor which `process()` method is executed in the pool.
+				The `process` executor requires a picklable factory of the processor instead.
+
+		executor : str, default None
+				`thread` or `process`, overrides the configuration.
+
+		max_inflight : int, default None
+				Maximum number of batches being processed at once, overrides the configuration.
+
+		ordered : bool, default None
+				If True, results are injected in the order of incoming events, overrides the configuration.
+
+		id : str, default None
+				ID
+
+		config : JSON, default None
+				Configuration file containing additional information.
+
+		"""
+		super().__init__(app, pipeline, id=id, config=config)
+
+		self.InnerProcessor = inner_processor
+
+		self.Executor = executor if executor is not None else self.Config['executor']
+		if self.Executor not in ('thread', 'process'):
+			raise ValueError("Unknown executor '{}' of '{}', use 'thread' or 'process'".format(self.Executor, self.Id))
+
+		self.MaxInFlight = int(max_inflight if max_inflight is not None else self.Config['max_inflight'])
+		self.Ordered = ordered if ordered is not None else self.Config.getboolean('ordered')
+		self.BatchSize = int(self.Config['batch_size'])
+		self.BatchTimeout = float(self.Config['batch_timeout'])
+
+		self.MaxWorkers = int(self.Config['max_workers'])
+		if self.MaxWorkers <= 0:
+			self.MaxWorkers = None
+
+		if self.Executor == 'process':
+			if not callable(inner_processor):
+				raise TypeError("The 'process' executor of '{}' requires a picklable factory of the inner processor".format(self.Id))
+
+			# Forking a running event loop is not safe and it is not available on all platforms
+			self.StartMethod = self.Config['start_method']
+			if self.StartMethod not in ('spawn', 'forkserver'):
+				raise ValueError("Unknown start method '{}' of '{}', use 'spawn' or 'forkserver'".format(self.StartMethod, self.Id))
+
+		# The pool is created with the first batch and it is shut down when the pipeline stops
+		self.Pool = None
+
+		self.InFlight = 0
+		self._batch = []
+		self._batch_timer = None
+		# Resolved once the results of the last submitted batch are injected, it keeps the ordering
+		self._last_injected = None
+
+		pipeline.PubSub.subscribe("bspump.pipeline.stop!", self._on_stop)
+
+
+	def process(self, context, event):
+		self._batch.append((context, event))
+
+		if len(self._batch) >= self.BatchSize:
+			self.flush()
+		elif self._batch_timer is None:
+			self._batch_timer = self.Loop.call_later(self.BatchTimeout, self.flush)
+
+		return None
+
+
+	def flush(self):
+		"""
+		Submits the collected batch into the pool.
+
+		"""
+		if self._batch_timer is not None:
+			self._batch_timer.cancel()
+			self._batch_timer = None
+
+		if len(self._batch) == 0:
+			return
+
+		batch = self._batch
+		self._batch = []
+
+		if self.Pool is None:
+			self.Pool = self._create_pool()
+
+		previous = self._last_injected if self.Ordered else None
+		injected = self.Loop.create_future()
+		self._last_injected = injected
+
+		self.InFlight += 1
+		if self.InFlight == self.MaxInFlight:
+			self.Pipeline.throttle(self, True)
+
+		if self.Executor == 'process':
+			processed = self.Loop.run_in_executor(self.Pool, _process_worker_batch, batch)
+		else:
+			processed = self.Loop.run_in_executor(self.Pool, _process_offloaded_batch, self.InnerProcessor, batch)
+
+		self.Pipeline.ensure_future(
+			self.generate(processed, previous, injected, self.PipelineDepth + 1)
+		)
+
+
+	def _create_pool(self):
+		if self.Executor == 'process':
+			return concurrent.futures.ProcessPoolExecutor(
+				max_workers=self.MaxWorkers,
+				mp_context=multiprocessing.get_context(self.StartMethod),
+				initializer=_initialize_worker,
+				initargs=(self.InnerProcessor,),
+			)
+
+		return concurrent.futures.ThreadPoolExecutor(
+			max_workers=self.MaxWorkers,
+			thread_name_prefix=self.Id,
+		)
+
+
+	async def generate(self, processed, previous, injected, depth):
+		try:
+			result = await processed
+
+			if previous is not None:
+				await previous
+
+			for context, event, exception in result:
+				if exception is not None:
+					self.Pipeline.set_error(context, event, exception)
+					continue
+				if event is not None:
+					self.Pipeline.inject(context, event, depth)
+
+		finally:
+			injected.set_result(None)
+			if self.InFlight == self.MaxInFlight:
+				self.Pipeline.throttle(self, False)
+			self.InFlight -= 1
+
+
+	def _on_stop(self, event_name, pipeline):
+		self.flush()
+		if self.Pool is not None:
+			# Already submitted batches are finished, the pipeline waits for them
+			self.Pool.shutdown(wait=False)
+			self.Pool = None
+
+
+	def rest_get(self):
+		rest = super().rest_get()
+		rest.update({
+			"Executor": self.Executor,
+			"InFlight": self.InFlight,
+		})
+		if self.Executor == 'process':
+			rest["InnerProcessor"] = repr(self.InnerProcessor)
+		else:
+			rest["InnerProcessor"] = self.InnerProcessor.rest_get()
+		return rest
@@ -8,6 +8,30 @@ from ..abc.processor import Processor
 
 L = logging.getLogger(__name__)
 
+# Copy policies of routed events
+#  share: the same event object is passed to the target, it must not be modified there, see `bspump.freeze()`
+#  shallow: the top-level container of the event is copied, nested objects are shared
+#  deep: the event is copied together with all nested objects
+_EventCopiers = {
+	'share': None,
+	'shallow': copy.copy,
+	'deep': copy.deepcopy,
+	# Legacy boolean `copy_event` arguments
+	True: copy.deepcopy,
+	False: None,
+}
+
+
+def _copy_event(event, policy):
+	try:
+		copier = _EventCopiers[policy]
+	except KeyError:
+		raise ValueError("Unknown copy policy '{}', use 'share', 'shallow' or 'deep'".format(policy))
+
+	if copier is None:
+		return event
+	return copier(event)
+
 
 class DirectSource(Source):
 	"""
@@ -17,6 +41,9 @@ class DirectSource(Source):
 
 	"""
 
+	# Events come only from routers of the same process
+	ShardSplit = True
+
 	def __init__(self, app, pipeline, id=None, config=None):
 		super().__init__(app, pipeline, id=id, config=config)
 
@@ -25,6 +52,7 @@ class DirectSource(Source):
 		This method serves to put events into the pipeline and process them right away.
 
 		Context can be an empty dictionary if is not provided.
+		`copy_event` is a copy policy, i.e. `share`, `shallow` or `deep`, or a boolean (True means `deep`).
 
 		|
 
@@ -35,8 +63,7 @@ class DirectSource(Source):
 		else:
 			child_context = {'ancestor': context}
 
-		if copy_event:
-			event = copy.deepcopy(event)
+		event = _copy_event(event, copy_event)
 
 		# DirectSource is not using the common asynchronous process method
 		self.Pipeline.MetricsEPSCounter.add('eps.in', 1)
@@ -49,10 +76,16 @@ class DirectSource(Source):
 
 class InternalSource(Source):
 
+	# Events come only from routers of the same process
+	ShardSplit = True
 
 	ConfigDefaults = {
 		'queue_max_size': 10,  # 0 means unlimited size
 		'backpressure': 0.8,  # Percentage of the queue that will result in a backpressure
+		# Credit-based flow control, the maximum number of events that routers may put into the queue
+		# 0 means that the backpressure is signalled by PubSub messages instead, see RouterMixIn
+		'credits': 0,
+		'credit_batch': 0,  # Credits granted to a router and returned by the source at once, 0 means 10 % of credits
 	}
 
 
@@ -61,7 +94,22 @@ class InternalSource(Source):
 		self.Loop = app.Loop
 
 		self.BackPressure = False
-		maxsize = int(self.Config.get('queue_max_size'))
+
+		# Credits that can be granted to routers, the queue size is bounded by credits instead of `queue_max_size`
+		self.Credits = int(self.Config.get('credits'))
+		self.CreditBased = self.Credits > 0
+		self.CreditBatch = int(self.Config.get('credit_batch'))
+		if self.CreditBatch <= 0:
+			self.CreditBatch = max(self.Credits // 10, 1)
+		self.CreditBatch = min(self.CreditBatch, max(self.Credits, 1))
+		self._credits_consumed = 0  # Credits of processed events, which are not returned yet
+		self._credit_waiters = []
+
+		if self.CreditBased:
+			maxsize = 0
+		else:
+			maxsize = int(self.Config.get('queue_max_size'))
+
 		if maxsize == 0:
 			self.BackPressureLimit = None
 		else:
@@ -73,10 +121,20 @@ class InternalSource(Source):
 			assert self.BackPressureLimit > 0
 		self.Queue = asyncio.Queue(maxsize=maxsize)
 
+		if pipeline.LatencyTracing:
+			# The time events spend in the queue, i.e. the wait between pipelines
+			self.QueueWaitHistogram = pipeline.create_latency_histogram(
+				"bspump.pipeline.trace",
+				{'pipeline': pipeline.Id, 'span': 'queue', 'source': self.Id}
+			)
+		else:
+			self.QueueWaitHistogram = None
+
 
 	def put(self, context, event, copy_context=False, copy_event=False):
 		'''
 		Description: Context can be an empty dictionary if is not provided.
+		`copy_event` is a copy policy, i.e. `share`, `shallow` or `deep`, or a boolean (True means `deep`).
 
 		If you are getting a `asyncio.queues.QueueFull` exception,
 		you likely did not implemented backpressure handling.
@@ -89,12 +147,12 @@ class InternalSource(Source):
 		if copy_context:
 			context = copy.deepcopy(context)
 
-		if copy_event:
-			event = copy.deepcopy(event)
+		event = _copy_event(event, copy_event)
 
 		self.Queue.put_nowait((
 			context,
-			event
+			event,
+			self.Loop.time() if self.QueueWaitHistogram is not None else None
 		))
 
 		if (not self.BackPressure) and (self.BackPressureLimit is not None) and (self.BackPressureLimit <= self.Queue.qsize()):
@@ -118,12 +176,12 @@ class InternalSource(Source):
 		if copy_context:
 			context = copy.deepcopy(context)
 
-		if copy_event:
-			event = copy.deepcopy(event)
+		event = _copy_event(event, copy_event)
 
 		await self.Queue.put((
 			context,
-			event
+			event,
+			self.Loop.time() if self.QueueWaitHistogram is not None else None
 		))
 
 		if (not self.BackPressure) and (self.BackPressureLimit is not None) and (self.BackPressureLimit <= self.Queue.qsize()):
@@ -136,7 +194,9 @@ class InternalSource(Source):
 
 			while True:
 				await self.Pipeline.ready()
-				context, event = await self.Queue.get()
+				context, event, enqueued = await self.Queue.get()
+				if enqueued is not None:
+					self.QueueWaitHistogram.record(self.Loop.time() - enqueued)
 
 				if (self.BackPressure) and (self.BackPressureLimit is not None) and (self.BackPressureLimit > self.Queue.qsize()):
 					self.BackPressure = False
@@ -146,11 +206,57 @@ class InternalSource(Source):
 
 				self.Queue.task_done()
 
+				if self.CreditBased:
+					self._credits_consumed += 1
+					# Credits are returned in batches, or when the queue is drained, so that no router waits for them forever
+					if self._credits_consumed >= self.CreditBatch or self.Queue.empty():
+						self.release_credits(self._credits_consumed)
+						self._credits_consumed = 0
+
 		except asyncio.CancelledError:
 			if self.Queue.qsize() > 0:
 				L.warning("'{}' stopped with {} events in a queue".format(self.locate_address(), self.Queue.qsize()))
 
 
+	def acquire_credits(self):
+		"""
+		Grants credits to a router, each credit allows to put one event into the source.
+
+		:return: the number of granted credits, at most `credit_batch`, 0 when there are no credits available.
+
+		|
+
+		"""
+		granted = min(self.CreditBatch, self.Credits)
+		self.Credits -= granted
+		return granted
+
+
+	def release_credits(self, credits):
+		"""
+		Returns credits to the source and notifies routers that wait for them.
+
+		|
+
+		"""
+		self.Credits += credits
+
+		waiters = self._credit_waiters
+		self._credit_waiters = []
+		for callback in waiters:
+			callback(self)
+
+
+	def wait_for_credits(self, callback):
+		"""
+		The `callback(source)` is called once, when credits are returned to the source.
+
+		|
+
+		"""
+		self._credit_waiters.append(callback)
+
+
 	def rest_get(self):
 		"""
 		Description:
@@ -163,6 +269,10 @@ class InternalSource(Source):
 		rest = super().rest_get()
 		rest['Queue'] = self.Queue.qsize()
 		rest['BackPressure'] = self.BackPressure
+		if self.CreditBased:
+			rest['Credits'] = self.Credits
+		if self.QueueWaitHistogram is not None:
+			rest['QueueWait'] = self.QueueWaitHistogram.summary()
 		return rest
 
 
@@ -170,10 +280,30 @@ class RouterMixIn(object):
 	"""
 	Description: Router Mix in a class
 
+	When the target InternalSource has `credits` configured, the flow control is credit-based:
+	the router acquires credits from the source in batches and spends one credit per routed event.
+	The pipeline of the router is throttled only when the credits are exhausted and no more can be acquired,
+	it is released when the source returns a batch of credits of processed events.
+	Credits that the router does not spend until the next tick of the application are returned to the source,
+	so an idle router does not hold credits that other routers of the same source wait for.
+
+	Otherwise, the router throttles its pipeline when the target pipeline is not ready
+	or when the queue of the InternalSource reaches the backpressure limit.
+
+	Routed events are copied according to the `copy_event` policy:
+	`deep` (the default) copies the event with all nested objects, `shallow` copies only the top-level container
+	and `share` passes the same event object to all targets.
+	The `share` policy is safe when events are not modified by target pipelines, e.g. when they are frozen by `bspump.freeze()`,
+	a deep copy of a frozen event is the event itself.
+
 	|
 
 	"""
 
+	ConfigDefaults = {
+		'copy_event': 'deep',  # 'share', 'shallow' or 'deep'
+	}
+
 	"""
 	Router Mix in a class
 	"""
@@ -183,6 +313,16 @@ class RouterMixIn(object):
 		self.ServiceBSPump = app.get_service("bspump.PumpService")
 		self.SourcesCache = {}
 
+		self.CopyEvent = self.Config['copy_event']
+		if self.CopyEvent not in ('share', 'shallow', 'deep'):
+			raise ValueError("Unknown copy policy '{}' of '{}', use 'share', 'shallow' or 'deep'".format(self.CopyEvent, self.Id))
+
+		self._credits = {}  # Credits held for credit-based sources, the balance can be negative when in-flight events are routed
+		self._credit_waiting = set()  # Credit-based sources that throttle the pipeline
+		self._credits_spent = set()  # Credit-based sources that events were routed to since the last tick
+
+		app.PubSub.subscribe("Application.tick!", self._on_credits_tick)
+
 
 	def locate(self, source_id):
 		"""
@@ -200,6 +340,12 @@ class RouterMixIn(object):
 
 		self.SourcesCache[source_id] = source
 
+		if getattr(source, 'CreditBased', False):
+			if source not in self._credits:
+				self._credits[source] = 0
+				self._refill_credits(source)
+			return source
+
 		source.Pipeline.PubSub.subscribe("bspump.pipeline.not_ready!", self._on_target_pipeline_ready_change)
 		source.Pipeline.PubSub.subscribe("bspump.pipeline.ready!", self._on_target_pipeline_ready_change)
 
@@ -231,6 +377,15 @@ class RouterMixIn(object):
 		except KeyError:
 			return
 
+		if source in self._credits:
+			credits = self._credits.pop(source)
+			if credits > 0:
+				source.release_credits(credits)
+			if source in self._credit_waiting:
+				self._credit_waiting.remove(source)
+				self.Pipeline.throttle(source, enable=False)
+			return
+
 		source.Pipeline.PubSub.unsubscribe("bspump.pipeline.not_ready!", self._on_target_pipeline_ready_change)
 		source.Pipeline.PubSub.unsubscribe("bspump.pipeline.ready!", self._on_target_pipeline_ready_change)
 
@@ -258,11 +413,12 @@ class RouterMixIn(object):
 		return self.route(context, event, source_id, copy_event=True)
 
 
-	def route(self, context, event, source_id, copy_event=True):
+	def route(self, context, event, source_id, copy_event=None):
 		'''
 		Description: This method routes an event to a InternalSource `source_id`.
 
 		It can be called multiple times from a process() method, which results in a cloning of the event.
+		The event is copied according to the `copy_event` policy, which defaults to the configured one.
 
 		|
 
@@ -272,7 +428,44 @@ class RouterMixIn(object):
 		if source is None:
 			source = self.locate(source_id)
 
-		source.put(context, event, copy_event=copy_event)
+		source.put(context, event, copy_event=self.CopyEvent if copy_event is None else copy_event)
+
+		credits = self._credits.get(source)
+		if credits is not None:
+			self._credits_spent.add(source)
+			self._credits[source] = credits - 1
+			if credits <= 1 and source not in self._credit_waiting:
+				self._refill_credits(source)
+
+
+	def _refill_credits(self, source):
+		credits = self._credits[source] + source.acquire_credits()
+		self._credits[source] = credits
+
+		if credits > 0:
+			if source in self._credit_waiting:
+				self._credit_waiting.remove(source)
+				self.Pipeline.throttle(source, enable=False)
+			return
+
+		if source not in self._credit_waiting:
+			self._credit_waiting.add(source)
+			self.Pipeline.throttle(source, enable=True)
+		source.wait_for_credits(self._on_credits_released)
+
+
+	def _on_credits_released(self, source):
+		if source in self._credits:
+			self._refill_credits(source)
+
+
+	def _on_credits_tick(self, event_name):
+		# Return credits of sources that the router is idle for
+		for source, credits in list(self._credits.items()):
+			if credits > 0 and source not in self._credits_spent:
+				self._credits[source] = 0
+				source.release_credits(credits)
+		self._credits_spent.clear()
 
 
 	def _on_target_pipeline_ready_change(self, event_name, pipeline):
@@ -1,5 +1,6 @@
 import logging
 from .routing import InternalSource, RouterProcessor
+from ..frozen import freeze
 
 
 L = logging.getLogger(__name__)
@@ -83,12 +84,16 @@ class TeeProcessor(RouterProcessor):
 	"""
 
 	ConfigDefaults = {
+		# Freeze the event once and share it with all targets instead of copying it for each of them,
+		# see `bspump.freeze()`, the event is frozen also for the following processors of this pipeline
+		'freeze': False,
 	}
 
 
 	def __init__(self, app, pipeline, id=None, config=None):
 		super().__init__(app, pipeline, id=id, config=config)
 		self.Targets = []
+		self.Freeze = self.Config.getboolean('freeze')
 
 
 	def bind(self, target: str):
@@ -120,6 +125,12 @@ class TeeProcessor(RouterProcessor):
 		|
 
 		"""
+		if self.Freeze:
+			event = freeze(event)
+			for source in self.Targets:
+				self.route(context, event, source, copy_event='share')
+			return event
+
 		for source in self.Targets:
 			self.route(context, event, source)
 		return event
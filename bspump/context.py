@@ -0,0 +1,131 @@
+import collections.abc
+
+
+class _Deleted(object):
+
+	def __repr__(self):
+		return "<deleted>"
+
+
+_DELETED = _Deleted()
+
+
+class Context(collections.abc.MutableMapping):
+	"""
+	Context is a layered, copy-on-write view of event context dictionaries.
+
+	Reads look into the local layer first and then into the parent layers in the given order.
+	Writes and deletions go only to the local layer, which is allocated on the first write,
+	so the parent layers are never modified and they can be shared by many events.
+
+	.. code:: python
+
+		context = bspump.Context(pipeline_context, source_context)
+		context["my_key"] = "value"  # Neither `pipeline_context` nor `source_context` is changed
+
+	:note: The parent layers must not be modified while the context is in use.
+
+	|
+
+	"""
+
+	__slots__ = ('_local', '_parents')
+
+
+	def __init__(self, *parents):
+		self._local = None
+		self._parents = parents
+
+
+	def __getitem__(self, key):
+		local = self._local
+		if local is not None and key in local:
+			value = local[key]
+			if value is _DELETED:
+				raise KeyError(key)
+			return value
+
+		for parent in self._parents:
+			if key in parent:
+				return parent[key]
+
+		raise KeyError(key)
+
+
+	def get(self, key, default=None):
+		local = self._local
+		if local is not None and key in local:
+			value = local[key]
+			if value is _DELETED:
+				return default
+			return value
+
+		for parent in self._parents:
+			if key in parent:
+				return parent[key]
+
+		return default
+
+
+	def __contains__(self, key):
+		local = self._local
+		if local is not None and key in local:
+			return local[key] is not _DELETED
+
+		for parent in self._parents:
+			if key in parent:
+				return True
+
+		return False
+
+
+	def __setitem__(self, key, value):
+		if self._local is None:
+			self._local = {}
+		self._local[key] = value
+
+
+	def __delitem__(self, key):
+		if key not in self:
+			raise KeyError(key)
+
+		for parent in self._parents:
+			if key in parent:
+				# The key has to be hidden in the local layer, parents are not modified
+				self.__setitem__(key, _DELETED)
+				return
+
+		del self._local[key]
+
+
+	def __iter__(self):
+		seen = set()
+
+		if self._local is not None:
+			for key, value in self._local.items():
+				seen.add(key)
+				if value is not _DELETED:
+					yield key
+
+		for parent in self._parents:
+			for key in parent:
+				if key in seen:
+					continue
+				seen.add(key)
+				yield key
+
+
+	def __len__(self):
+		return sum(1 for _ in self)
+
+
+	def copy(self):
+		"""
+		Returns a flattened copy of the context as a new dictionary.
+
+		"""
+		return dict(self)
+
+
+	def __repr__(self):
+		return repr(dict(self))
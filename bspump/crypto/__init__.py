@@ -1,6 +1,11 @@
-from .aes import DecryptAESProcessor
-from .aes import EncryptAESProcessor
-from .hashing import HashingProcessor, CoHashingProcessor
+from ..lazy import lazy_import
+
+__getattr__, __dir__ = lazy_import(__name__, {
+	"DecryptAESProcessor": ".aes",
+	"EncryptAESProcessor": ".aes",
+	"HashingProcessor": ".hashing",
+	"CoHashingProcessor": ".hashing",
+})
 
 '''
 Test AES
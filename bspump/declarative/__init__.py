@@ -1,18 +1,20 @@
 import asab
 
-from .processor import DeclarativeProcessor
-from .generator import DeclarativeGenerator
-from .timewindowanalyzer import DeclarativeTimeWindowAnalyzer
-
-from .builder import ExpressionBuilder
-from .optimizer import ExpressionOptimizer
-from .declerror import DeclarationError
-from .segmentbuilder import SegmentBuilder
-
-from .abc import Expression
-from .abc import SequenceExpression
-
-from .dot import declaration_to_dot, declaration_to_dot_stream
+from ..lazy import lazy_import
+
+__getattr__, __dir__ = lazy_import(__name__, {
+	"DeclarativeProcessor": ".processor",
+	"DeclarativeGenerator": ".generator",
+	"DeclarativeTimeWindowAnalyzer": ".timewindowanalyzer",
+	"ExpressionBuilder": ".builder",
+	"ExpressionOptimizer": ".optimizer",
+	"DeclarationError": ".declerror",
+	"SegmentBuilder": ".segmentbuilder",
+	"Expression": ".abc",
+	"SequenceExpression": ".abc",
+	"declaration_to_dot": ".dot",
+	"declaration_to_dot_stream": ".dot",
+})
 
 
 asab.Config.add_defaults({
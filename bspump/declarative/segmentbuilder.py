@@ -118,6 +118,8 @@ class SegmentBuilder(object):
 					pipeline.append_processor(processor)
 					pipeline.append_processor(sink)
 				self.build_profiling(pipeline, processor)
+				# The profiler counters have been replaced, so the execution plan has to be updated
+				pipeline.compile()
 
 	def construct_lookup(self, app, definition):
 		_module = importlib.import_module(definition["module"])
@@ -151,3 +153,5 @@ class SegmentBuilder(object):
 				init_values={'duration': 0.0, 'run': 0},
 				reset=pipeline.ResetProfiler,
 			)
+
+		pipeline.build_latency_profiling(processor)
@@ -1,4 +1,4 @@
-from ..analyzer import TimeWindowAnalyzer
+from ..analyzer.timewindowanalyzer import TimeWindowAnalyzer
 from .builder import ExpressionBuilder
 from .abc import Expression, evaluate
 
@@ -1,7 +1,12 @@
-from .connection import ElasticSearchConnection
-from .sink import ElasticSearchSink
-from .source import ElasticSearchSource, ElasticSearchAggsSource
-from .lookup import ElasticSearchLookup
+from ..lazy import lazy_import
+
+__getattr__, __dir__ = lazy_import(__name__, {
+	"ElasticSearchConnection": ".connection",
+	"ElasticSearchSink": ".sink",
+	"ElasticSearchSource": ".source",
+	"ElasticSearchAggsSource": ".source",
+	"ElasticSearchLookup": ".lookup",
+})
 
 __all__ = [
 	"ElasticSearchConnection",
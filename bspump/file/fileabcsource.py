@@ -1,9 +1,9 @@
-import asyncio
 import logging
 import os
-
 import time
 
+import asab
+
 from .globscan import _glob_scan
 from ..abc.source import TriggerSource
 
@@ -13,6 +13,8 @@ L = logging.getLogger(__file__)
 
 class FileABCSource(TriggerSource):
 
+	# A file is locked by renaming before it is read, so every file is read by one shard worker only
+	ShardSplit = True
 
 	ConfigDefaults = {
 		'path': '',
@@ -23,8 +25,6 @@ class FileABCSource(TriggerSource):
 		'include': '',  # glob of filenames that should be included
 		'encoding': '',
 		'move_destination': '',  # destination folder for 'move'. Make sure it's outside of the glob search
-		'lines_per_event': 10000,  # the number of lines after which the read method enters the idle state to allow other operations to perform their tasks
-		'event_idle_time': 0.01,  # the time for which the read method enters the idle state (see above)
 	}
 
 
@@ -87,9 +87,13 @@ class FileABCSource(TriggerSource):
 		self.Loop = app.Loop
 		self.ProactorService = app.get_service("asab.ProactorService")
 
-		self.LinesCounter = 0
-		self.LinesPerEvent = int(self.Config["lines_per_event"])
-		self.EventIdleTime = float(self.Config["event_idle_time"])
+		# The read method yields to the event loop by the scheduler of the pipeline, see `simulate_event()`
+		for option in ("lines_per_event", "event_idle_time"):
+			if option in self.Config:
+				asab.LogObsolete.warning(
+					"The '{}' option of '{}' is ignored, configure the time budget in [bspump:scheduler] instead.".format(option, self.Id)
+				)
+
 
 	async def cycle(self):
 		"""
@@ -214,12 +218,11 @@ class FileABCSource(TriggerSource):
 
 		It ensures that all other asynchronous events receive enough time to perform their tasks.
 		Otherwise, the application loop is blocked by a file reader and no other activity makes a progress.
+		The read method yields to the event loop when the time budget of the pipeline slice is exhausted,
+		see `[bspump:scheduler]` configuration.
 
 		"""
-		self.LinesCounter += 1
-		if self.LinesCounter >= self.LinesPerEvent:
-			await asyncio.sleep(self.EventIdleTime)
-			self.LinesCounter = 0
+		await self.Pipeline.chillout()
 
 	async def read(self, filename, f):
 		"""
@@ -11,6 +11,10 @@ L = logging.getLogger(__file__)
 
 class FileLineSource(FileABCSource):
 
+	ConfigDefaults = {
+		'batch_size': 0,  # the number of lines that are sent to the pipeline at once, 0 means line by line
+	}
+
 	def __init__(self, app, pipeline, id=None, config=None):
 		"""
 		Description:
@@ -30,6 +34,7 @@ class FileLineSource(FileABCSource):
 
 		"""
 		super().__init__(app, pipeline, id=id, config=config)
+		self.BatchSize = int(self.Config['batch_size'])
 
 
 	async def read(self, filename, f):
@@ -44,6 +49,10 @@ class FileLineSource(FileABCSource):
 
 		"""
 
+		if self.BatchSize > 0:
+			await self.read_batch(filename, f)
+			return
+
 		for line in f:
 
 			await self.process(line, {
@@ -52,6 +61,37 @@ class FileLineSource(FileABCSource):
 
 			await self.simulate_event()
 
+
+	async def read_batch(self, filename, f):
+		"""
+		Description: Reads the file in batches of `batch_size` lines and sends each batch to the pipeline at once.
+
+		**Parameters**
+
+		filename :
+
+		f :
+
+		"""
+		batch = []
+
+		for line in f:
+			batch.append(line)
+			if len(batch) < self.BatchSize:
+				continue
+
+			await self.process_batch(batch, {
+				"filename": filename
+			})
+			await self.simulate_event()
+			batch = []
+
+		if len(batch) > 0:
+			await self.process_batch(batch, {
+				"filename": filename
+			})
+			await self.simulate_event()
+
 #
 
 
@@ -1,6 +1,10 @@
-from .attributefilter import AttributeFilter
-from .contentfilter import ContentFilter
-from .timedriftfilter import TimeDriftFilter
+from ..lazy import lazy_import
+
+__getattr__, __dir__ = lazy_import(__name__, {
+	"AttributeFilter": ".attributefilter",
+	"ContentFilter": ".contentfilter",
+	"TimeDriftFilter": ".timedriftfilter",
+})
 
 __all__ = [
 	'AttributeFilter',
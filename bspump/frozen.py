@@ -0,0 +1,82 @@
+class FrozenDict(dict):
+	"""
+	FrozenDict is a read-only dictionary, an immutable event that can be shared by many pipelines without copying.
+
+	It is a subclass of `dict`, so it is accepted wherever a dictionary event is expected, e.g. by JSON serializers,
+	but every attempt to modify it raises `TypeError`.
+	Copies of a frozen dictionary, both shallow and deep, are the dictionary itself, the same way as of a tuple.
+
+	A processor that needs to modify a frozen event can use a copy-on-write view of it,
+	see :meth:`Context <bspump.Context()>`, or create a mutable copy by `dict(event)`.
+
+	.. code:: python
+
+		event = bspump.freeze({"user": "alice", "tags": ["a", "b"]})
+		event["tags"]  # ('a', 'b')
+
+		view = bspump.Context(event)
+		view["user"] = "bob"  # `event` is not changed
+
+	|
+
+	"""
+
+	__slots__ = ()
+
+
+	def _readonly(self, *args, **kwargs):
+		raise TypeError("'{}' object is read-only".format(type(self).__name__))
+
+	__setitem__ = _readonly
+	__delitem__ = _readonly
+	__ior__ = _readonly
+	clear = _readonly
+	pop = _readonly
+	popitem = _readonly
+	setdefault = _readonly
+	update = _readonly
+
+
+	def __copy__(self):
+		return self
+
+
+	def __deepcopy__(self, memo):
+		return self
+
+
+	def __reduce__(self):
+		return (type(self), (dict(self),))
+
+
+	def __hash__(self):
+		return hash(frozenset(self.items()))
+
+
+	def __repr__(self):
+		return "{}({})".format(type(self).__name__, dict.__repr__(self))
+
+
+def freeze(obj):
+	"""
+	Returns an immutable version of the `obj`.
+
+	Dictionaries are converted to `FrozenDict`, lists to tuples and sets to frozensets, recursively.
+	Other objects, e.g. strings, numbers or bytes, are returned as they are.
+
+	|
+
+	"""
+	if isinstance(obj, FrozenDict):
+		return obj
+
+	if isinstance(obj, dict):
+		return FrozenDict((key, freeze(value)) for key, value in obj.items())
+
+	if isinstance(obj, list) or type(obj) is tuple:
+		return tuple(freeze(item) for item in obj)
+
+	if isinstance(obj, set):
+		return frozenset(freeze(item) for item in obj)
+
+	return obj
@@ -0,0 +1,119 @@
+import math
+
+
+class LatencyHistogram(object):
+	"""
+	LatencyHistogram is a log-bucketed (HDR-style) histogram of durations in seconds.
+
+	Every power of two is split into `SubBuckets` linear buckets, so a percentile is reported
+	with a relative error below `1 / SubBuckets` over the whole range of the histogram,
+	while recording a value costs only a couple of arithmetic operations.
+
+	.. code:: python
+
+		histogram = bspump.LatencyHistogram()
+		histogram.record(0.0042)
+		histogram.percentile(99)
+
+	|
+
+	"""
+
+	SubBuckets = 16
+	MinExponent = -24  # 2^-25 s, about 30 ns, shorter durations fall into the first bucket
+	MaxExponent = 12  # 2^12 s, about 68 minutes, longer durations fall into the last bucket
+
+	__slots__ = ('Counts', 'Count', 'Sum', 'Max')
+
+
+	def __init__(self):
+		self.Counts = [0] * ((self.MaxExponent - self.MinExponent + 1) * self.SubBuckets)
+		self.Count = 0
+		self.Sum = 0.0
+		self.Max = 0.0
+
+
+	def record(self, value, weight=1):
+		"""
+		Records a duration.
+
+		**Parameters**
+
+		value : float
+				Duration in seconds.
+
+		weight : int, default 1
+				Number of events the duration stands for, e.g. when the events are sampled.
+
+		"""
+		if value > self.Max:
+			self.Max = value
+		self.Count += weight
+		self.Sum += value * weight
+
+		# value = mantissa * 2^exponent, 0.5 <= mantissa < 1
+		mantissa, exponent = math.frexp(value)
+		if exponent < self.MinExponent or value <= 0:
+			index = 0
+		elif exponent > self.MaxExponent:
+			index = len(self.Counts) - 1
+		else:
+			index = (exponent - self.MinExponent) * self.SubBuckets + int((mantissa - 0.5) * 2 * self.SubBuckets)
+
+		self.Counts[index] += weight
+
+
+	def percentile(self, percent):
+		"""
+		Returns the duration below which `percent` of recorded durations fall.
+
+		**Parameters**
+
+		percent : float
+				Percentile in the range 0 - 100.
+
+		:return: The upper bound of the bucket of the percentile, but at most the maximal recorded value. 0.0 if the histogram is empty.
+
+		"""
+		if self.Count == 0:
+			return 0.0
+
+		rank = max(math.ceil(self.Count * percent / 100.0), 1)
+		cumulative = 0
+		for index, count in enumerate(self.Counts):
+			cumulative += count
+			if cumulative >= rank:
+				if index == len(self.Counts) - 1:
+					break  # The last bucket has no upper bound
+				exponent, sub_bucket = divmod(index, self.SubBuckets)
+				upper = math.ldexp(0.5 + (sub_bucket + 1) / (2 * self.SubBuckets), exponent + self.MinExponent)
+				return min(upper, self.Max)
+
+		return self.Max
+
+
+	def summary(self):
+		"""
+		:return: dictionary with the count, mean, p50, p90, p99 and max of recorded durations.
+
+		"""
+		return {
+			'count': self.Count,
+			'mean': self.Sum / self.Count if self.Count > 0 else 0.0,
+			'p50': self.percentile(50),
+			'p90': self.percentile(90),
+			'p99': self.percentile(99),
+			'max': self.Max,
+		}
+
+
+	def reset(self):
+		"""
+		Removes all recorded durations.
+
+		"""
+		for index in range(len(self.Counts)):
+			self.Counts[index] = 0
+		self.Count = 0
+		self.Sum = 0.0
+		self.Max = 0.0
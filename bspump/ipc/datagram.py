@@ -30,6 +30,7 @@ class DatagramSource(Source):
 		'address': '127.0.0.1 8888',  # IPv4, IPv6 or unix socket path
 		'max_packet_size': 64 * 1024,
 		'receiver_buffer_size': 0,
+		'batch_size': 0,  # Maximum number of already received datagrams sent to the pipeline at once, 0 means one by one
 	}
 
 
@@ -38,6 +39,7 @@ class DatagramSource(Source):
 
 		self.ReceiveBufferSize = int(self.Config['receiver_buffer_size'])
 		self.MaxPacketSize = int(self.Config['max_packet_size'])
+		self.BatchSize = int(self.Config['batch_size'])
 
 		self.Address = self.Config['address']
 		if isinstance(self.Address, int):
@@ -155,7 +157,10 @@ class DatagramSource(Source):
 				await self.Pipeline.ready()
 				event, peer = await loop.sock_recvfrom(sock, self.MaxPacketSize)
 				await self.Pipeline.ready()
-				await self.process(event, context={'datagram': peer})
+				if self.BatchSize > 0:
+					await self._process_batch(sock, event, peer)
+				else:
+					await self.process(event, context={'datagram': peer})
 
 			except asyncio.CancelledError:
 				break
@@ -170,6 +175,28 @@ class DatagramSource(Source):
 				raise
 
 
+	async def _process_batch(self, sock, event, peer):
+		'''
+		Drains datagrams that are already waiting in the socket (without blocking)
+		and sends them to the pipeline in batches of consecutive datagrams from the same peer.
+		'''
+		batch = [event]
+		for _ in range(self.BatchSize - 1):
+			try:
+				event, next_peer = sock.recvfrom(self.MaxPacketSize)
+			except BlockingIOError:
+				break
+
+			if next_peer != peer:
+				await self.process_batch(batch, context={'datagram': peer})
+				batch = []
+				peer = next_peer
+
+			batch.append(event)
+
+		await self.process_batch(batch, context={'datagram': peer})
+
+
 	async def _handle_sock_pre_311(self, sock):
 		'''
 		This method provides backward compatibility with Python 3.10 and lower.
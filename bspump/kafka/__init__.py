@@ -1,8 +1,12 @@
-from .connection import KafkaConnection
-from .source import KafkaSource
-from .sink import KafkaSink
-from .keyfilter import KafkaKeyFilter
-from .topic_initializer import KafkaTopicInitializer
+from ..lazy import lazy_import
+
+__getattr__, __dir__ = lazy_import(__name__, {
+	"KafkaConnection": ".connection",
+	"KafkaSource": ".source",
+	"KafkaSink": ".sink",
+	"KafkaKeyFilter": ".keyfilter",
+	"KafkaTopicInitializer": ".topic_initializer",
+})
 
 __all__ = [
 	"KafkaConnection",
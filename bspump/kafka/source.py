@@ -39,6 +39,10 @@ class KafkaSource(Source):
 	in the producer-consumer mode. It means that every consumer with the same group_id will be assigned
 	unique set of partitions, hence all messages will be divided among them and thus unique.
 
+	The same applies to shard workers (see `bspump.shard`), they share the `group.id`,
+	so every worker consumes only partitions that Kafka assigned to it. Workers must not filter
+	received messages by the partition, filtered messages would be lost, because their offsets are committed.
+
 	Long-running synchronous operations should be avoided or places inside the OOBGenerator in the asynchronous
 	way or on thread using ASAB Proactor service (see bspump-oob-proactor.py example in "examples" folder).
 	Otherwise, the session_timeout_ms should be raised to prevent Kafka from disconnecting the consumer
@@ -51,6 +55,9 @@ class KafkaSource(Source):
 	https://github.com/edenhill/librdkafka/blob/master/CONFIGURATION.md
 	"""
 
+	# Shard workers are members of the same consumer group
+	ShardSplit = True
+
 	ConfigDefaults = {
 		"topic": "unconfigured",
 		"refresh_topics": 0,
@@ -65,6 +72,7 @@ class KafkaSource(Source):
 		"poll_interval": 0.3,
 		"buffer_size": 1000,
 		"buffer_timeout": 1.0,
+		"batch": False,  # Pass the buffered messages to the pipeline in batches, see `process_batch()`
 		"sleep_on_error": 3.0,
 		"sleep_on_retryable_error": 60.0,
 		"check_assignment_errors": 5.0,  # How often to check assignment errors
@@ -149,7 +157,7 @@ class KafkaSource(Source):
 		# Copy configuration options, avoid the topic
 		for key, value in self.Config.items():
 
-			if key in ["topic", "refresh_topics", "consumer_threads", "check_assignment_errors"]:
+			if key in ["topic", "refresh_topics", "consumer_threads", "check_assignment_errors", "batch"]:
 				continue
 
 			if key in self.SpecialKeys:
@@ -174,6 +182,9 @@ class KafkaSource(Source):
 
 		self.Running = True
 
+		# Messages of the same topic partition are sent to the pipeline in batches
+		self.Batch = self.Config.getboolean("batch")
+
 		# For refreshing of topics/subscription
 		self.RefreshTopics = int(self.Config["refresh_topics"])
 
@@ -323,39 +334,43 @@ class KafkaSource(Source):
 
 				try:
 
-					for m in messages:
+					if self.Batch:
+						await self._process_batches(consumer, messages)
 
-						# Store the offset associated with msg to a local cache.
-						# Stored offsets are committed to Kafka by a background thread every 'auto.commit.interval.ms'.
-						# Explicitly storing offsets after processing gives at-least once semantics.
-						try:
+					else:
+						for m in messages:
 
-							await self.process(m.value(), context={
-								"kafka_key": m.key(),
-								"kafka_headers": m.headers(),
-								"_kafka_topic": m.topic(),
-								"_kafka_partition": m.partition(),
-								"_kafka_offset": m.offset(),
-							})
+							# Store the offset associated with msg to a local cache.
+							# Stored offsets are committed to Kafka by a background thread every 'auto.commit.interval.ms'.
+							# Explicitly storing offsets after processing gives at-least once semantics.
+							try:
 
-							if consumer:
-								consumer.store_offsets(m)
+								await self.process(m.value(), context={
+									"kafka_key": m.key(),
+									"kafka_headers": m.headers(),
+									"_kafka_topic": m.topic(),
+									"_kafka_partition": m.partition(),
+									"_kafka_offset": m.offset(),
+								})
 
-						except confluent_kafka.KafkaException as err:
+								if consumer:
+									consumer.store_offsets(m)
 
-							# Reballacing of partitions happened during consuming,
-							# so this consumer no longer owns the partition
-							# -> let the other consumer consume the events and here just finish
-							# https://medium.com/@a.a.halutin/simple-examples-with-confluent-kafka-9b7e58534a88
-							if err.args[0].code() == confluent_kafka.KafkaError._STATE:
-								break
+							except confluent_kafka.KafkaException as err:
 
-							L.warning("The following warning occurred inside Kafka consumer: '{}'".format(err))
-							break
+								# Reballacing of partitions happened during consuming,
+								# so this consumer no longer owns the partition
+								# -> let the other consumer consume the events and here just finish
+								# https://medium.com/@a.a.halutin/simple-examples-with-confluent-kafka-9b7e58534a88
+								if err.args[0].code() == confluent_kafka.KafkaError._STATE:
+									break
 
-						except RuntimeError as e:
-							L.exception("Error storing offsets, possible consumer state issue: '{}'".format(e))
-							break
+								L.warning("The following warning occurred inside Kafka consumer: '{}'".format(err))
+								break
+
+							except RuntimeError as e:
+								L.exception("Error storing offsets, possible consumer state issue: '{}'".format(e))
+								break
 
 				finally:
 
@@ -389,6 +404,53 @@ class KafkaSource(Source):
 							break
 
 
+	async def _process_batches(self, consumer, messages):
+		"""
+		Sends messages to the pipeline in batches of consecutive messages from the same topic partition.
+		The per-message `kafka_key` and `kafka_headers` are not available in the batch context.
+		"""
+		batch_start = 0
+
+		while batch_start < len(messages):
+			first = messages[batch_start]
+			topic = first.topic()
+			partition = first.partition()
+
+			batch_end = batch_start + 1
+			while batch_end < len(messages):
+				m = messages[batch_end]
+				if m.partition() != partition or m.topic() != topic:
+					break
+				batch_end += 1
+
+			batch = messages[batch_start:batch_end]
+			batch_start = batch_end
+
+			try:
+
+				await self.process_batch([m.value() for m in batch], context={
+					"_kafka_topic": topic,
+					"_kafka_partition": partition,
+					"_kafka_offset": first.offset(),
+				})
+
+				# Storing the offset of the last message marks the whole batch as processed
+				if consumer:
+					consumer.store_offsets(batch[-1])
+
+			except confluent_kafka.KafkaException as err:
+
+				if err.args[0].code() == confluent_kafka.KafkaError._STATE:
+					break
+
+				L.warning("The following warning occurred inside Kafka consumer: '{}'".format(err))
+				break
+
+			except RuntimeError as e:
+				L.exception("Error storing offsets, possible consumer state issue: '{}'".format(e))
+				break
+
+
 	async def main(self):
 
 		while self.Running:
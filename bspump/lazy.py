@@ -0,0 +1,55 @@
+import importlib
+
+
+def lazy_import(package, exports):
+	"""
+	Creates module-level `__getattr__` and `__dir__` functions (PEP 562) that import the exported names of a package
+	only when they are accessed for the first time.
+
+	Importing a package, e.g. `bspump.matrix`, is then cheap and heavy dependencies of its modules,
+	e.g. `numpy`, are loaded only when a component that needs them is used.
+	An imported name is stored in the globals of the package, so `__getattr__` is called once per name.
+
+	**Parameters**
+
+	package : str
+			Name of the package, i.e. `__name__`.
+
+	exports : dict
+			Maps exported names to relative module names, `".module"`,
+			or to `".module:attribute"` when the exported name differs from the name in the module.
+
+	.. code:: python
+
+		__getattr__, __dir__ = lazy_import(__name__, {
+			"Matrix": ".matrix",
+			"NamedMatrix": ".namedmatrix",
+		})
+
+	|
+
+	"""
+	module = importlib.import_module(package)
+
+	def __getattr__(name):
+		target = exports.get(name)
+		if target is None:
+			# Subpackages and modules are accessible as attributes, as if they were imported by the package
+			try:
+				value = importlib.import_module("{}.{}".format(package, name))
+			except ModuleNotFoundError as e:
+				if e.name != "{}.{}".format(package, name):
+					raise
+				raise AttributeError("module '{}' has no attribute '{}'".format(package, name)) from None
+
+		else:
+			module_name, _, attribute = target.partition(':')
+			value = getattr(importlib.import_module(module_name, package), attribute or name)
+
+		setattr(module, name, value)
+		return value
+
+	def __dir__():
+		return sorted(set(vars(module)) | set(exports))
+
+	return __getattr__, __dir__
@@ -1,6 +1,13 @@
-from .index import Index, BitMapIndex, TreeRangeIndex, SliceIndex
-from .ipgeolookup import IPGeoLookup
-from .matrixlookup import MatrixLookup
+from ..lazy import lazy_import
+
+__getattr__, __dir__ = lazy_import(__name__, {
+	"Index": ".index",
+	"BitMapIndex": ".index",
+	"TreeRangeIndex": ".index",
+	"SliceIndex": ".index",
+	"IPGeoLookup": ".ipgeolookup",
+	"MatrixLookup": ".matrixlookup",
+})
 
 __all__ = (
 	'IPGeoLookup',
@@ -1,3 +1,4 @@
+import bisect
 import logging
 
 import numpy as np
@@ -15,9 +16,20 @@ class Index(object):
 		self.Id = id if id is not None else self.__class__.__name__
 
 	def update(self, matrix):
+		'''
+			Rebuilds the index over all rows of the matrix.
+		'''
 		pass
 
 
+	def apply_changes(self, matrix, added_rows, removed_rows):
+		'''
+			Updates the index after rows have been added to or removed from the matrix, see `NamedMatrix.flush_changes()`.
+			Indexes without an incremental update are rebuilt.
+		'''
+		self.update(matrix)
+
+
 	def serialize(self):
 		return {
 			'id': self.Id,
@@ -33,18 +45,12 @@ class BitMapIndex(Index):
 	def __init__(self, column, matrix, id=None):
 		'''
 			Make sure, that column values are discreet.
-			Also the creation procedure is relatively slow.
 		'''
 		super().__init__(id=id)
 		self.Column = column
 		self.BitMap = {}
-
-		open_rows = list(matrix.I2NMap.keys())
-		self.UniqueValues = list(np.unique(matrix.Array[self.Column][open_rows]))
-
-		for u in self.UniqueValues:
-			x = np.where(matrix.Array[self.Column] == u)
-			self.BitMap[int(u)] = set(x[0].tolist())
+		self.RowValues = {}
+		self.update(matrix)
 
 
 	def search(self, value):
@@ -55,23 +61,39 @@ class BitMapIndex(Index):
 		return set(self.BitMap.get(str(value), []))
 
 
-
 	def update(self, matrix):
-		open_rows = list(matrix.I2NMap.keys())
-		unique_values = set(np.unique(matrix.Array[self.Column][open_rows]))
-		set_difference_left = set(self.UniqueValues) - unique_values  # there are some deleted vals
-		set_difference_right = unique_values - set(self.UniqueValues)  # there are some added vals
+		self.BitMap = {}
+		self.RowValues = {}
+		rows = matrix.Index.get_rows()
+		self._add_rows(rows, matrix.Array[self.Column][rows])
+
 
-		if len(set_difference_left) != 0:
-			for set_member in set_difference_left:
-				self.BitMap.pop(set_member)
+	def apply_changes(self, matrix, added_rows, removed_rows):
+		self._remove_rows(removed_rows)
+		self._add_rows(added_rows, matrix.Array[self.Column][added_rows])
+
+
+	def _add_rows(self, rows, values):
+		self._remove_rows(rows)  # Rows that are already indexed have got new values
+		for row, value in zip(rows.tolist(), values.tolist()):
+			key = str(value)
+			self.RowValues[row] = key
+			bitmap = self.BitMap.get(key)
+			if bitmap is None:
+				self.BitMap[key] = {row}
+			else:
+				bitmap.add(row)
 
-		if len(set_difference_right) != 0:
-			for set_member in set_difference_right:
-				x = np.where(matrix.Array[self.Column] == set_member)
-				self.BitMap[str(set_member)] = set(x[0].tolist())
 
-		self.UniqueValues = list(unique_values)
+	def _remove_rows(self, rows):
+		for row in rows.tolist():
+			key = self.RowValues.pop(row, None)
+			if key is None:
+				continue
+			bitmap = self.BitMap[key]
+			bitmap.discard(row)
+			if len(bitmap) == 0:
+				del self.BitMap[key]
 
 
 	def serialize(self):
@@ -90,12 +112,13 @@ class BitMapIndex(Index):
 
 	def deserialize(self, data):
 		self.BitMap = {}
+		self.RowValues = {}
 		self.Column = data['column']
 
 		for key in data['bitmap']:
 			self.BitMap[key] = set(data['bitmap'][key])
-
-		self.UniqueValues = list(self.BitMap.keys())
+			for row in self.BitMap[key]:
+				self.RowValues[row] = key
 
 
 
@@ -104,51 +127,44 @@ class TreeRangeIndex(Index):
 		super().__init__(id=id)
 		self.ColumnStart = column_start
 		self.ColumnEnd = column_end
-		ranges = set()
-
-		open_rows = list(matrix.I2NMap.keys())
-		unique_start = np.unique(matrix.Array[column_start][open_rows])
-		ranges |= set(unique_start)
-		unique_end = np.unique(matrix.Array[column_end][open_rows])
-		ranges |= set(unique_end)
-
-		assert len(unique_start) == len(unique_end)  # ranges overlapping
-
-		self.Ranges = sorted(list(ranges))
+		self.Ranges = []
+		self.RowRanges = {}
 
 		self.MinValue = None
 		self.MaxValue = None
 		self.Tree = None
 
-		if len(self.Ranges) != 0:
-			self.MinValue = int(self.Ranges[0])
-			self.MaxValue = int(self.Ranges[-1])
-
-			self.Tree = self.sorted_array_to_bst(matrix, self.Ranges, [], [])
+		self.update(matrix)
 
 
 	def search(self, value):
-		if self.Tree is None:
+		leaf = self._find_leaf(value)
+		if leaf is None:
 			return set()
 
+		return set(leaf['indexes'])
+
+
+	def _find_leaf(self, value):
+		if self.Tree is None:
+			return None
+
 		if (value < self.MinValue) or (value >= self.MaxValue):
-			return set()
+			return None
 
 		subtree = self.Tree
 		while True:
 			node = subtree['node']
 			if node is None:
-				return set(subtree['indexes'])
+				return subtree
 
 			if value < node:
 				subtree = subtree['left']
 			else:
 				subtree = subtree['right']
 
-		return set()
 
-
-	def sorted_array_to_bst(self, matrix, arr, path, mask):
+	def sorted_array_to_bst(self, matrix, arr, path, mask, rows=None):
 		if not arr:
 			mask_ = mask + [False]
 			if np.any(mask):
@@ -162,11 +178,12 @@ class TreeRangeIndex(Index):
 				path_ = path + [-float('inf')]
 				r = tuple([path_[-1], path_[-2]])
 
-			condition = (matrix.Array[self.ColumnEnd] <= r[1]) & (matrix.Array[self.ColumnStart] >= r[0])
-			indexes = np.where(condition)
+			if rows is None:
+				rows = np.arange(matrix.Array.shape[0])
+			condition = (matrix.Array[self.ColumnEnd][rows] <= r[1]) & (matrix.Array[self.ColumnStart][rows] >= r[0])
 			result = {
 				'node': None,
-				'indexes': indexes[0].tolist(),
+				'indexes': rows[condition].tolist(),
 				'left': None,
 				'right': None
 			}
@@ -175,28 +192,23 @@ class TreeRangeIndex(Index):
 
 		mid = int(len(arr) / 2)
 		root = dict(node=int(arr[mid]), indexes=[])
-		root['left'] = self.sorted_array_to_bst(matrix, arr[:mid], path + [arr[mid]], mask + [False])
-		root['right'] = self.sorted_array_to_bst(matrix, arr[mid + 1:], path + [arr[mid]], mask + [True])
+		root['left'] = self.sorted_array_to_bst(matrix, arr[:mid], path + [arr[mid]], mask + [False], rows)
+		root['right'] = self.sorted_array_to_bst(matrix, arr[mid + 1:], path + [arr[mid]], mask + [True], rows)
 		return root
 
 
 	def update(self, matrix):
+		rows = matrix.Index.get_rows()
+		starts = matrix.Array[self.ColumnStart][rows]
+		ends = matrix.Array[self.ColumnEnd][rows]
+		self.RowRanges = dict(zip(rows.tolist(), zip(starts.tolist(), ends.tolist())))
+
 		ranges = set()
-		open_rows = list(matrix.I2NMap.keys())
-		unique_start = np.unique(matrix.Array[self.ColumnStart][open_rows])
+		unique_start = np.unique(starts)
 		ranges |= set(unique_start)
-		unique_end = np.unique(matrix.Array[self.ColumnEnd][open_rows])
+		unique_end = np.unique(ends)
 		ranges |= set(unique_end)
 
-		# TODO: optimize this monster
-		# if open_rows == self.OpenRows:
-		# 	# partial update
-		# 	# a) deleted values
-		# 	# b) added values
-		# 	# c) updated values, bug
-		# else:
-		# 	# full update
-
 		assert len(unique_start) == len(unique_end)  # ranges overlapping
 		self.Ranges = sorted(list(ranges))
 
@@ -207,7 +219,40 @@ class TreeRangeIndex(Index):
 		if len(self.Ranges) != 0:
 			self.MinValue = self.Ranges[0]
 			self.MaxValue = self.Ranges[-1]
-			self.Tree = self.sorted_array_to_bst(matrix, self.Ranges, [], [])
+			# Only open rows are indexed, closed rows are cleared and they would match the lowest range
+			self.Tree = self.sorted_array_to_bst(matrix, self.Ranges, [], [], rows)
+
+
+	def apply_changes(self, matrix, added_rows, removed_rows):
+		'''
+			Removed rows are removed from leaves of the tree, added rows are added to the leaf of their range.
+			The tree is rebuilt when a range of an added row does not match any leaf.
+		'''
+		if self.Tree is None or self.RowRanges is None:
+			self.update(matrix)
+			return
+
+		for row in removed_rows.tolist():
+			row_range = self.RowRanges.pop(row, None)
+			if row_range is None:
+				continue
+			leaf = self._find_leaf(row_range[0])
+			if leaf is not None and row in leaf['indexes']:
+				leaf['indexes'].remove(row)
+
+		starts = matrix.Array[self.ColumnStart][added_rows].tolist()
+		ends = matrix.Array[self.ColumnEnd][added_rows].tolist()
+		for row, start, end in zip(added_rows.tolist(), starts, ends):
+			# The range of the row must be a leaf, i.e. the start and the end are neighbouring boundaries
+			i = bisect.bisect_left(self.Ranges, start)
+			if i + 1 >= len(self.Ranges) or self.Ranges[i] != start or self.Ranges[i + 1] != end:
+				self.update(matrix)
+				return
+
+			leaf = self._find_leaf(start)
+			if row not in leaf['indexes']:
+				leaf['indexes'].append(row)
+			self.RowRanges[row] = (start, end)
 
 
 	def serialize(self):
@@ -233,6 +278,7 @@ class TreeRangeIndex(Index):
 		self.Tree = data['tree']
 		self.ColumnStart = data['column_start']
 		self.ColumnEnd = data['column_end']
+		self.RowRanges = None  # Not serialized, the next change rebuilds the index
 
 
 class SliceIndex(Index):
@@ -245,6 +291,7 @@ class SliceIndex(Index):
 		self.MinValue = None
 		self.MaxValue = None
 		self.SliceMap = None
+		self.RowRanges = None
 		self._create_slices(matrix)
 
 
@@ -257,30 +304,66 @@ class SliceIndex(Index):
 
 	def update(self, matrix):
 		self._create_slices(matrix)
-		print(len(self.SliceMap), self.MinValue, self.MaxValue, self.Resolution)
+
+
+	def apply_changes(self, matrix, added_rows, removed_rows):
+		'''
+			Rows are added to and removed from their slices.
+			The slices are recreated when a range of an added row exceeds the current slices.
+		'''
+		if self.SliceMap is None or self.RowRanges is None:
+			self._create_slices(matrix)
+			return
+
+		for row in removed_rows.tolist():
+			row_range = self.RowRanges.pop(row, None)
+			if row_range is None:
+				continue
+			for key in self._slice_keys(*row_range):
+				rows = self.SliceMap.get(key)
+				if rows is not None and row in rows:
+					rows.remove(row)
+
+		starts = matrix.Array[self.ColumnStart][added_rows].tolist()
+		ends = matrix.Array[self.ColumnEnd][added_rows].tolist()
+		for row, start, end in zip(added_rows.tolist(), starts, ends):
+			if (start < self.MinValue) or (end > self.MaxValue):
+				self._create_slices(matrix)
+				return
+
+			for key in self._slice_keys(start, end):
+				self.SliceMap.setdefault(key, []).append(row)
+			self.RowRanges[row] = (start, end)
+
+
+	def _slice_keys(self, start, end):
+		# Keys of slices that are fully covered by the range, they are computed the same way as in `search()`
+		first = int(np.ceil((start - self.MinValue) / self.Resolution))
+		last = int((end - self.MinValue) // self.Resolution)
+		return [self.MinValue + index * self.Resolution for index in range(max(first, 0), last)]
 
 
 	def _create_slices(self, matrix):
-		if matrix.Array.shape[0] == 0:
+		rows = matrix.Index.get_rows()
+		if len(rows) == 0:
 			return
 
-		self.SliceMap = {}
-		open_rows = list(matrix.I2NMap.keys())
-		self.MinValue = float(np.min(matrix.Array[self.ColumnStart][open_rows]))
-		self.MaxValue = float(np.max(matrix.Array[self.ColumnEnd][open_rows]))
+		starts = matrix.Array[self.ColumnStart][rows]
+		ends = matrix.Array[self.ColumnEnd][rows]
+		self.RowRanges = dict(zip(rows.tolist(), zip(starts.tolist(), ends.tolist())))
+		self.MinValue = float(np.min(starts))
+		self.MaxValue = float(np.max(ends))
 
 		if self.Resolution is None:
-			diffs = matrix.Array[self.ColumnEnd][open_rows] - matrix.Array[self.ColumnStart][open_rows]
-			self.Resolution = float(np.min(diffs))
+			self.Resolution = float(np.min(ends - starts))
 
-		start_value = self.MinValue
-
-		while start_value < self.MaxValue:
+		self.SliceMap = {}
+		count = int(np.ceil((self.MaxValue - self.MinValue) / self.Resolution))
+		for index in range(count):
+			start_value = self.MinValue + index * self.Resolution
 			end_value = start_value + self.Resolution
-			condition = (matrix.Array[self.ColumnEnd] >= end_value) & (matrix.Array[self.ColumnStart] <= start_value)
-			indexes = np.where(condition)
-			self.SliceMap[start_value] = indexes[0].tolist()
-			start_value = end_value
+			condition = (ends >= end_value) & (starts <= start_value)
+			self.SliceMap[start_value] = rows[condition].tolist()
 
 
 	def serialize(self):
@@ -305,6 +388,6 @@ class SliceIndex(Index):
 		for key in data['slice_map']:
 			self.SliceMap[float(key)] = data['slice_map'][key]
 
-		self.Tree = data['tree']
 		self.ColumnStart = data['column_start']
 		self.ColumnEnd = data['column_end']
+		self.RowRanges = None  # Not serialized, the next change recreates the slices
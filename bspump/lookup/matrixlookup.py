@@ -1,3 +1,4 @@
+import io
 import json
 import logging
 
@@ -6,6 +7,7 @@ import numpy as np
 import asab
 from ..abc.lookup import Lookup
 from ..matrix.sessionmatrix import SessionMatrix
+from ..matrix.utils.snapshot import is_snapshot
 
 ###
 
@@ -21,6 +23,7 @@ class MatrixLookup(Lookup):
 
 	ConfigDefaults = {
 		"update_period": 5,
+		"compression": "",  # Compression of the serialized matrix, "zlib" or none
 	}
 
 	def __init__(self, app, matrix_id=None, dtype='float_', on_clock_update=False, id=None, config=None, lazy=False):
@@ -53,8 +56,12 @@ class MatrixLookup(Lookup):
 
 
 
-	async def _on_matrix_changed(self, message):
-		self.update_indexes()
+	def _on_matrix_changed(self, message):
+		changes = self.Matrix.Changes
+		if changes is None or changes.reindexed:
+			self.update_indexes()
+		else:
+			self.apply_changes(changes.added_rows, changes.removed_rows)
 
 
 	async def _on_clock_tick(self):
@@ -66,6 +73,14 @@ class MatrixLookup(Lookup):
 			self.Indexes[index].update(self.Matrix)
 
 
+	def apply_changes(self, added_rows, removed_rows):
+		'''
+			Updates indexes with rows added to and removed from the matrix since the last change.
+		'''
+		for index in self.Indexes:
+			self.Indexes[index].apply_changes(self.Matrix, added_rows, removed_rows)
+
+
 	def search(self, condition, target_column):
 		'''
 			Default search, override if optimized with indexes
@@ -79,19 +94,27 @@ class MatrixLookup(Lookup):
 
 
 	def serialize(self):
-		serialized = {}
-		serialized['Matrix'] = self.Matrix.serialize()
-		serialized['Indexes'] = {}
+		'''
+			The matrix is serialized into a binary snapshot, indexes are stored in its metadata.
+		'''
+		indexes = {}
 		for index in self.Indexes:
-			serialized["Indexes"][index] = self.Indexes[index].serialize()
+			indexes[index] = self.Indexes[index].serialize()
 
-		return (json.dumps(serialized)).encode('utf-8')
+		f = io.BytesIO()
+		self.Matrix.snapshot(f, compression=self.Config['compression'] or None, metadata={'Indexes': indexes})
+		return f.getvalue()
 
 
-	def deserialize(self, data_json):
-		data = json.loads(data_json.decode('utf-8'))
-		self.Matrix.deserialize(data['Matrix'])
-		indexes = data.get("Indexes", {})
+	def deserialize(self, data):
+		if is_snapshot(data):
+			indexes = self.Matrix.load_snapshot(data).get("Indexes", {})
+		else:
+			# JSON serialized by older versions
+			data = json.loads(data.decode('utf-8'))
+			self.Matrix.deserialize(data['Matrix'])
+			indexes = data.get("Indexes", {})
+
 		for index in indexes:
 			self.Indexes[index].deserialize(indexes[index])
 
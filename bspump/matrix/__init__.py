@@ -1,20 +1,34 @@
-from .matrixexportcsvgenerator import SessionMatrixExportCSVGenerator, TimeWindowMatrixExportCSVGenerator
-from .source import MatrixSource
-from .matrix import Matrix, PersistentMatrix
-from .namedmatrix import NamedMatrix, PersistentNamedMatrix  # noqa: F401
-from .timewindowmatrix import TimeWindowMatrix, PersistentTimeWindowMatrix  # noqa: F401
-from .sessionmatrix import SessionMatrix, PersistentSessionMatrix
-from .geomatrix import GeoMatrix, PersistentGeoMatrix
+from ..lazy import lazy_import
+
+__getattr__, __dir__ = lazy_import(__name__, {
+	"SessionMatrixExportCSVGenerator": ".matrixexportcsvgenerator",
+	"TimeWindowMatrixExportCSVGenerator": ".matrixexportcsvgenerator",
+	"MatrixExportGenerator": ".matrixexportgenerator",
+	"TimeWindowMatrixExportGenerator": ".matrixexportgenerator",
+	"MatrixSource": ".source",
+	"Matrix": ".matrix",
+	"PersistentMatrix": ".matrix",
+	"NamedMatrix": ".namedmatrix",
+	"PersistentNamedMatrix": ".namedmatrix",
+	"TimeWindowMatrix": ".timewindowmatrix",
+	"PersistentTimeWindowMatrix": ".timewindowmatrix",
+	"SessionMatrix": ".sessionmatrix",
+	"PersistentSessionMatrix": ".sessionmatrix",
+	"GeoMatrix": ".geomatrix",
+	"PersistentGeoMatrix": ".geomatrix",
+})
 
 
 __all__ = [
 	'SessionMatrixExportCSVGenerator',
 	'TimeWindowMatrixExportCSVGenerator',
+	'MatrixExportGenerator',
+	'TimeWindowMatrixExportGenerator',
 	'MatrixSource',
 	'Matrix',
 	'PersistentMatrix',
 	'NamedMatrix',
-	'PersistentNamedMatrix'
+	'PersistentNamedMatrix',
 	'TimeWindowMatrix',
 	'PersistentTimeWindowMatrix',
 	'SessionMatrix',
@@ -2,6 +2,7 @@ import logging
 import numpy as np
 import os
 from .matrix import Matrix, PersistentMatrix
+from .utils.geoindex import haversine
 
 #
 L = logging.getLogger(__name__)
@@ -77,16 +78,10 @@ class GeoMatrix(Matrix):
 
 	def get_gps_distance(self, lat1, lon1, lat2, lon2):
 		'''
-			Calculation of distance between 2 gps-coordinates in km.
+			Calculation of distance between gps-coordinates in km,
+			coordinates can be also NumPy arrays, see `haversine()`.
 		'''
-		R = 6371
-		dLat = self.degrees_to_radians(lat2 - lat1)
-		dLon = self.degrees_to_radians(lon2 - lon1)
-		lat1 = self.degrees_to_radians(lat1)
-		lat2 = self.degrees_to_radians(lat2)
-		a = np.sin(dLat / 2) * np.sin(dLat / 2) + np.sin(dLon / 2) * np.sin(dLon / 2) * np.cos(lat1) * np.cos(lat2)
-		c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
-		return R * c
+		return haversine(lat1, lon1, lat2, lon2)
 
 
 	def project_equirectangular(self, lat, lon):
@@ -98,6 +93,14 @@ class GeoMatrix(Matrix):
 		return int(row), int(column)
 
 
+	def project_many(self, lats, lons, clip=False):
+		'''
+			Vectorized `project_equirectangular()`, returns NumPy arrays of row and column indexes.
+			Coordinates outside the bbox get -1, unless `clip` is True, then the nearest cell is returned.
+		'''
+		return _project_many(self, lats, lons, clip)
+
+
 	def inverse_equirectangular(self, row, column):
 		'''
 			Converts row and column into latitude and longitude.
@@ -192,16 +195,10 @@ class PersistentGeoMatrix(PersistentMatrix):
 
 	def get_gps_distance(self, lat1, lon1, lat2, lon2):
 		'''
-			Calculation of distance between 2 gps-coordinates in km.
+			Calculation of distance between gps-coordinates in km,
+			coordinates can be also NumPy arrays, see `haversine()`.
 		'''
-		R = 6371
-		dLat = self.degrees_to_radians(lat2 - lat1)
-		dLon = self.degrees_to_radians(lon2 - lon1)
-		lat1 = self.degrees_to_radians(lat1)
-		lat2 = self.degrees_to_radians(lat2)
-		a = np.sin(dLat / 2) * np.sin(dLat / 2) + np.sin(dLon / 2) * np.sin(dLon / 2) * np.cos(lat1) * np.cos(lat2)
-		c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
-		return R * c
+		return haversine(lat1, lon1, lat2, lon2)
 
 
 	def project_equirectangular(self, lat, lon):
@@ -213,6 +210,14 @@ class PersistentGeoMatrix(PersistentMatrix):
 		return int(row), int(column)
 
 
+	def project_many(self, lats, lons, clip=False):
+		'''
+			Vectorized `project_equirectangular()`, returns NumPy arrays of row and column indexes.
+			Coordinates outside the bbox get -1, unless `clip` is True, then the nearest cell is returned.
+		'''
+		return _project_many(self, lats, lons, clip)
+
+
 	def inverse_equirectangular(self, row, column):
 		'''
 			Converts row and column into latitude and longitude.
@@ -224,3 +229,19 @@ class PersistentGeoMatrix(PersistentMatrix):
 		lon = column * (self.Bbox['max_lon'] - self.Bbox['min_lon']) / (self.MapWidth - 1) + self.Bbox['min_lon']
 
 		return lat, lon
+
+
+def _project_many(matrix, lats, lons, clip):
+	lats = np.asarray(lats, dtype='f8')
+	lons = np.asarray(lons, dtype='f8')
+	bbox = matrix.Bbox
+	columns = (lons - bbox['min_lon']) * ((matrix.MapWidth - 1) / (bbox['max_lon'] - bbox['min_lon']))
+	rows = (bbox['max_lat'] - lats) * ((matrix.MapHeight - 1) / (bbox['max_lat'] - bbox['min_lat']))
+
+	if clip:
+		rows = np.clip(rows, 0, matrix.MapHeight - 1)
+		columns = np.clip(columns, 0, matrix.MapWidth - 1)
+		return rows.astype('i8'), columns.astype('i8')
+
+	inside = (lats < bbox['max_lat']) & (lats > bbox['min_lat']) & (lons < bbox['max_lon']) & (lons > bbox['min_lon'])
+	return np.where(inside, rows, -1).astype('i8'), np.where(inside, columns, -1).astype('i8')
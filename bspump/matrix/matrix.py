@@ -55,7 +55,7 @@ class Matrix(abc.ABC, asab.ConfigObject):
 
 		Object main attributes:
 		`Array` is numpy ndarray, the actual data representation of the matrix object.
-		`ClosedRows` is a set, where some row ids can be stored before deletion during the matrix rebuild.
+		`ClosedRows` keeps track of closed row ids, which are reused by new rows or deleted during the matrix rebuild.
 
 	'''
 
@@ -100,12 +100,12 @@ class Matrix(abc.ABC, asab.ConfigObject):
 		'''
 		The matrix will be recreated without rows from `ClosedRows`.
 		'''
-		indexes = set(range(self.Array.shape[0]))
-		closed_indexes = set()
-		closed_indexes |= self.ClosedRows.get_rows()
-		saved_indexes = list(indexes - closed_indexes)
-		saved_indexes.sort()
-		self.Array = self.Array.take(saved_indexes, axis=0)
+		closed_indexes = self.ClosedRows.get_rows()
+		closed_indexes = closed_indexes[closed_indexes < self.Array.shape[0]]
+		saved = np.ones(self.Array.shape[0], dtype=np.bool_)
+		saved[closed_indexes] = False
+		saved_indexes = np.flatnonzero(saved)
+		self.Array = self.Array[saved]
 		self.ClosedRows.flush(self.Array.shape[0])
 		self.Gauge.set("rows.closed", 0)
 		self.Gauge.set("rows.active", self.Array.shape[0])
@@ -148,7 +148,12 @@ class Matrix(abc.ABC, asab.ConfigObject):
 		Override this method to gain control on how a new closed rows are added to the matrix
 		'''
 		current_rows = self.Array.shape[0]
-		self.Array = np.pad(self.Array.copy(), ((0, rows), (0, 0)), 'constant', constant_values=np.nan)
+		# New rows of a float matrix are NaN, rows of other dtypes, e.g. structured ones, are zeros
+		array = np.zeros((current_rows + rows,) + self.Array.shape[1:], dtype=self.Array.dtype)
+		if array.dtype.kind == 'f':
+			array[current_rows:] = np.nan
+		array[:current_rows] = self.Array
+		self.Array = array
 		self.ClosedRows.extend(current_rows, self.Array.shape[0])
 
 
@@ -207,12 +212,12 @@ class PersistentMatrix(Matrix):
 		'''
 		The matrix will be recreated without rows from `ClosedRows`.
 		'''
-		indexes = set(range(self.Array.shape[0]))
-		closed_indexes = set()
-		closed_indexes |= self.ClosedRows.get_rows()
-		saved_indexes = list(indexes - closed_indexes)
-		saved_indexes.sort()
-		self.Array = self.Array.take(saved_indexes, axis=0)
+		closed_indexes = self.ClosedRows.get_rows()
+		closed_indexes = closed_indexes[closed_indexes < self.Array.shape[0]]
+		saved = np.ones(self.Array.shape[0], dtype=np.bool_)
+		saved[closed_indexes] = False
+		saved_indexes = np.flatnonzero(saved)
+		self.Array = self.Array[saved]
 		array = np.memmap(self.ArrayPath, dtype=self.DType, mode='w+', shape=self.Array.shape)
 		array[:] = self.Array[:]
 		self.Array = array
@@ -0,0 +1,128 @@
+import logging
+
+import numpy as np
+
+from ..abc.generator import Generator
+from .utils.exportformat import ExportFormats
+
+
+L = logging.getLogger(__name__)
+
+
+class MatrixExportGenerator(Generator):
+	'''
+	Exports a named matrix, e.g. from `MatrixSource`, in the format given by the `format` configuration option.
+
+	Rows are exported in chunks of `chunk_size` rows, every chunk is copied from the matrix and formatted at once,
+	see `bspump.matrix.utils.ExportFormat`. The output is streamed into the pipeline as `bytes` events,
+	their concatenation is the exported file, e.g. use `FileBlockSink` with the mode `ab`.
+	The export is not interrupted by other tasks, so the matrix does not change while it is being exported.
+
+	Every named row is exported with its name in the `id` column, followed by its cells.
+	Fields of a structured dtype are exported as separate columns, sub-arrays are flattened
+	into columns named by indexes of the items, e.g. `fractions_0_1`.
+
+	Further formats can be added by a subclass that extends `Formats`.
+	'''
+
+	ConfigDefaults = {
+		'format': 'csv',  # csv, ndjson or parquet
+		'chunk_size': 65536,  # Rows formatted at once
+		'delimiter': ',',  # CSV
+		'float_format': '%.10g',  # CSV
+		'compression': 'snappy',  # Parquet
+	}
+
+	Formats = ExportFormats
+
+
+	def __init__(self, app, pipeline, id=None, config=None):
+		super().__init__(app, pipeline, id=id, config=config)
+		self.Format = self.Config['format']
+		if self.Format not in self.Formats:
+			raise ValueError("Unknown export format '{}'".format(self.Format))
+
+		self.ChunkSize = int(self.Config['chunk_size'])
+
+
+	async def generate(self, context, event, depth):
+		export_format = self.Formats[self.Format](self.Config)
+		first = True
+		for names, columns in self.iter_chunks(event):
+			data = export_format.begin(names) if first else b''
+			data += export_format.write(columns)
+			first = False
+			if len(data) > 0:
+				self.Pipeline.inject(context, data, depth)
+
+		data = export_format.end()
+		if len(data) > 0:
+			self.Pipeline.inject(context, data, depth)
+
+
+	def iter_chunks(self, matrix):
+		'''
+		Yields names of columns and a list of 1D NumPy arrays with columns for every chunk of rows,
+		at least one chunk is yielded, which is empty if the matrix has no named rows.
+		'''
+		rows = np.sort(matrix.Index.get_rows())
+		for start in range(0, max(rows.shape[0], 1), self.ChunkSize):
+			yield self.export_rows(matrix, rows[start:start + self.ChunkSize])
+
+
+	def export_rows(self, matrix, rows):
+		'''
+		Override this method to control exported columns, it returns names of columns and their arrays
+		for `rows`, a NumPy array of row indexes.
+		'''
+		names = ['id']
+		columns = [_row_names(matrix, rows)]
+		for name, column in _flatten(matrix.Array[rows], 'value'):
+			names.append(name)
+			columns.append(column)
+		return names, columns
+
+
+
+class TimeWindowMatrixExportGenerator(MatrixExportGenerator):
+	'''
+	Exports a `TimeWindowMatrix`, every row is exported as one line per time slot, from the oldest one,
+	with the row name in the `id` column and the beginning of the time slot in the `timestamp` column.
+	'''
+
+	def export_rows(self, matrix, rows):
+		ordered = matrix.get_ordered_columns()
+		cells = matrix.Array[rows][:, ordered]
+		cells = cells.reshape((-1,) + cells.shape[2:])
+
+		resolution = matrix.TimeConfig.get_resolution()
+		timestamps = matrix.TimeConfig.get_end() + np.arange(ordered.shape[0]) * resolution
+
+		names = ['id', 'timestamp']
+		columns = [np.repeat(_row_names(matrix, rows), ordered.shape[0]), np.tile(timestamps, rows.shape[0])]
+		for name, column in _flatten(cells, 'value'):
+			names.append(name)
+			columns.append(column)
+		return names, columns
+
+
+def _row_names(matrix, rows):
+	return np.array([matrix.get_row_name(row_index) for row_index in rows.tolist()], dtype=np.str_)
+
+
+def _flatten(cells, name):
+	'''
+	Yields names and 1D arrays of scalar columns of `cells`, an array of cells with the first dimension of rows.
+	'''
+	if cells.dtype.names is not None:
+		for field in cells.dtype.names:
+			yield from _flatten(cells[field], field)
+		return
+
+	if cells.ndim == 1:
+		yield name, cells
+		return
+
+	flat = cells.reshape(cells.shape[0], int(np.prod(cells.shape[1:])))
+	for i, index in enumerate(np.ndindex(*cells.shape[1:])):
+		yield "{}_{}".format(name, "_".join(map(str, index))), flat[:, i]
@@ -3,7 +3,10 @@ import os
 import numpy as np
 
 import asab
-from .utils.index import Index, PersistentIndex
+from .utils.hashindex import HashIndex, PersistentHashIndex
+from .utils.index import Index
+from .utils.rowchanges import RowChanges
+from .utils.snapshot import write_snapshot, read_snapshot, open_snapshot
 from .matrix import Matrix, PersistentMatrix
 
 ###
@@ -15,15 +18,32 @@ L = logging.getLogger(__name__)
 
 
 class NamedMatrix(Matrix):
+	'''
+		Matrix with rows accessible by names.
+
+		The `index` option selects how names are mapped to rows:
+		`dict` (default) is a pair of dictionaries, the fastest one,
+		`hash` is a `HashIndex`, a compact hash table of NumPy arrays, for matrices with millions of rows.
+	'''
+
+	ConfigDefaults = {
+		'index': 'dict',  # dict or hash
+	}
 
 	def __init__(self, app, dtype='float_', id=None, config=None):
 		super().__init__(app, dtype=dtype, id=id, config=config)
 		self.PubSub = asab.PubSub(app)
+		self.RowChanges = RowChanges()
+		self.Changes = None
+		self._ChangesScheduled = False
 
 
 	def zeros(self):
 		super().zeros()
-		self.Index = Index()
+		if self.Config['index'] == 'hash':
+			self.Index = HashIndex(self.Array.shape[0])
+		else:
+			self.Index = Index()
 
 
 	def serialize(self):
@@ -51,6 +71,35 @@ class NamedMatrix(Matrix):
 			array.append(tuple(member))
 
 		self.Array = np.array(array, dtype=self.DType)
+		self.RowChanges.reindex()
+		self._schedule_changes()
+
+
+	def snapshot(self, f, compression=None, metadata=None):
+		'''
+		Writes a binary snapshot of the matrix into the file object `f`, see `write_snapshot()`.
+		Unlike `serialize()`, the array is not converted to Python objects.
+		The snapshot contains also names of rows, closed rows and the given `metadata`.
+		'''
+		write_snapshot(f, self.Array, _snapshot_metadata(self, metadata), compression=compression)
+
+
+	def load_snapshot(self, data):
+		'''
+		Loads a snapshot written by `snapshot()` from a bytes-like object or from a file with the given path.
+		An uncompressed array is not copied, see `read_snapshot()` and `open_snapshot()`.
+		Returns the metadata of the snapshot.
+		'''
+		array, metadata = open_snapshot(data) if isinstance(data, str) else read_snapshot(data)
+		self.DType = array.dtype
+		self.Array = array
+		self.ClosedRows.deserialize(metadata['ClosedRows'])
+		self.Index.extend(array.shape[0])
+		self.Index.deserialize(_snapshot_index(metadata))
+
+		self.RowChanges.reindex()
+		self._schedule_changes()
+		return metadata
 
 
 	def _grow_rows(self, rows=1):
@@ -64,18 +113,67 @@ class NamedMatrix(Matrix):
 		'''
 		closed_indexes, saved_indexes = super().flush()
 		self.Index.flush(closed_indexes)
+		self.RowChanges.reindex()
+		self._schedule_changes()
 		return closed_indexes, saved_indexes
 
 
 	def add_row(self, row_name: str):
+		row_index = self._add_row(row_name)
+		self._schedule_changes()
+		return row_index
+
+
+	def _add_row(self, row_name):
 		assert row_name is not None
 
 		row_index = super().add_row()
 		self.Index.add_row(row_name, row_index)
-		self.PubSub.publish("Matrix changed!")
+		self.RowChanges.add(row_index)
 		return row_index
 
 
+	def resolve_rows(self, row_names):
+		'''
+		Returns indexes of rows with `row_names` as a NumPy array, rows that do not exist are added.
+		Every distinct name is looked up once.
+		'''
+		rows = dict.fromkeys(row_names)
+		added = False
+		for row_name in rows:
+			row_index = self.Index.get_row_index(row_name)
+			if row_index is None:
+				row_index = self._add_row(row_name)
+				added = True
+			rows[row_name] = row_index
+
+		if added:
+			self._schedule_changes()
+
+		return np.fromiter(map(rows.__getitem__, row_names), dtype='i8', count=len(row_names))
+
+
+	def _schedule_changes(self):
+		if not self._ChangesScheduled:
+			self._ChangesScheduled = True
+			self.Loop.call_soon(self.flush_changes)
+
+
+	def flush_changes(self):
+		'''
+		Publishes "Matrix changed!" if rows have been added or removed since the last notification.
+		The notification is sent once per iteration of the event loop, after all changes of the iteration,
+		call this method to send it immediately.
+		Subscribers find the changes in `Changes`, see `MatrixChanges`.
+		'''
+		self._ChangesScheduled = False
+		if not self.RowChanges:
+			return
+
+		self.Changes = self.RowChanges.pop()
+		self.PubSub.publish("Matrix changed!")
+
+
 	def close_row(self, row_name, clear=True):
 		row_index = self.Index.get_row_index(row_name)
 		if row_index in self.ClosedRows:
@@ -85,7 +183,8 @@ class NamedMatrix(Matrix):
 			return False
 
 		self.Index.pop_index(row_index)
-		self.PubSub.publish("Matrix changed!")
+		self.RowChanges.remove(row_index)
+		self._schedule_changes()
 
 		if clear:
 			self.Array[row_index] = np.zeros(1, dtype=self.DType)
@@ -118,11 +217,23 @@ class PersistentNamedMatrix(PersistentMatrix):
 	def __init__(self, app, dtype='float_', id=None, config=None):
 		super().__init__(app, dtype=dtype, id=id, config=config)
 		self.PubSub = asab.PubSub(app)
+		self.RowChanges = RowChanges()
+		self.Changes = None
+		self._ChangesScheduled = False
 
 	def zeros(self):
 		super().zeros()
-		path = os.path.join(self.Path, 'map.dat')
-		self.Index = PersistentIndex(path, self.Array.shape[0])
+		path = os.path.join(self.Path, 'index')
+		migrate = not os.path.exists(path)
+		self.Index = PersistentHashIndex(path, self.Array.shape[0])
+
+		# Matrices created by older versions store names in 'map.dat', one fixed-size string per row
+		legacy_path = os.path.join(self.Path, 'map.dat')
+		if migrate and os.path.exists(legacy_path):
+			names = np.memmap(legacy_path, dtype='U30', mode='r')
+			for row_index in np.flatnonzero(names != '').tolist():
+				self.Index.add_row(str(names[row_index]), row_index)
+			L.warning("Row names of matrix '{}' have been migrated from '{}'".format(self.Id, legacy_path))
 
 	def _grow_rows(self, rows=1):
 		super()._grow_rows(rows)
@@ -135,18 +246,100 @@ class PersistentNamedMatrix(PersistentMatrix):
 		'''
 		closed_indexes, saved_indexes = super().flush()
 		self.Index.flush(closed_indexes)
+		self.RowChanges.reindex()
+		self._schedule_changes()
 		return closed_indexes, saved_indexes
 
 
+	def snapshot(self, f, compression=None, metadata=None):
+		'''
+		Writes a binary snapshot of the matrix into the file object `f`, see `write_snapshot()`.
+		The snapshot contains also names of rows, closed rows and the given `metadata`.
+		'''
+		write_snapshot(f, self.Array, _snapshot_metadata(self, metadata), compression=compression)
+
+
+	def load_snapshot(self, data):
+		'''
+		Loads a snapshot written by `snapshot()` from a bytes-like object or from a file with the given path.
+		The array is copied into the file of the matrix, its dtype has to be the dtype of the matrix.
+		Returns the metadata of the snapshot.
+		'''
+		array, metadata = open_snapshot(data) if isinstance(data, str) else read_snapshot(data)
+		if array.dtype != np.dtype(self.DType):
+			raise ValueError("The snapshot of matrix '{}' has a different dtype".format(self.Id))
+
+		self.Array = np.memmap(self.ArrayPath, dtype=self.DType, mode='w+', shape=array.shape)
+		self.Array[:] = array
+
+		self.ClosedRows.flush(array.shape[0])
+		for row_index in metadata['ClosedRows']:
+			self.ClosedRows.add(row_index)
+
+		self.Index = PersistentHashIndex(os.path.join(self.Path, 'index'), array.shape[0], reset=True)
+		self.Index.deserialize(_snapshot_index(metadata))
+
+		self.RowChanges.reindex()
+		self._schedule_changes()
+		return metadata
+
+
 	def add_row(self, row_name: str):
+		row_index = self._add_row(row_name)
+		self._schedule_changes()
+		return row_index
+
+
+	def _add_row(self, row_name):
 		assert row_name is not None
 
 		row_index = super().add_row()
 		self.Index.add_row(row_name, row_index)
-		self.PubSub.publish("Matrix changed!")
+		self.RowChanges.add(row_index)
 		return row_index
 
 
+	def resolve_rows(self, row_names):
+		'''
+		Returns indexes of rows with `row_names` as a NumPy array, rows that do not exist are added.
+		Every distinct name is looked up once.
+		'''
+		rows = dict.fromkeys(row_names)
+		added = False
+		for row_name in rows:
+			row_index = self.Index.get_row_index(row_name)
+			if row_index is None:
+				row_index = self._add_row(row_name)
+				added = True
+			rows[row_name] = row_index
+
+		if added:
+			self._schedule_changes()
+
+		return np.fromiter(map(rows.__getitem__, row_names), dtype='i8', count=len(row_names))
+
+
+	def _schedule_changes(self):
+		if not self._ChangesScheduled:
+			self._ChangesScheduled = True
+			self.Loop.call_soon(self.flush_changes)
+
+
+	def flush_changes(self):
+		'''
+		Publishes "Matrix changed!" if rows have been added or removed since the last notification.
+		The notification is sent once per iteration of the event loop, after all changes of the iteration,
+		call this method to send it immediately.
+		Subscribers find the changes in `Changes`, see `MatrixChanges`.
+		'''
+		self._ChangesScheduled = False
+		if not self.RowChanges:
+			return
+
+		self.Changes = self.RowChanges.pop()
+		self.PubSub.publish("Matrix changed!")
+
+
 	def close_row(self, row_name, clear=True):
 		row_index = self.Index.get_row_index(row_name)
 		if row_index in self.ClosedRows:
@@ -156,7 +349,8 @@ class PersistentNamedMatrix(PersistentMatrix):
 			return False
 
 		self.Index.pop_index(row_index)
-		self.PubSub.publish("Matrix changed!")
+		self.RowChanges.remove(row_index)
+		self._schedule_changes()
 
 		if clear:
 			self.Array[row_index] = np.zeros(1, dtype=self.DType)
@@ -182,3 +376,22 @@ class PersistentNamedMatrix(PersistentMatrix):
 
 	def get_row_name(self, row_index: int):
 		return self.Index.get_row_name(row_index)
+
+
+def _snapshot_metadata(matrix, metadata):
+	rows = matrix.Index.get_rows().tolist()
+	snapshot_metadata = {
+		'Rows': rows,
+		'Names': [matrix.Index.get_row_name(row_index) for row_index in rows],
+		'ClosedRows': matrix.ClosedRows.serialize(),
+	}
+	if metadata is not None:
+		snapshot_metadata.update(metadata)
+	return snapshot_metadata
+
+
+def _snapshot_index(metadata):
+	return {
+		'N2IMap': dict(zip(metadata['Names'], metadata['Rows'])),
+		'I2NMap': dict(zip(metadata['Rows'], metadata['Names'])),
+	}
@@ -1,4 +1,7 @@
 import logging
+import operator
+
+import numpy as np
 
 from .namedmatrix import NamedMatrix, PersistentNamedMatrix
 
@@ -66,6 +69,47 @@ class SessionMatrix(NamedMatrix):
 		return event
 
 
+	def store_events(self, row_indexes, events, keys=None):
+		'''
+			Stores `events` into rows `row_indexes` at once, the i-th event into the i-th row.
+			Values of a field are collected from all events and assigned to the column in one NumPy operation.
+			Fields are `keys` or keys of the first event by default, fields missing in the dtype are skipped
+			and every event must contain all the others. If a row repeats, the last event is stored.
+		'''
+		if len(events) == 0:
+			return
+
+		if keys is None:
+			keys = events[0].keys()
+
+		names = self.Array.dtype.names
+		if names is None:
+			raise TypeError("The matrix does not have correct column-like dtype")
+
+		row_indexes = np.asarray(row_indexes, dtype='i8')
+		for key in keys:
+			if key in names:
+				self.Array[key][row_indexes] = list(map(operator.itemgetter(key), events))
+
+
+	def decode_rows(self, row_indexes, keys=None):
+		'''
+			Decodes rows `row_indexes` into a columnar dictionary, which maps fields to NumPy arrays of their values
+			and the primary name to the list of row names.
+		'''
+		if keys is None:
+			keys = self.Array.dtype.names
+
+		if keys is None:
+			raise TypeError("The matrix does not have correct column-like dtype")
+
+		row_indexes = np.asarray(row_indexes, dtype='i8')
+		rows = self.Array[row_indexes]
+		columns = {key: rows[key] for key in keys}
+		columns[self.PrimaryName] = [self.get_row_name(row_index) for row_index in row_indexes.tolist()]
+		return columns
+
+
 
 class PersistentSessionMatrix(PersistentNamedMatrix):
 	ConfigDefaults = {
@@ -117,3 +161,44 @@ class PersistentSessionMatrix(PersistentNamedMatrix):
 		event[self.PrimaryName] = self.get_row_name(row_index)
 
 		return event
+
+
+	def store_events(self, row_indexes, events, keys=None):
+		'''
+			Stores `events` into rows `row_indexes` at once, the i-th event into the i-th row.
+			Values of a field are collected from all events and assigned to the column in one NumPy operation.
+			Fields are `keys` or keys of the first event by default, fields missing in the dtype are skipped
+			and every event must contain all the others. If a row repeats, the last event is stored.
+		'''
+		if len(events) == 0:
+			return
+
+		if keys is None:
+			keys = events[0].keys()
+
+		names = self.Array.dtype.names
+		if names is None:
+			raise TypeError("The matrix does not have correct column-like dtype")
+
+		row_indexes = np.asarray(row_indexes, dtype='i8')
+		for key in keys:
+			if key in names:
+				self.Array[key][row_indexes] = list(map(operator.itemgetter(key), events))
+
+
+	def decode_rows(self, row_indexes, keys=None):
+		'''
+			Decodes rows `row_indexes` into a columnar dictionary, which maps fields to NumPy arrays of their values
+			and the primary name to the list of row names.
+		'''
+		if keys is None:
+			keys = self.Array.dtype.names
+
+		if keys is None:
+			raise TypeError("The matrix does not have correct column-like dtype")
+
+		row_indexes = np.asarray(row_indexes, dtype='i8')
+		rows = self.Array[row_indexes]
+		columns = {key: rows[key] for key in keys}
+		columns[self.PrimaryName] = [self.get_row_name(row_index) for row_index in row_indexes.tolist()]
+		return columns
@@ -1,3 +1,4 @@
+import itertools
 import time
 import logging
 
@@ -44,6 +45,12 @@ class TimeWindowMatrix(NamedMatrix):
 		^                       ^
 		End (past)   <          Start (== now)
 
+		The time dimension is a ring buffer: `Head` is the index of the column with the oldest time slot,
+		the following columns (modulo the number of columns) hold newer time slots.
+		When the window advances, the oldest column is cleared in place and it becomes the newest one, so nothing is copied.
+		Use `get_column()` to find the column of a timestamp and `get_ordered_columns()` to read columns in the time order,
+		e.g. `matrix.Array[:, matrix.get_ordered_columns()]`.
+
 	'''
 	def __init__(self, app, dtype='float_', start_time=None, resolution=60, columns=15, clock_driven=False, id=None, config=None):
 		self.Columns = columns
@@ -88,12 +95,12 @@ class TimeWindowMatrix(NamedMatrix):
 		return (int(shape[0] / self.Columns), self.Columns, )
 
 
-	def add_row(self, row_name):
+	def _add_row(self, row_name):
 		'''
 			Adds new row with `row_id` to the matrix and sets `warming_up_count`.
 		'''
 
-		row_index = super().add_row(row_name)
+		row_index = super()._add_row(row_name)
 		if self.Array.shape[0] != len(self.WarmingUpCount):
 			self.WarmingUpCount.extend(self.Array.shape[0], self.Array.shape[1])
 		else:
@@ -107,6 +114,7 @@ class TimeWindowMatrix(NamedMatrix):
 			Returns the right column, where the timestamp fits.
 			If if falls earlier or later, returns `None`.
 			The timestamp should be provided in seconds.
+			The column index respects the `Head` of the ring buffer.
 		'''
 
 		if event_timestamp <= self.TimeConfig.get_end():
@@ -134,7 +142,74 @@ class TimeWindowMatrix(NamedMatrix):
 					self.TimeConfig.get_end(), self.TimeConfig.get_resolution(), self.Array.shape[1]))
 			raise
 
-		return column_idx
+		return (column_idx + self.Head) % self.Array.shape[1]
+
+
+	def get_ordered_columns(self):
+		'''
+			Returns indexes of columns in the time order, from the oldest to the newest time slot.
+		'''
+		return (np.arange(self.Array.shape[1]) + self.Head) % self.Array.shape[1]
+
+
+	def get_columns(self, timestamps):
+		'''
+			Vectorized `get_column()`, returns a NumPy array with columns of `timestamps`.
+			The column of a timestamp that falls earlier or later than the window is `-1`.
+		'''
+		timestamps = np.asarray(timestamps, dtype='f8')
+		end = self.TimeConfig.get_end()
+		start = self.TimeConfig.get_start()
+
+		late = timestamps <= end
+		early = timestamps >= start
+		late_count = np.count_nonzero(late)
+		if late_count > 0:
+			self.Counters.add('events.late', late_count)
+		early_count = np.count_nonzero(early)
+		if early_count > 0:
+			self.Counters.add('events.early', early_count)
+
+		inside = (timestamps > end) & (timestamps < start)
+		columns = np.full(timestamps.shape, -1, dtype='i8')
+		columns[inside] = ((timestamps[inside] - end) // self.TimeConfig.get_resolution() + self.Head) % self.Array.shape[1]
+		return columns
+
+
+	def update_batch(self, row_names, timestamps, values, ufunc=None):
+		'''
+			Stores many values at once, the value of each event is stored into the row `row_names[i]`
+			and into the column of `timestamps[i]`. Rows that do not exist are added, see `resolve_rows()`,
+			values with a timestamp outside of the window are skipped and their rows are not added.
+			Call `resolve_rows()` with all `row_names` first to add rows of every event, as per-event evaluations do.
+			`values` can be also a scalar, e.g. `1` to count events with `np.add`.
+
+			`ufunc` is `None` to assign values, the last value wins when more values fall into the same cell,
+			or a NumPy ufunc, such as `np.add`, `np.maximum` or `np.minimum`, that combines values with the content of the cell,
+			it is applied by `ufunc.at()`, so values falling into the same cell are all accounted.
+
+			Returns the number of stored values.
+		'''
+		columns = self.get_columns(timestamps)
+		values = np.asarray(values)
+
+		inside = columns >= 0
+		if not inside.all():
+			row_names = list(itertools.compress(row_names, inside))
+			columns = columns[inside]
+			if values.ndim > 0:
+				values = values[inside]
+
+		if len(columns) == 0:
+			return 0
+
+		rows = self.resolve_rows(row_names)
+		if ufunc is None:
+			self.Array[rows, columns] = values
+		else:
+			ufunc.at(self.Array, (rows, columns), values)
+
+		return len(rows)
 
 
 	def advance(self, target_ts):
@@ -195,32 +270,39 @@ class TimeWindowMatrix(NamedMatrix):
 		super().zeros()
 		self.TimeConfig = TimeConfig(self.Resolution, self.Columns, self.Start)
 		self.End = self.TimeConfig.get_end()
+		self.Head = self.TimeConfig.get_head()
 		self.WarmingUpCount = WarmingUpCount(self.Array.shape[0])
 
 
 	def add_column(self):
 		'''
-			Adds new time column to the matrix and deletes the first one, simulating
+			Adds new time column to the matrix and deletes the oldest one, simulating
 			the time flow. `Start` and `End` attributes are advanced as well.
+			The oldest column is cleared and reused as the new one, see `Head`.
 		'''
 
 		self.TimeConfig.add_start(self.TimeConfig.get_resolution())
 		self.TimeConfig.add_end(self.TimeConfig.get_resolution())
 
+		# The oldest column becomes the newest one
+		head = self.Head
+		self.Head = (head + 1) % self.Array.shape[1]
+		self.TimeConfig.set_head(self.Head)
+		self.Start = self.TimeConfig.get_start()
+		self.End = self.TimeConfig.get_end()
+
 		if self.Array.shape[0] == 0:
 			return
 
-		column = np.empty((self.Array.shape[0], 1,) + self.Array.shape[2:], dtype=self.Array.dtype)
-		column[:] = np.nan
-		array = self.Array
-		array = np.hstack((array, column))
-		array = np.delete(array, 0, axis=1)
-		self.Array = array
+		self.Array[:, head] = np.nan
+		self._decrease_warming_up_count()
 
-		open_rows = list(set(range(0, self.Array.shape[0])) - self.ClosedRows.get_rows())
-		self.WarmingUpCount.decrease(open_rows)
-		self.Start = self.TimeConfig.get_start()
-		self.End = self.TimeConfig.get_end()
+
+	def _decrease_warming_up_count(self):
+		if len(self.ClosedRows) == 0:
+			self.WarmingUpCount.decrease()
+		else:
+			self.WarmingUpCount.decrease(exclude=self.ClosedRows.get_rows())
 
 
 
@@ -272,12 +354,12 @@ class PersistentTimeWindowMatrix(PersistentNamedMatrix):
 		return (int(shape[0] / self.Columns), self.Columns, )
 
 
-	def add_row(self, row_name):
+	def _add_row(self, row_name):
 		'''
 			Adds new row with `row_id` to the matrix and sets `warming_up_count`.
 		'''
 
-		row_index = super().add_row(row_name)
+		row_index = super()._add_row(row_name)
 		if self.Array.shape[0] != len(self.WarmingUpCount):
 			self.WarmingUpCount.extend(self.Array.shape[0], self.Array.shape[1])
 		else:
@@ -291,6 +373,7 @@ class PersistentTimeWindowMatrix(PersistentNamedMatrix):
 			Returns the right column, where the timestamp fits.
 			If if falls earlier or later, returns `None`.
 			The timestamp should be provided in seconds.
+			The column index respects the `Head` of the ring buffer.
 		'''
 
 		if event_timestamp <= self.TimeConfig.get_end():
@@ -318,7 +401,74 @@ class PersistentTimeWindowMatrix(PersistentNamedMatrix):
 					self.TimeConfig.get_end(), self.TimeConfig.get_resolution(), self.Array.shape[1]))
 			raise
 
-		return column_idx
+		return (column_idx + self.Head) % self.Array.shape[1]
+
+
+	def get_ordered_columns(self):
+		'''
+			Returns indexes of columns in the time order, from the oldest to the newest time slot.
+		'''
+		return (np.arange(self.Array.shape[1]) + self.Head) % self.Array.shape[1]
+
+
+	def get_columns(self, timestamps):
+		'''
+			Vectorized `get_column()`, returns a NumPy array with columns of `timestamps`.
+			The column of a timestamp that falls earlier or later than the window is `-1`.
+		'''
+		timestamps = np.asarray(timestamps, dtype='f8')
+		end = self.TimeConfig.get_end()
+		start = self.TimeConfig.get_start()
+
+		late = timestamps <= end
+		early = timestamps >= start
+		late_count = np.count_nonzero(late)
+		if late_count > 0:
+			self.Counters.add('events.late', late_count)
+		early_count = np.count_nonzero(early)
+		if early_count > 0:
+			self.Counters.add('events.early', early_count)
+
+		inside = (timestamps > end) & (timestamps < start)
+		columns = np.full(timestamps.shape, -1, dtype='i8')
+		columns[inside] = ((timestamps[inside] - end) // self.TimeConfig.get_resolution() + self.Head) % self.Array.shape[1]
+		return columns
+
+
+	def update_batch(self, row_names, timestamps, values, ufunc=None):
+		'''
+			Stores many values at once, the value of each event is stored into the row `row_names[i]`
+			and into the column of `timestamps[i]`. Rows that do not exist are added, see `resolve_rows()`,
+			values with a timestamp outside of the window are skipped and their rows are not added.
+			Call `resolve_rows()` with all `row_names` first to add rows of every event, as per-event evaluations do.
+			`values` can be also a scalar, e.g. `1` to count events with `np.add`.
+
+			`ufunc` is `None` to assign values, the last value wins when more values fall into the same cell,
+			or a NumPy ufunc, such as `np.add`, `np.maximum` or `np.minimum`, that combines values with the content of the cell,
+			it is applied by `ufunc.at()`, so values falling into the same cell are all accounted.
+
+			Returns the number of stored values.
+		'''
+		columns = self.get_columns(timestamps)
+		values = np.asarray(values)
+
+		inside = columns >= 0
+		if not inside.all():
+			row_names = list(itertools.compress(row_names, inside))
+			columns = columns[inside]
+			if values.ndim > 0:
+				values = values[inside]
+
+		if len(columns) == 0:
+			return 0
+
+		rows = self.resolve_rows(row_names)
+		if ufunc is None:
+			self.Array[rows, columns] = values
+		else:
+			ufunc.at(self.Array, (rows, columns), values)
+
+		return len(rows)
 
 
 	def advance(self, target_ts):
@@ -380,6 +530,7 @@ class PersistentTimeWindowMatrix(PersistentNamedMatrix):
 		path = os.path.join(self.Path, 'time_config.dat')
 		self.TimeConfig = PersistentTimeConfig(path, self.Resolution, self.Columns, self.Start)
 		self.End = self.TimeConfig.get_end()
+		self.Head = self.TimeConfig.get_head()
 		path = os.path.join(self.Path, 'warming_up_count.dat')
 		self.WarmingUpCount = PersistentWarmingUpCount(path, self.Array.shape[0])
 		if self.TimeConfig.get_start() != self.Start:
@@ -388,27 +539,30 @@ class PersistentTimeWindowMatrix(PersistentNamedMatrix):
 
 	def add_column(self):
 		'''
-			Adds new time column to the matrix and deletes the first one, simulating
+			Adds new time column to the matrix and deletes the oldest one, simulating
 			the time flow. `Start` and `End` attributes are advanced as well.
+			The oldest column is cleared and reused as the new one, see `Head`.
 		'''
 
 		self.TimeConfig.add_start(self.TimeConfig.get_resolution())
 		self.TimeConfig.add_end(self.TimeConfig.get_resolution())
 
+		# The oldest column becomes the newest one, the memory-mapped array is updated in place
+		head = self.Head
+		self.Head = (head + 1) % self.Array.shape[1]
+		self.TimeConfig.set_head(self.Head)
+		self.Start = self.TimeConfig.get_start()
+		self.End = self.TimeConfig.get_end()
+
 		if self.Array.shape[0] == 0:
 			return
 
-		column = np.zeros((self.Array.shape[0], 1,) + self.Array.shape[2:], dtype=self.Array.dtype)
-		array = np.zeros(self.Array.shape, dtype=self.DType)
-		array[:] = self.Array[:]
-
-		array = np.hstack((array, column))
-		array = np.delete(array, 0, axis=1)
+		self.Array[:, head] = 0
+		self._decrease_warming_up_count()
 
-		self.Array = np.memmap(self.ArrayPath, dtype=self.DType, mode='w+', shape=array.shape)
-		self.Array[:] = array[:]
 
-		open_rows = list(set(range(0, self.Array.shape[0])) - self.ClosedRows.get_rows())
-		self.WarmingUpCount.decrease(open_rows)
-		self.Start = self.TimeConfig.get_start()
-		self.End = self.TimeConfig.get_end()
+	def _decrease_warming_up_count(self):
+		if len(self.ClosedRows) == 0:
+			self.WarmingUpCount.decrease()
+		else:
+			self.WarmingUpCount.decrease(exclude=self.ClosedRows.get_rows())
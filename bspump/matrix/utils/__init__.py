@@ -1,5 +1,10 @@
 from .closedrows import ClosedRows, PersistentClosedRows
+from .exportformat import ExportFormat, CSVExportFormat, NDJSONExportFormat, ParquetExportFormat, ExportFormats
+from .geoindex import GeoIndex, haversine
+from .hashindex import HashIndex, PersistentHashIndex
 from .index import Index, PersistentIndex
+from .rowchanges import MatrixChanges, RowChanges
+from .snapshot import write_snapshot, read_snapshot, open_snapshot, is_snapshot
 from .timeconfig import TimeConfig, PersistentTimeConfig
 from .warmingupcount import WarmingUpCount, PersistentWarmingUpCount
 
@@ -7,8 +12,23 @@ from .warmingupcount import WarmingUpCount, PersistentWarmingUpCount
 __all__ = [
 	'ClosedRows',
 	'PersistentClosedRows',
+	'ExportFormat',
+	'CSVExportFormat',
+	'NDJSONExportFormat',
+	'ParquetExportFormat',
+	'ExportFormats',
+	'GeoIndex',
+	'haversine',
+	'HashIndex',
+	'PersistentHashIndex',
 	'Index',
 	'PersistentIndex',
+	'MatrixChanges',
+	'RowChanges',
+	'write_snapshot',
+	'read_snapshot',
+	'open_snapshot',
+	'is_snapshot',
 	'TimeConfig',
 	'PersistentTimeConfig',
 	'WarmingUpCount',
@@ -3,8 +3,20 @@ import os
 
 
 class ClosedRows(object):
+	'''
+	Allocator of matrix rows, it keeps track of closed (unused) rows.
+
+	Closed rows are marked in `Closed`, a `bytearray` with one byte per row, and kept on a stack, `Free`,
+	so `pop()`, `add()` and `in` are O(1) and `get_rows()` is a vectorized NumPy operation over the bytes.
+	A `bytearray` is used rather than a NumPy array because its single items are accessed several times faster.
+
+	The stack is LIFO, `pop()` returns the row closed most recently by `add()`.
+	Rows closed at once by `extend()` or `deserialize()` are pushed so that the lowest of them is popped first.
+	'''
+
 	def __init__(self, max_len=None):
-		self.CR = set()
+		self.Closed = bytearray()
+		self.Free = []
 		if max_len is None:
 			max_len = float('inf')
 
@@ -12,64 +24,100 @@ class ClosedRows(object):
 
 
 	def pop(self):
-		return self.CR.pop()
+		try:
+			element = self.Free.pop()
+		except IndexError:
+			raise KeyError('pop from an empty set of closed rows') from None
+
+		self.Closed[element] = 0
+		return element
 
 
 	def get_rows(self):
-		return self.CR
+		'''
+		Returns sorted indexes of closed rows as a NumPy array.
+		'''
+		return np.flatnonzero(np.frombuffer(self.Closed, dtype=np.bool_))
 
 
 	def add(self, element):
-		if len(self.CR) == self.MaxLen:
+		if element in self:
+			return
+
+		if len(self.Free) == self.MaxLen:
 			raise RuntimeError("Maximum size exceeded")
 
-		self.CR.add(element)
+		self._reserve(element + 1)
+		self.Closed[element] = 1
+		self.Free.append(element)
 
 
 	def __contains__(self, element):
-		if element in self.CR:
-			return True
-		return False
+		if element is None or element < 0 or element >= len(self.Closed):
+			return False
+		return self.Closed[element] == 1
 
 
 	def serialize(self):
-		return list(self.get_rows())
+		return self.get_rows().tolist()
 
 
 	def deserialize(self, data):
-		self.CR = set(data)
+		self.flush()
+		rows = np.asarray(data, dtype='i8')
+		if rows.shape[0] > 0:
+			self._reserve(int(rows.max()) + 1)
+			np.frombuffer(self.Closed, dtype=np.bool_)[rows] = True
+		self.Free = self.get_rows()[::-1].tolist()
 
 
 	def __len__(self):
-		return len(self.CR)
+		return len(self.Free)
 
 
 	def extend(self, start, stop):
-		self.CR |= frozenset(range(start, stop))
-		if len(self.CR) >= self.MaxLen:
+		'''
+		Closes rows from `start` to `stop`, e.g. new rows of a grown matrix.
+		'''
+		self._reserve(stop)
+		self.Closed[start:stop] = b'\x01' * (stop - start)
+		# Rows are popped from the end of the stack, so the lowest rows are used first
+		self.Free.extend(range(stop - 1, start - 1, -1))
+		if len(self.Free) >= self.MaxLen:
 			raise RuntimeError("Maximum size exceeded")
 
 
 	def flush(self, size=None):
-		self.CR = set()
+		self.Closed = bytearray(len(self.Closed))
+		self.Free = []
+
+
+	def _reserve(self, size):
+		# The bytearray over-allocates, so it grows geometrically
+		if size > len(self.Closed):
+			self.Closed.extend(bytes(size - len(self.Closed)))
 
 
 
 class PersistentClosedRows(ClosedRows):
+	'''
+	Closed rows are also stored in a memory-mapped file, one byte per row of the matrix, 0 marks a closed row.
+	The file is read by a single vectorized operation when the matrix is reopened.
+	'''
+
 	def __init__(self, path, size=None, max_len=None):
 		super().__init__(max_len=max_len)
 		self.DType = 'i1'
 		self.Path = path
 		if os.path.exists(self.Path):
 			self.CRBit = np.memmap(self.Path, dtype=self.DType, mode='readwrite')
-			for i in range(len(self.CRBit)):
-				if self.CRBit[i] == 0:
-					self.CR.add(i)
+			self.Closed = bytearray((self.CRBit == 0).tobytes())
+			self.Free = self.get_rows()[::-1].tolist()
 		else:
 			if size is None:
 				raise RuntimeError("The size should correspond to array size")
-			self.CR.add(0)
 			self.ones(size)
+			self.add(0)
 
 
 	def pop(self):
@@ -84,17 +132,20 @@ class PersistentClosedRows(ClosedRows):
 
 
 	def extend(self, start, stop):
-		cr_ = np.zeros(self.CRBit.shape[0], dtype=self.DType)
-		cr_[:] = self.CRBit[:]
-		cr_.resize(stop, refcheck=False)
-		self.CRBit = np.memmap(self.Path, dtype=self.DType, mode='w+', shape=cr_.shape)
-		self.CRBit[:] = cr_[:]
+		# The file is extended in place, the new bytes are zeros, i.e. closed rows
+		self.CRBit.flush()
+		self.CRBit = None
+		with open(self.Path, 'r+b') as f:
+			f.truncate(stop * np.dtype(self.DType).itemsize)
+		self.CRBit = np.memmap(self.Path, dtype=self.DType, mode='readwrite')
+		self.CRBit[start:stop] = 0
 		super().extend(start, stop)
 
 
-	def flush(self, size):
+	def flush(self, size=None):
 		super().flush(size)
-		self.ones(size)
+		if size is not None:
+			self.ones(size)
 
 
 	def ones(self, size):
@@ -0,0 +1,199 @@
+import io
+import json
+
+import numpy as np
+
+
+class ExportFormat(object):
+	'''
+	Output format of a matrix export, see `MatrixExportGenerator`.
+
+	The export is streamed: `begin()` is called with names of columns, `write()` with every chunk of rows
+	and `end()` at the end, each of them returns bytes of the output that follow the bytes returned before.
+	A chunk is a list of 1D NumPy arrays, one array per column, all of the same length.
+	`write()` is called at least once, with an empty chunk if the matrix has no rows.
+	'''
+
+	def __init__(self, config):
+		self.Config = config
+		self.Names = None
+
+
+	def begin(self, names):
+		self.Names = names
+		return b''
+
+
+	def write(self, columns):
+		raise NotImplementedError()
+
+
+	def end(self):
+		return b''
+
+
+
+class CSVExportFormat(ExportFormat):
+	'''
+	CSV with a header line, strings are always quoted.
+
+	A chunk is formatted by a single `%` operation per row with a template of the whole line,
+	columns are converted to Python values by `tolist()`, so no value is formatted separately.
+	'''
+
+	def __init__(self, config):
+		super().__init__(config)
+		self.Delimiter = config['delimiter']
+		self.FloatFormat = config['float_format']
+
+
+	def begin(self, names):
+		super().begin(names)
+		return (self.Delimiter.join(_quote_csv(name) for name in names) + '\n').encode('utf-8')
+
+
+	def write(self, columns):
+		formats = []
+		values = []
+		for column in columns:
+			kind = column.dtype.kind
+			if kind in 'iu':
+				formats.append('%d')
+				values.append(column.tolist())
+			elif kind == 'f':
+				formats.append(self.FloatFormat)
+				values.append(column.tolist())
+			elif kind == 'b':
+				formats.append('%s')
+				values.append(column.tolist())
+			else:
+				formats.append('%s')
+				values.append([_quote_csv(value) for value in _to_str(column).tolist()])
+
+		template = self.Delimiter.replace('%', '%%').join(formats) + '\n'
+		return ''.join(map(template.__mod__, zip(*values))).encode('utf-8')
+
+
+
+class NDJSONExportFormat(ExportFormat):
+	'''
+	Newline-delimited JSON, one object per row. NaN and infinite floats are exported as `null`.
+
+	Rows are formatted by a template of the whole object, like in `CSVExportFormat`.
+	'''
+
+	def write(self, columns):
+		formats = []
+		values = []
+		for name, column in zip(self.Names, columns):
+			kind = column.dtype.kind
+			if kind in 'iu':
+				fmt = '%d'
+				column_values = column.tolist()
+			elif kind == 'f':
+				fmt = '%s'
+				finite = np.isfinite(column)
+				if finite.all():
+					column_values = column.tolist()
+				else:
+					column_values = np.where(finite, column.astype(object), 'null').tolist()
+			elif kind == 'b':
+				fmt = '%s'
+				column_values = np.where(column, 'true', 'false').tolist()
+			else:
+				fmt = '%s'
+				column_values = list(map(json.dumps, _to_str(column).tolist()))
+
+			formats.append('{}: {}'.format(json.dumps(name).replace('%', '%%'), fmt))
+			values.append(column_values)
+
+		template = '{' + ', '.join(formats) + '}\n'
+		return ''.join(map(template.__mod__, zip(*values))).encode('utf-8')
+
+
+
+class ParquetExportFormat(ExportFormat):
+	'''
+	Apache Parquet, every chunk is written as a row group. It requires the `pyarrow` package.
+
+	Bytes written by the Parquet writer are returned as soon as the chunk is written,
+	the footer of the file is returned by `end()`.
+	'''
+
+	def __init__(self, config):
+		super().__init__(config)
+		try:
+			import pyarrow
+			import pyarrow.parquet
+		except ImportError:
+			raise RuntimeError("Export to Parquet requires 'pyarrow' package") from None
+
+		self.PyArrow = pyarrow
+		self.Compression = config['compression']
+		self.Output = _DrainedOutput()
+		self.Writer = None
+
+
+	def write(self, columns):
+		pa = self.PyArrow
+		table = pa.table(dict(zip(self.Names, [pa.array(column) for column in columns])))
+		if self.Writer is None:
+			self.Writer = pa.parquet.ParquetWriter(self.Output, table.schema, compression=self.Compression)
+
+		if table.num_rows > 0:
+			self.Writer.write_table(table)
+		return self.Output.drain()
+
+
+	def end(self):
+		self.Writer.close()
+		return self.Output.drain()
+
+
+
+class _DrainedOutput(io.RawIOBase):
+	'''
+	Output stream that keeps only bytes written since the last `drain()`, `tell()` counts all written bytes.
+	'''
+
+	def __init__(self):
+		super().__init__()
+		self.Buffer = bytearray()
+		self.Position = 0
+
+
+	def writable(self):
+		return True
+
+
+	def write(self, data):
+		self.Buffer += data
+		self.Position += len(data)
+		return len(data)
+
+
+	def tell(self):
+		return self.Position
+
+
+	def drain(self):
+		data = bytes(self.Buffer)
+		self.Buffer.clear()
+		return data
+
+
+ExportFormats = {
+	'csv': CSVExportFormat,
+	'ndjson': NDJSONExportFormat,
+	'parquet': ParquetExportFormat,
+}
+
+
+def _to_str(column):
+	if column.dtype.kind in 'UO':
+		return column
+	return column.astype(np.str_)
+
+
+def _quote_csv(value):
+	return '"{}"'.format(str(value).replace('"', '""'))
@@ -0,0 +1,156 @@
+import numpy as np
+
+###
+
+EARTH_RADIUS = 6371  # km
+
+###
+
+
+def haversine(lat1, lon1, lat2, lon2):
+	'''
+	Distance between gps-coordinates in km, arguments are scalars or NumPy arrays, which are broadcast together.
+	'''
+	lat1 = np.radians(lat1)
+	lat2 = np.radians(lat2)
+	sin_lat = np.sin((lat2 - lat1) / 2)
+	sin_lon = np.sin(np.radians(np.subtract(lon2, lon1)) / 2)
+	a = sin_lat * sin_lat + sin_lon * sin_lon * np.cos(lat1) * np.cos(lat2)
+	return 2 * EARTH_RADIUS * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+
+class GeoIndex(object):
+	'''
+	Positions of entities, e.g. vehicles, bucketed by cells of a `GeoMatrix`,
+	which answers "all entities within a radius" queries without computing distances to all entities.
+
+	An entity is identified by any hashable id, its position is kept in `Lat`, `Lon` and `Cells`,
+	NumPy arrays indexed by a slot of the entity, the cell is a flat index of the matrix cell, -1 outside of the matrix.
+	Positions are updated in bulk by `update()`. Slots sorted by cells are computed by the first query after an update,
+	so a query only reads slots of cells that intersect the bounding box of the circle.
+	'''
+
+	def __init__(self, geo_matrix, size=1024):
+		self.GeoMatrix = geo_matrix
+		self.N2IMap = {}
+		self.Ids = []  # Ids of slots, None for a free slot
+		self.Free = []
+		self.Lat = np.zeros(size, dtype='f8')
+		self.Lon = np.zeros(size, dtype='f8')
+		self.Cells = np.full(size, -1, dtype='i8')
+
+		# Slots sorted by cells and their cells, None if outdated
+		self.Order = None
+		self.SortedCells = None
+
+
+	def update(self, ids, lats, lons):
+		'''
+		Sets positions of entities `ids`, new entities are added. Entities outside of the matrix are kept,
+		but they are not found by queries.
+		'''
+		lats = np.asarray(lats, dtype='f8')
+		lons = np.asarray(lons, dtype='f8')
+		slots = np.fromiter(map(self._slot, ids), dtype='i8', count=lats.shape[0])
+
+		rows, columns = self.GeoMatrix.project_many(lats, lons)
+		self.Lat[slots] = lats
+		self.Lon[slots] = lons
+		self.Cells[slots] = np.where(rows >= 0, rows * self.GeoMatrix.MapWidth + columns, -1)
+		self.Order = None
+
+
+	def remove(self, ids):
+		for entity_id in ids:
+			slot = self.N2IMap.pop(entity_id, None)
+			if slot is None:
+				continue
+
+			self.Ids[slot] = None
+			self.Cells[slot] = -1
+			self.Free.append(slot)
+
+		self.Order = None
+
+
+	def get_position(self, entity_id):
+		slot = self.N2IMap.get(entity_id)
+		if slot is None:
+			return None
+		return float(self.Lat[slot]), float(self.Lon[slot])
+
+
+	def query_radius(self, lat, lon, radius):
+		'''
+		Returns ids of entities within `radius` km from the point and a NumPy array of their distances,
+		sorted from the nearest one.
+		'''
+		self._sort()
+
+		# Bounding box of the circle
+		angle = radius / EARTH_RADIUS
+		dlat = np.degrees(angle)
+		sin_dlon = np.sin(angle) / np.cos(np.radians(lat))
+		dlon = np.degrees(np.arcsin(sin_dlon)) if 0 < sin_dlon < 1 else 180.0
+
+		rows, columns = self.GeoMatrix.project_many([lat + dlat, lat - dlat], [lon - dlon, lon + dlon], clip=True)
+
+		# Every row of the bounding box is a contiguous range of cells
+		width = self.GeoMatrix.MapWidth
+		first_cells = np.arange(rows[0], rows[1] + 1) * width + columns[0]
+		starts = np.searchsorted(self.SortedCells, first_cells)
+		stops = np.searchsorted(self.SortedCells, first_cells + (columns[1] - columns[0] + 1))
+		lengths = stops - starts
+		offsets = np.cumsum(lengths) - lengths
+		candidates = self.Order[np.repeat(starts - offsets, lengths) + np.arange(int(lengths.sum()))]
+
+		distances = haversine(lat, lon, self.Lat[candidates], self.Lon[candidates])
+		found = distances <= radius
+		candidates = candidates[found]
+		distances = distances[found]
+		nearest = np.argsort(distances, kind='stable')
+		return [self.Ids[slot] for slot in candidates[nearest].tolist()], distances[nearest]
+
+
+	def __contains__(self, entity_id):
+		return entity_id in self.N2IMap
+
+
+	def __len__(self):
+		return len(self.N2IMap)
+
+
+	def _slot(self, entity_id):
+		slot = self.N2IMap.get(entity_id)
+		if slot is not None:
+			return slot
+
+		if len(self.Free) > 0:
+			slot = self.Free.pop()
+			self.Ids[slot] = entity_id
+		else:
+			slot = len(self.Ids)
+			self.Ids.append(entity_id)
+			if slot >= self.Cells.shape[0]:
+				self._grow(max(2 * self.Cells.shape[0], 16))
+
+		self.N2IMap[entity_id] = slot
+		return slot
+
+
+	def _grow(self, size):
+		current = self.Cells.shape[0]
+		self.Lat = np.concatenate([self.Lat, np.zeros(size - current, dtype='f8')])
+		self.Lon = np.concatenate([self.Lon, np.zeros(size - current, dtype='f8')])
+		self.Cells = np.concatenate([self.Cells, np.full(size - current, -1, dtype='i8')])
+
+
+	def _sort(self):
+		if self.Order is not None:
+			return
+
+		slots = np.flatnonzero(self.Cells >= 0)
+		order = np.argsort(self.Cells[slots], kind='stable')
+		self.Order = slots[order]
+		self.SortedCells = self.Cells[self.Order]
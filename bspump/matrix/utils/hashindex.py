@@ -0,0 +1,331 @@
+import os
+import zlib
+
+import numpy as np
+
+###
+
+EMPTY = -1
+DELETED = -2
+
+###
+
+
+class HashIndex(object):
+	'''
+	Compact index of row names, an alternative to the dictionaries of `Index`.
+
+	Names are UTF-8 encoded into `Arena`, an append-only byte array, and every row keeps the `Offsets`,
+	`Lengths` and `Hashes` of its name, a row without a name has the length -1.
+	`Table` is an open-addressing hash table with linear probing, its slots contain row indexes.
+	All of them are NumPy arrays, so the index takes a few dozens of bytes per row instead of hundreds
+	and it can be stored in memory-mapped files, see `PersistentHashIndex`.
+
+	The hash of a name is CRC32 of its bytes, which, unlike `hash()`, does not change between processes.
+	Space of removed names is reclaimed by `flush()`.
+	'''
+
+	MaxLoad = 0.7
+
+
+	def __init__(self, size=0):
+		self.Table = self._create('table', 16, 'i4', EMPTY)
+		self.Offsets = self._create('offsets', size, 'i8', 0)
+		self.Lengths = self._create('lengths', size, 'i4', -1)
+		self.Hashes = self._create('hashes', size, 'u4', 0)
+		self.Arena = self._create('arena', 1024, 'u1', 0)
+		self.Count = 0  # Named rows
+		self.Deleted = 0  # Slots of removed names
+		self.ArenaSize = 0
+		self._refresh()
+
+
+	def get_row_index(self, row_name):
+		name = row_name.encode('utf-8')
+		_, row_index = self._find(name, zlib.crc32(name))
+		return row_index if row_index >= 0 else None
+
+
+	def get_row_name(self, row_index):
+		if row_index < 0 or row_index >= len(self._lengths):
+			return None
+
+		length = self._lengths[row_index]
+		if length < 0:
+			return None
+
+		offset = self._offsets[row_index]
+		return bytes(self._arena[offset:offset + length]).decode('utf-8')
+
+
+	def get_rows(self):
+		'''
+		Returns indexes of all named rows as a NumPy array.
+		'''
+		return np.flatnonzero(self.Lengths >= 0)
+
+
+	def add_row(self, name, index):
+		name_bytes = name.encode('utf-8')
+		hash = zlib.crc32(name_bytes)
+		slot, row_index = self._find(name_bytes, hash)
+		if row_index >= 0 or (index < len(self._lengths) and self._lengths[index] >= 0):
+			# The name moves to another row or the row gets another name
+			self.pop_index(row_index)
+			self.pop_index(index)
+			slot, _ = self._find(name_bytes, hash)
+
+		if index >= len(self._lengths):
+			self.extend(index + 1)
+
+		length = len(name_bytes)
+		if self.ArenaSize + length > len(self._arena):
+			self._resize('arena', max(2 * len(self._arena), self.ArenaSize + length), 0)
+
+		self._arena[self.ArenaSize:self.ArenaSize + length] = name_bytes
+		self._offsets[index] = self.ArenaSize
+		self._lengths[index] = length
+		self._hashes[index] = hash
+		self.ArenaSize += length
+
+		if self._table[slot] == DELETED:
+			self.Deleted -= 1
+		self._table[slot] = index
+		self.Count += 1
+
+		if self.Count + self.Deleted > self.MaxLoad * len(self._table):
+			self._rebuild(self.Lengths.shape[0])
+
+
+	def pop_index(self, index):
+		if index is None or index < 0 or index >= len(self._lengths) or self._lengths[index] < 0:
+			return False
+
+		table = self._table
+		mask = len(table) - 1
+		slot = self._hashes[index] & mask
+		while table[slot] != index:
+			slot = (slot + 1) & mask
+
+		table[slot] = DELETED
+		self._lengths[index] = -1
+		self.Count -= 1
+		self.Deleted += 1
+		return True
+
+
+	def flush(self, indexes):
+		'''
+		Removes `indexes`, a sorted NumPy array of closed rows, and renumbers the remaining rows
+		the same way as the rows of the flushed matrix, the arena is compacted.
+		'''
+		saved = np.ones(self.Lengths.shape[0], dtype=np.bool_)
+		saved[indexes[indexes < saved.shape[0]]] = False
+		saved_indexes = np.flatnonzero(saved & (self.Lengths >= 0))
+
+		offsets = self.Offsets[saved]
+		lengths = self.Lengths[saved]
+		hashes = self.Hashes[saved]
+
+		# Names of saved rows are moved to the beginning of the arena, in the order of rows
+		named = lengths >= 0
+		sizes = np.where(named, lengths, 0).astype('i8')
+		new_offsets = np.cumsum(sizes) - sizes
+		source = np.repeat(offsets - new_offsets, sizes) + np.arange(int(sizes.sum()), dtype='i8')
+		arena = self.Arena[source]
+
+		self._replace('offsets', new_offsets)
+		self._replace('lengths', lengths)
+		self._replace('hashes', hashes)
+		self._replace('arena', np.concatenate([arena, np.zeros(max(1024, arena.shape[0] // 2), dtype='u1')]))
+		self.ArenaSize = arena.shape[0]
+		self._rebuild(lengths.shape[0])
+		return saved_indexes
+
+
+	def serialize(self):
+		rows = self.get_rows().tolist()
+		names = [self.get_row_name(row_index) for row_index in rows]
+		return {
+			"N2IMap": dict(zip(names, rows)),
+			"I2NMap": dict(zip(rows, names)),
+		}
+
+
+	def deserialize(self, data):
+		self._replace('lengths', np.full(self.Lengths.shape[0], -1, dtype='i4'))
+		self.ArenaSize = 0
+		self._rebuild(self.Lengths.shape[0])
+		for name, row_index in data["N2IMap"].items():
+			self.add_row(name, int(row_index))
+
+
+	def extend(self, size):
+		if size > self.Lengths.shape[0]:
+			self._resize('offsets', size, 0)
+			self._resize('lengths', size, -1)
+			self._resize('hashes', size, 0)
+
+
+	def __contains__(self, row_name):
+		return self.get_row_index(row_name) is not None
+
+
+	def __len__(self):
+		return self.Count
+
+
+	def _find(self, name, hash):
+		'''
+		Returns the slot and the row of the name, or the slot for the name and -1 if the name is not in the index.
+		'''
+		table = self._table
+		hashes = self._hashes
+		mask = len(table) - 1
+		slot = hash & mask
+		free_slot = -1
+		while True:
+			row_index = table[slot]
+			if row_index >= 0:
+				if hashes[row_index] == hash:
+					offset = self._offsets[row_index]
+					if self._arena[offset:offset + self._lengths[row_index]] == name:
+						return slot, row_index
+
+			elif row_index == EMPTY:
+				return (slot if free_slot < 0 else free_slot), -1
+
+			elif free_slot < 0:
+				free_slot = slot  # DELETED
+
+			slot = (slot + 1) & mask
+
+
+	def _rebuild(self, size):
+		'''
+		Builds the hash table from names of rows, it is vectorized, slots of colliding rows are resolved in rounds.
+		'''
+		rows = np.flatnonzero(self.Lengths[:size] >= 0)
+		# The table is left half empty, so names can be added before it is rebuilt again
+		capacity = 16
+		while capacity * self.MaxLoad < 1.5 * rows.shape[0]:
+			capacity *= 2
+
+		mask = capacity - 1
+		table = np.full(capacity, EMPTY, dtype='i4')
+		slots = self.Hashes[rows].astype('i8') & mask
+		while rows.shape[0] > 0:
+			free = np.flatnonzero(table[slots] == EMPTY)
+			_, first = np.unique(slots[free], return_index=True)
+			placed = free[first]
+			table[slots[placed]] = rows[placed]
+
+			pending = np.ones(rows.shape[0], dtype=np.bool_)
+			pending[placed] = False
+			rows = rows[pending]
+			slots = (slots[pending] + 1) & mask
+
+		self._replace('table', table)
+		self.Count = int(np.count_nonzero(table >= 0))
+		self.Deleted = 0
+
+
+	def _create(self, name, size, dtype, fill):
+		return np.full(size, fill, dtype=dtype)
+
+
+	def _resize(self, name, size, fill):
+		array = getattr(self, name.capitalize())
+		resized = np.full(size, fill, dtype=array.dtype)
+		resized[:array.shape[0]] = array[:size]
+		self._replace(name, resized)
+
+
+	def _replace(self, name, array):
+		setattr(self, name.capitalize(), array)
+		self._refresh()
+
+
+	def _refresh(self):
+		# Items of memoryviews are accessed several times faster than items of NumPy arrays
+		self._table = memoryview(self.Table)
+		self._offsets = memoryview(self.Offsets)
+		self._lengths = memoryview(self.Lengths)
+		self._hashes = memoryview(self.Hashes)
+		self._arena = memoryview(self.Arena)
+
+
+
+class PersistentHashIndex(HashIndex):
+	'''
+	`HashIndex` stored in memory-mapped files in the `path` directory.
+
+	The index is reopened without parsing, the files are mapped and only a few counters are computed.
+	If `reset` is True, an existing index is replaced by an empty one.
+	'''
+
+	def __init__(self, path, size, reset=False):
+		self.Path = path
+		if not reset and os.path.exists(os.path.join(self.Path, 'table.dat')):
+			self.Table = self._open('table', 'i4')
+			self.Offsets = self._open('offsets', 'i8')
+			self.Lengths = self._open('lengths', 'i4')
+			self.Hashes = self._open('hashes', 'u4')
+			self.Arena = self._open('arena', 'u1')
+
+			named = self.Lengths >= 0
+			self.Count = int(np.count_nonzero(named))
+			self.Deleted = int(np.count_nonzero(self.Table == DELETED))
+			self.ArenaSize = int(np.max(self.Offsets[named] + self.Lengths[named], initial=0))
+			self._refresh()
+
+		else:
+			if size is None:
+				raise RuntimeError("The size should correspond to array size")
+
+			os.makedirs(self.Path, exist_ok=True)
+			super().__init__(size)
+
+
+	def _file(self, name):
+		return os.path.join(self.Path, '{}.dat'.format(name))
+
+
+	def _open(self, name, dtype):
+		return np.memmap(self._file(name), dtype=dtype, mode='r+')
+
+
+	def _create(self, name, size, dtype, fill):
+		array = np.memmap(self._file(name), dtype=dtype, mode='w+', shape=(max(size, 1),))
+		array[:] = fill
+		return array[:size] if size == 0 else array
+
+
+	def _resize(self, name, size, fill):
+		# The file is extended in place, only the new part is filled
+		array = getattr(self, name.capitalize())
+		current = array.shape[0]
+		array.flush()
+		self._release()
+		with open(self._file(name), 'r+b') as f:
+			f.truncate(size * array.dtype.itemsize)
+
+		resized = self._open(name, array.dtype)
+		resized[current:] = fill
+		setattr(self, name.capitalize(), resized)
+		self._refresh()
+
+
+	def _replace(self, name, array):
+		self._release()
+		mapped = np.memmap(self._file(name), dtype=array.dtype, mode='w+', shape=(max(array.shape[0], 1),))
+		mapped[:array.shape[0]] = array
+		setattr(self, name.capitalize(), mapped[:array.shape[0]] if array.shape[0] == 0 else mapped)
+		self._refresh()
+
+
+	def _release(self):
+		# Memoryviews keep the old mappings alive
+		for view in ('_table', '_offsets', '_lengths', '_hashes', '_arena'):
+			if hasattr(self, view):
+				getattr(self, view).release()
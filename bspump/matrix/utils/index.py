@@ -25,25 +25,31 @@ class Index(object):
 		return self.I2NMap.get(row_index)
 
 
+	def get_rows(self):
+		'''
+		Returns indexes of all named rows as a NumPy array.
+		'''
+		return np.fromiter(self.I2NMap.keys(), dtype='i8', count=len(self.I2NMap))
+
+
 	def add_row(self, name, index):
 		self.N2IMap[name] = index
 		self.I2NMap[index] = name
 
 
 	def flush(self, indexes):
-		n2imap = collections.OrderedDict()
-		i2nmap = collections.OrderedDict()
-		i = 0
-		saved_indexes = []
-		for row_name, row_index in self.N2IMap.items():
-			if row_index not in indexes:
-				n2imap[row_name] = i
-				i2nmap[i] = row_name
-				saved_indexes.append(row_index)
-				i += 1
-
-		self.N2IMap = n2imap
-		self.I2NMap = i2nmap
+		'''
+		Removes `indexes`, a sorted NumPy array of closed rows, and renumbers the remaining rows
+		the same way as the rows of the flushed matrix.
+		'''
+		rows = self.get_rows()
+		saved = np.isin(rows, indexes, invert=True)
+		saved_indexes = rows[saved]
+		new_indexes = saved_indexes - np.searchsorted(indexes, saved_indexes)
+		names = [name for name, keep in zip(self.I2NMap.values(), saved.tolist()) if keep]
+
+		self.I2NMap = collections.OrderedDict(zip(new_indexes.tolist(), names))
+		self.N2IMap = collections.OrderedDict(zip(names, new_indexes.tolist()))
 		return saved_indexes
 
 
@@ -117,7 +123,9 @@ class PersistentIndex(Index):
 
 	def flush(self, closed_indexes):
 		saved_indexes = super().flush(closed_indexes)
-		self.Map = self.Map.take(saved_indexes, axis=0)
+		saved = np.ones(self.Map.shape[0], dtype=np.bool_)
+		saved[closed_indexes[closed_indexes < self.Map.shape[0]]] = False
+		self.Map = self.Map[saved]
 		map_ = np.memmap(self.Path, dtype=self.DType, mode='w+', shape=self.Map.shape)
 		map_[:] = self.Map[:]
 		self.Map = map_
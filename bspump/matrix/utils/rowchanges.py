@@ -0,0 +1,54 @@
+import collections
+
+import numpy as np
+
+
+MatrixChanges = collections.namedtuple('MatrixChanges', ['added_rows', 'removed_rows', 'reindexed'])
+
+
+class RowChanges(object):
+	'''
+	Collects rows added to and removed from a matrix between two "Matrix changed!" notifications.
+	A row that is added and removed again in the meantime is not reported at all.
+	'''
+
+	def __init__(self):
+		self.Added = set()
+		self.Removed = set()
+		self.Reindexed = False
+
+
+	def add(self, row_index):
+		self.Added.add(row_index)
+
+
+	def remove(self, row_index):
+		if row_index in self.Added:
+			self.Added.discard(row_index)
+		else:
+			self.Removed.add(row_index)
+
+
+	def reindex(self):
+		'''
+		Rows have been renumbered, e.g. by `flush()`, so subscribers have to rebuild whatever refers to row indexes.
+		'''
+		self.Added.clear()
+		self.Removed.clear()
+		self.Reindexed = True
+
+
+	def pop(self):
+		changes = MatrixChanges(
+			added_rows=np.fromiter(sorted(self.Added), dtype='i8', count=len(self.Added)),
+			removed_rows=np.fromiter(sorted(self.Removed), dtype='i8', count=len(self.Removed)),
+			reindexed=self.Reindexed,
+		)
+		self.Added = set()
+		self.Removed = set()
+		self.Reindexed = False
+		return changes
+
+
+	def __bool__(self):
+		return self.Reindexed or len(self.Added) > 0 or len(self.Removed) > 0
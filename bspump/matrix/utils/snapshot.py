@@ -0,0 +1,114 @@
+import json
+import struct
+import zlib
+
+import numpy as np
+
+###
+
+MAGIC = b'BSPMTX\x01'
+ALIGNMENT = 64
+CHUNK_SIZE = 1 << 20  # Bytes of the array written at once
+
+COMPRESSIONS = (None, 'zlib')
+
+###
+
+
+def write_snapshot(f, array, metadata=None, compression=None):
+	'''
+	Writes a binary snapshot of the array into the file object `f`.
+
+	The snapshot starts with `MAGIC`, the size of the header and the header, a JSON object with the dtype,
+	the shape, the compression and `metadata`, which has to be JSON serializable.
+	Bytes of the array follow, aligned to 64 bytes, so an uncompressed snapshot can be loaded without a copy.
+	The array is written in chunks, which are compressed by `zlib` if `compression` is 'zlib'.
+	'''
+	if compression not in COMPRESSIONS:
+		raise ValueError("Unknown compression '{}' of a matrix snapshot".format(compression))
+
+	if array.dtype.hasobject:
+		raise ValueError("Arrays with Python objects cannot be stored in a matrix snapshot")
+
+	header = json.dumps({
+		'dtype': np.lib.format.dtype_to_descr(array.dtype),
+		'shape': array.shape,
+		'compression': compression,
+		'metadata': metadata if metadata is not None else {},
+	}).encode('utf-8')
+
+	prefix = len(MAGIC) + 4
+	header += b' ' * (-(prefix + len(header)) % ALIGNMENT)
+	f.write(MAGIC)
+	f.write(struct.pack('<I', len(header)))
+	f.write(header)
+
+	data = memoryview(np.ascontiguousarray(array)).cast('B')
+	compressor = zlib.compressobj() if compression == 'zlib' else None
+	for start in range(0, len(data), CHUNK_SIZE):
+		chunk = data[start:start + CHUNK_SIZE]
+		f.write(chunk if compressor is None else compressor.compress(chunk))
+
+	if compressor is not None:
+		f.write(compressor.flush())
+
+
+def read_snapshot(data):
+	'''
+	Reads a snapshot written by `write_snapshot` from a bytes-like object, e.g. `bytes` or `mmap`.
+
+	An uncompressed array is not copied, it uses the memory of `data`, so it is read-only if `data` is immutable.
+
+	:return: tuple of the array and the metadata
+	'''
+	header, offset = _read_header(data)
+	dtype = np.lib.format.descr_to_dtype(header['dtype'])
+	shape = tuple(header['shape'])
+	count = int(np.prod(shape))
+
+	if header['compression'] is None:
+		array = np.frombuffer(data, dtype=dtype, count=count, offset=offset)
+	else:
+		array = np.frombuffer(bytearray(zlib.decompress(memoryview(data)[offset:])), dtype=dtype, count=count)
+
+	return array.reshape(shape), header['metadata']
+
+
+def open_snapshot(path):
+	'''
+	Opens a snapshot file, an uncompressed array is memory-mapped in copy-on-write mode,
+	so it is loaded lazily and changes of the array are not written to the file.
+
+	:return: tuple of the array and the metadata
+	'''
+	with open(path, 'rb') as f:
+		prefix = f.read(len(MAGIC) + 4)
+		if len(prefix) < len(MAGIC) + 4:
+			raise ValueError("'{}' is not a matrix snapshot".format(path))
+		header, offset = _read_header(prefix + f.read(struct.unpack('<I', prefix[len(MAGIC):])[0]))
+
+		if header['compression'] is not None:
+			f.seek(0)
+			return read_snapshot(f.read())
+
+	dtype = np.lib.format.descr_to_dtype(header['dtype'])
+	shape = tuple(header['shape'])
+	if 0 in shape:
+		return np.zeros(shape, dtype=dtype), header['metadata']
+
+	array = np.memmap(path, dtype=dtype, mode='c', offset=offset, shape=shape)
+	return array, header['metadata']
+
+
+def is_snapshot(data):
+	return bytes(data[:len(MAGIC)]) == MAGIC
+
+
+def _read_header(data):
+	if not is_snapshot(data):
+		raise ValueError("Data is not a matrix snapshot")
+
+	prefix = len(MAGIC) + 4
+	size, = struct.unpack('<I', data[len(MAGIC):prefix])
+	header = json.loads(bytes(data[prefix:prefix + size]).decode('utf-8'))
+	return header, prefix + size
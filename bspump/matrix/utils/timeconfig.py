@@ -9,12 +9,14 @@ class TimeConfig(object):
 			('columns', 'i8'),
 			('start', 'f8'),
 			('end', 'f8'),
+			('head', 'i8'),  # Index of the column with the oldest time slot, see `TimeWindowMatrix`
 		]
 		self.TC = np.zeros(1, dtype=self.DType)
 		self.TC['resolution'][0] = resolution
 		self.TC['columns'][0] = columns
 		self.TC['start'][0] = start
 		self.TC['end'][0] = start - (resolution * columns)
+		self.TC['head'][0] = 0
 
 
 	def get_resolution(self):
@@ -29,6 +31,9 @@ class TimeConfig(object):
 	def get_end(self):
 		return self.TC['end'][0]
 
+	def get_head(self):
+		return int(self.TC['head'][0])
+
 	def set_resolution(self, resolution):
 		self.TC['resolution'][0] = resolution
 
@@ -38,6 +43,9 @@ class TimeConfig(object):
 	def set_end(self, end):
 		self.TC['end'][0] = end
 
+	def set_head(self, head):
+		self.TC['head'][0] = head
+
 	def add_start(self, time):
 		self.TC['start'][0] += time
 
@@ -49,9 +57,15 @@ class PersistentTimeConfig(TimeConfig):
 	def __init__(self, path, resolution, columns, start):
 		super().__init__(resolution, columns, start)
 		self.Path = path
-		if os.path.exists(self.Path):
+		if os.path.exists(self.Path) and os.path.getsize(self.Path) == self.TC.itemsize:
 			self.TC = np.memmap(self.Path, dtype=self.DType, mode='readwrite')
 		else:
+			if os.path.exists(self.Path):
+				# The time config of an older version has no head, its columns are in the time order
+				tc = np.fromfile(self.Path, dtype=self.DType[:-1], count=1)
+				for name in ('resolution', 'columns', 'start', 'end'):
+					self.TC[name][0] = tc[name][0]
+
 			tc = np.memmap(self.Path, dtype=self.DType, mode='w+', shape=(1,))
 			tc[:] = self.TC[:]
 			self.TC = tc
@@ -8,9 +8,24 @@ class WarmingUpCount(object):
 		self.WUC = np.empty(size, dtype=self.DType)
 
 
-	def decrease(self, indexes):
-		self.WUC[indexes] -= 1
-		self.WUC[self.WUC < 0] = 0
+	def decrease(self, indexes=None, exclude=None):
+		'''
+		Decreases counts of rows at `indexes`, of all rows by default, except rows at `exclude`.
+		Counts of all rows are decreased in place.
+		'''
+		if indexes is not None:
+			self.WUC[indexes] -= 1
+			self.WUC[self.WUC < 0] = 0
+			return
+
+		if exclude is not None:
+			excluded = self.WUC[exclude]
+
+		self.WUC -= 1
+		np.maximum(self.WUC, 0, out=self.WUC)
+
+		if exclude is not None:
+			self.WUC[exclude] = excluded
 
 
 	def extend(self, size, value):
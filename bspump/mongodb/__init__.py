@@ -1,8 +1,12 @@
-from .connection import MongoDBConnection
-from .source import MongoDBSource
-from .lookup import MongoDBLookup
-from .sink import MongoDBSink
-from .changestreamsource import MongoDBChangeStreamSource
+from ..lazy import lazy_import
+
+__getattr__, __dir__ = lazy_import(__name__, {
+	"MongoDBConnection": ".connection",
+	"MongoDBSource": ".source",
+	"MongoDBLookup": ".lookup",
+	"MongoDBSink": ".sink",
+	"MongoDBChangeStreamSource": ".changestreamsource",
+})
 
 __all__ = (
 	'MongoDBChangeStreamSource',
@@ -1,4 +1,8 @@
-from .sink import ParquetSink
+from ..lazy import lazy_import
+
+__getattr__, __dir__ = lazy_import(__name__, {
+	"ParquetSink": ".sink",
+})
 
 __all__ = (
 	'ParquetSink',
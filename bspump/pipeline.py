@@ -8,13 +8,16 @@ import logging
 import time
 
 import asab
-import asab.api
 from .abc.connection import Connection
 from .abc.generator import Generator
+from .abc.processor import ProcessorBase
 from .abc.sink import Sink
 from .abc.source import Source
 from .analyzer import Analyzer
+from .context import Context
 from .exception import ProcessingError
+from .histogram import LatencyHistogram
+from .scheduler import Scheduler
 
 #
 
@@ -51,6 +54,19 @@ class Pipeline(abc.ABC, asab.ConfigObject):
 	ConfigDefaults = {
 		"async_concurency_limit": 1000,  # TODO concurrency
 		"reset_profiler": True,
+		# Profiling of processors: 'full' times every event, 'sampled:N' times every Nth event
+		# and extrapolates the results, 'off' disables the profiling
+		"profiler": "full",
+		# Latency histograms of processors and of the pipeline record every Nth event in the 'full' profiling,
+		# each event timed by the 'sampled:N' profiling is recorded
+		"latency_sampling": 50,
+		# Events are timestamped when they enter the pipeline, the latency from the ingress to a sink
+		# and the queue wait of InternalSources are recorded, see Pipeline.inject()
+		"latency_tracing": False,
+		# When the sharding is enabled (see bspump.shard), the pipeline is replicated in all shard workers,
+		# otherwise it runs only in the supervisor process; sources of the pipeline have to split the input
+		# between workers (e.g. Kafka consumer group or locked files), see Source.ShardSplit
+		"shard": True,
 	}
 
 	def __init__(self, app, id=None, config=None):
@@ -76,9 +92,15 @@ class Pipeline(abc.ABC, asab.ConfigObject):
 		self.App = app
 		self.Loop = app.Loop
 
-		self.AsyncFutures = []
+		self.AsyncFutures = set()
 		self.AsyncConcurencyLimit = int(self.Config["async_concurency_limit"])
 		self.ResetProfiler = self.Config.getboolean("reset_profiler")
+		self.ProfilerSampling = self._parse_profiler(self.Config["profiler"])
+		self._profiler_counter = 0
+		self.LatencySampling = max(int(self.Config["latency_sampling"]), 1)
+		self._latency_counter = 0
+		self.LatencyTracing = self.Config.getboolean("latency_tracing")
+		self.Sharded = self.Config.getboolean("shard")
 		assert (self.AsyncConcurencyLimit > 1)
 
 		# This object serves to identify the throttler, because list cannot be used as a throttler
@@ -87,6 +109,9 @@ class Pipeline(abc.ABC, asab.ConfigObject):
 		self.Sources = []
 		self.Processors = [[]]  # List of lists of processors, the depth is increased by a Generator object
 
+		# Precomputed processing steps for each depth, see compile()
+		self._execution_plan = [()]
+
 		# Publish-Subscribe for this pipeline
 		self.PubSub = asab.PubSub(app)
 		self.MetricsService = app.get_service('asab.MetricsService')
@@ -120,6 +145,18 @@ class Pipeline(abc.ABC, asab.ConfigObject):
 		)
 		self.ProfilerCounter = {}
 
+		# Latency histograms of processors and of the whole pipeline, reported on the metrics flush
+		self.ProfilerHistogram = {}
+		self._profiler_latency_gauges = {}
+		self.LatencyHistogram = LatencyHistogram()
+		self.MetricsLatencyGauge = self._create_latency_gauge("bspump.pipeline.latency", {'pipeline': self.Id})
+		self._latency_reports = []  # Other histograms reported on the metrics flush, see create_latency_histogram()
+
+		if self.LatencyTracing:
+			# The latency from the ingress into this pipeline and from the ingress into the first pipeline of the topology to a sink
+			self.TraceHistogram = self.create_latency_histogram("bspump.pipeline.trace", {'pipeline': self.Id, 'span': 'pipeline'})
+			self.TraceOriginHistogram = self.create_latency_histogram("bspump.pipeline.trace", {'pipeline': self.Id, 'span': 'origin'})
+
 		app.PubSub.subscribe(
 			"Metrics.flush!",
 			self._on_metrics_flush
@@ -141,12 +178,35 @@ class Pipeline(abc.ABC, asab.ConfigObject):
 		self._ready = asyncio.Event()
 		self._ready.clear()
 
-		# Chillout is used to break a pipeline processing to smaller tasks that allows other event in event loop to be processed
-		self._chillout_trigger = 10000
-		self._chillout_counter = 0
+		# The processing is broken into time slices, so that other tasks in the event loop can run in between
+		self.Scheduler = app.get_service("bspump.Scheduler")
+		if self.Scheduler is None:
+			# The application is not a BSPumpApplication, pipelines of the application share a default scheduler
+			self.Scheduler = Scheduler(app)
+		self._slice_deadline = 0.0
 
 		self._context = {}
 
+	def _parse_profiler(self, profiler):
+		"""
+		Returns the profiler sampling: 1 for every event, N for every Nth event, 0 when the profiling is disabled.
+		"""
+		profiler = str(profiler).strip().lower()
+		if profiler == "full":
+			return 1
+		if profiler == "off":
+			return 0
+		if profiler.startswith("sampled:"):
+			try:
+				sampling = int(profiler[8:])
+			except ValueError:
+				sampling = 0
+			if sampling > 0:
+				return sampling
+
+		L.warning("Incorrect/unknown 'profiler' configuration value '{}' - defaulting to 'full'".format(profiler))
+		return 1
+
 	def time(self):
 		"""
 		Returns correct time.
@@ -192,6 +252,52 @@ class Pipeline(abc.ABC, asab.ConfigObject):
 			self.MetricsGauge.set("warning.ratio", values["warning"] / values["event.in"])
 			self.MetricsGauge.set("error.ratio", values["error"] / values["event.in"])
 
+		self._report_latency(self.LatencyHistogram, self.MetricsLatencyGauge)
+		for processor_id, histogram in self.ProfilerHistogram.items():
+			self._report_latency(histogram, self._profiler_latency_gauges[processor_id])
+		for histogram, gauge in self._latency_reports:
+			self._report_latency(histogram, gauge)
+
+	def create_latency_histogram(self, metric_name, tags):
+		"""
+		Creates a :meth:`LatencyHistogram <bspump.LatencyHistogram()>`, which is reported as a gauge with p50, p90, p99 and max durations
+		on every metrics flush of the :meth:`Pipeline <bspump.Pipeline()>`.
+
+		**Parameters**
+
+		metric_name : str
+				Name of the gauge.
+
+		tags : dict
+				Tags of the gauge.
+
+		:return: LatencyHistogram
+
+		"""
+		histogram = LatencyHistogram()
+		self._latency_reports.append((histogram, self._create_latency_gauge(metric_name, tags)))
+		return histogram
+
+	def _create_latency_gauge(self, metric_name, tags):
+		return self.MetricsService.create_gauge(
+			metric_name,
+			tags=tags,
+			init_values={
+				'p50': 0.0,
+				'p90': 0.0,
+				'p99': 0.0,
+				'max': 0.0,
+			}
+		)
+
+	def _report_latency(self, histogram, gauge):
+		summary = histogram.summary()
+		for key in ('p50', 'p90', 'p99', 'max'):
+			gauge.set(key, summary[key])
+
+		if self.ResetProfiler:
+			histogram.reset()
+
 	def is_error(self):
 		"""
 		Returns False when there is no error, otherwise it returns True.
@@ -386,14 +492,27 @@ class Pipeline(abc.ABC, asab.ConfigObject):
 
 		"""
 
-		self._chillout_counter += 1
-		if self._chillout_counter >= self._chillout_trigger:
-			self._chillout_counter = 0
-			await asyncio.sleep(0)
+		if time.perf_counter() >= self._slice_deadline:
+			await self._next_slice()
 
 		await self._ready.wait()
 		return True
 
+	async def chillout(self):
+		"""
+		Yields to the event loop when the time budget of the current slice of the :meth:`Pipeline <bspump.Pipeline()>` is exhausted.
+		The budget is given by the `bspump.Scheduler` service, see `[bspump:scheduler]` configuration.
+
+		:hint: Sources don't need to call this method in a regular processing, it is called by `ready()`, `process()` and `process_batch()`.
+
+		"""
+		if time.perf_counter() >= self._slice_deadline:
+			await self._next_slice()
+
+	async def _next_slice(self):
+		await self.Scheduler.yield_slice()
+		self._slice_deadline = time.perf_counter() + self.Scheduler.TimeBudget
+
 	def is_ready(self):
 		"""
 		This method is a check up of the event in the Event class.
@@ -404,41 +523,172 @@ class Pipeline(abc.ABC, asab.ConfigObject):
 		return self._ready.is_set()
 
 	def _do_process(self, event, depth, context):
-		for processor in self.Processors[depth]:
+		# The weight of the profiled event, 0 means that the event is not profiled
+		weight = self.ProfilerSampling
+		if weight > 1:
+			self._profiler_counter += 1
+			if self._profiler_counter < weight:
+				weight = 0
+			else:
+				self._profiler_counter = 0
+
+		# The weight of the event in latency histograms, 0 means that the event is not recorded
+		latency = weight
+		if weight == 1:
+			self._latency_counter += 1
+			if self._latency_counter < self.LatencySampling:
+				latency = 0
+			else:
+				self._latency_counter = 0
+				latency = self.LatencySampling
 
-			t0 = time.perf_counter()
-			try:
-				event = processor.process(context, event)
+		# The end-to-end latency is measured from the top depth
+		t_event = time.perf_counter() if latency > 0 and depth == 0 else None
 
-			except BaseException as e:
-				if depth > 0:
-					raise  # Handle error on the top depth
-				self.set_error(context, event, e)
-				event = None  # Event is discarted
+		try:
+			for processor, process, _, profiler_counter, histogram, consumed in self._execution_plan[depth]:
+
+				if weight > 0:
+					t0 = time.perf_counter()
+				try:
+					event = process(context, event)
+
+				except BaseException as e:
+					if depth > 0:
+						raise  # Handle error on the top depth
+					self.set_error(context, event, e)
+					event = None  # Event is discarted
+
+				finally:
+					if weight > 0:
+						# The sampled measurement is extrapolated to all events that were not profiled
+						duration = time.perf_counter() - t0
+						profiler_counter.add('duration', duration * weight)
+						profiler_counter.add('run', weight)
+						if latency > 0:
+							histogram.record(duration, latency)
+
+				if event is None:  # Event has been consumed on the way
+					if consumed is not None:
+						self.MetricsEPSCounter.add(consumed[0], 1)
+						self.MetricsCounter.add(consumed[1], 1)
+						if self.LatencyTracing and consumed[0] == 'eps.out':
+							self._trace_sink(context, 1)
+					return
+
+			assert (event is not None)
+
+			self.set_error(
+				context,
+				event,
+				ProcessingError("Incomplete pipeline, event '{}' is not consumed by a Sink".format(event))
+			)
+
+		finally:
+			if t_event is not None:
+				self.LatencyHistogram.record(time.perf_counter() - t_event, latency)
+
+	def _do_process_batch(self, events, depth, context):
+		# Batches are profiled as a whole, unless the profiling is disabled
+		profile = self.ProfilerSampling > 0
+		t_batch = time.perf_counter() if profile and depth == 0 else None
+		try:
+			self._do_process_batch_plan(events, depth, context, profile)
+		finally:
+			if t_batch is not None and len(events) > 0:
+				# Every event of the batch is accounted with the average latency
+				self.LatencyHistogram.record((time.perf_counter() - t_batch) / len(events), len(events))
+
+	def _do_process_batch_plan(self, events, depth, context, profile):
+		for processor, process, process_batch, profiler_counter, histogram, consumed in self._execution_plan[depth]:
+			count = len(events)
+
+			if profile:
+				t0 = time.perf_counter()
+			try:
+				if process_batch is None:
+					# The processor is not batch-aware, errors are handled for each event separately
+					events = self._do_process_batch_fallback(process, events, depth, context)
+				else:
+					try:
+						events = process_batch(context, events)
+					except BaseException as e:
+						if depth > 0:
+							raise  # Handle error on the top depth
+						self.set_error(context, events, e)
+						events = None  # The whole batch is discarted
+
+					if events is None:
+						events = []
 
 			finally:
-				self.ProfilerCounter[processor.Id].add('duration', time.perf_counter() - t0)
-				self.ProfilerCounter[processor.Id].add('run', 1)
-
-			if event is None:  # Event has been consumed on the way
-				if len(self.Processors) == (depth + 1):
-					if isinstance(processor, Sink):
-
-						self.MetricsEPSCounter.add('eps.out', 1)
-						self.MetricsCounter.add('event.out', 1)
-					else:
-						self.MetricsEPSCounter.add('eps.drop', 1)
-						self.MetricsCounter.add('event.drop', 1)
+				if profile:
+					duration = time.perf_counter() - t0
+					profiler_counter.add('duration', duration)
+					profiler_counter.add('run', count)
+					if count > 0:
+						histogram.record(duration / count, count)
+
+			if consumed is not None and count > len(events):
+				self.MetricsEPSCounter.add(consumed[0], count - len(events))
+				self.MetricsCounter.add(consumed[1], count - len(events))
+				if self.LatencyTracing and consumed[0] == 'eps.out':
+					self._trace_sink(context, count - len(events))
+
+			if len(events) == 0:  # All events have been consumed on the way
 				return
 
-		assert (event is not None)
-
 		self.set_error(
 			context,
-			event,
-			ProcessingError("Incomplete pipeline, event '{}' is not consumed by a Sink".format(event))
+			events[0],
+			ProcessingError("Incomplete pipeline, event '{}' is not consumed by a Sink".format(events[0]))
 		)
 
+	def _do_process_batch_fallback(self, process, events, depth, context):
+		result = []
+		for event in events:
+			try:
+				event = process(context, event)
+			except BaseException as e:
+				if depth > 0:
+					raise  # Handle error on the top depth
+				self.set_error(context, event, e)
+				continue  # Event is discarted
+
+			if event is not None:
+				result.append(event)
+
+		return result
+
+	def _trace_ingress(self, context):
+		now = self.Loop.time()
+		context['ingress_time'] = now
+
+		# The origin is inherited from the upstream pipeline, e.g. via InternalSource
+		origin = context.get('origin_time')
+		if origin is None:
+			ancestor = context.get('ancestor')
+			if ancestor is not None:
+				origin = ancestor.get('origin_time')
+		context['origin_time'] = origin if origin is not None else now
+
+	def _trace_sink(self, context, count):
+		now = self.Loop.time()
+		ingress = context.get('ingress_time')
+		if ingress is not None:
+			self.TraceHistogram.record(now - ingress, count)
+		origin = context.get('origin_time')
+		if origin is not None:
+			self.TraceOriginHistogram.record(now - origin, count)
+
+	def _layer_context(self, context):
+		# The pipeline context takes precedence, writes of processors go only to the new Context
+		if context is None:
+			return Context(self._context)
+		if len(self._context) == 0:
+			return Context(context)
+		return Context(self._context, context)
+
 	def inject(self, context, event, depth):
 		"""
 		Injects method serves to inject events into the :meth:`Pipeline <bspump.Pipeline()>`'s depth defined by the depth attribute.
@@ -446,8 +696,9 @@ class Pipeline(abc.ABC, asab.ConfigObject):
 
 		**Parameters**
 
-		context : string
+		context : dict
 				Information propagated through the :meth:`Pipeline <bspump.Pipeline()>`.
+				Processors receive a copy-on-write :meth:`Context <bspump.Context()>` view of it, so the original is not modified.
 
 		event : Data with time stamp stored in any data type, usually it is in JSON.
 				You can specify an event that is passed to the method.
@@ -457,14 +708,14 @@ class Pipeline(abc.ABC, asab.ConfigObject):
 
 		:note: For normal operations, it is highly recommended to use process method instead.
 
-		"""
+		:hint: When `latency_tracing` is enabled, events injected into the depth 0 are timestamped in the context,
+				see `ingress_time` and `origin_time` context keys.
 
-		if context is None:
-			context = self._context.copy()
-		else:
-			context = context.copy()
-			context.update(self._context)
+		"""
 
+		context = self._layer_context(context)
+		if depth == 0 and self.LatencyTracing:
+			self._trace_ingress(context)
 		self._do_process(event, depth, context)
 
 	async def process(self, event, context=None):
@@ -484,6 +735,9 @@ class Pipeline(abc.ABC, asab.ConfigObject):
 
 		"""
 
+		if time.perf_counter() >= self._slice_deadline:
+			await self._next_slice()
+
 		while not self.is_ready():
 			await self.ready()
 
@@ -492,6 +746,62 @@ class Pipeline(abc.ABC, asab.ConfigObject):
 
 		self.inject(context, event, depth=0)
 
+	def inject_batch(self, context, events, depth):
+		"""
+		Injects a batch of events into the :meth:`Pipeline <bspump.Pipeline()>`'s depth defined by the depth attribute.
+		All events of the batch share the same context, which is copied only once per batch.
+
+		**Parameters**
+
+		context : dict
+				Information propagated through the :meth:`Pipeline <bspump.Pipeline()>`, shared by all events of the batch.
+
+		events : list
+				List of events.
+
+		depth : int
+				Level of depth.
+
+		:note: For normal operations, it is highly recommended to use process_batch method instead.
+
+		"""
+
+		context = self._layer_context(context)
+		if depth == 0 and self.LatencyTracing:
+			self._trace_ingress(context)
+		self._do_process_batch(events, depth, context)
+
+	async def process_batch(self, events, context=None):
+		"""
+		Process a batch of events at once, the batch is passed to :meth:`Processor.process_batch() <bspump.Processor.process_batch()>`
+		of each :meth:`Processor <bspump.Processor()>`, so the per-event overhead of the :meth:`Pipeline <bspump.Pipeline()>` is paid once per batch.
+
+		**Parameters**
+
+		events : list
+				List of events.
+
+		context : dict, default None
+				Additional information shared by all events of the batch.
+
+		:hint: Processors that do not override `process_batch()` receive the events one by one, with the same error handling as in `process()`.
+
+		"""
+
+		if len(events) == 0:
+			return
+
+		if time.perf_counter() >= self._slice_deadline:
+			await self._next_slice()
+
+		while not self.is_ready():
+			await self.ready()
+
+		self.MetricsEPSCounter.add('eps.in', len(events))
+		self.MetricsCounter.add('event.in', len(events))
+
+		self.inject_batch(context, events, depth=0)
+
 
 
 	def create_eps_counter(self):
@@ -530,6 +840,8 @@ class Pipeline(abc.ABC, asab.ConfigObject):
 		coro : ??
 				??
 
+		:return: The scheduled future.
+
 		:hint: If the number of futures exceeds the configured limit, the :meth:`Pipeline <bspump.Pipeline()>` is throttled.
 
 		|
@@ -538,12 +850,14 @@ class Pipeline(abc.ABC, asab.ConfigObject):
 
 		future = asyncio.ensure_future(coro)
 		future.add_done_callback(self._future_done)
-		self.AsyncFutures.append(future)
+		self.AsyncFutures.add(future)
 
 		# Throttle when the number of futures exceeds the max count
 		if len(self.AsyncFutures) == self.AsyncConcurencyLimit:
 			self.throttle(self.AsyncFuturesThrottler, True)
 
+		return future
+
 
 	def _future_done(self, future):
 
@@ -551,7 +865,10 @@ class Pipeline(abc.ABC, asab.ConfigObject):
 		if len(self.AsyncFutures) == self.AsyncConcurencyLimit:
 			self.throttle(self.AsyncFuturesThrottler, False)
 
-		self.AsyncFutures.remove(future)
+		self.AsyncFutures.discard(future)
+
+		if future.cancelled():
+			return
 
 		exception = future.exception()
 		if exception is not None:
@@ -621,8 +938,14 @@ class Pipeline(abc.ABC, asab.ConfigObject):
 					continue
 				del depth[idx]
 				del self.ProfilerCounter[processor.Id]
+				self.ProfilerHistogram.pop(processor.Id, None)
+				gauge = self._profiler_latency_gauges.pop(processor.Id, None)
+				if gauge is not None:
+					# The removed processor does not report its latency anymore
+					self.MetricsService.del_metric(gauge)
 				if isinstance(processor, Analyzer):
 					del self.ProfilerCounter['analyzer_' + processor.Id]
+				self.compile()
 				return
 		raise KeyError("Cannot find processor '{}'".format(processor_id))
 
@@ -693,6 +1016,66 @@ class Pipeline(abc.ABC, asab.ConfigObject):
 				reset=self.ResetProfiler,
 			)
 
+		self.build_latency_profiling(processor)
+		self.compile()
+
+	def build_latency_profiling(self, processor):
+		"""
+		Creates the latency histogram of the :meth:`processor <bspump.Processor()>`
+		and its `bspump.pipeline.latency` gauge with p50, p90, p99 and max durations.
+
+		"""
+		self.ProfilerHistogram[processor.Id] = LatencyHistogram()
+		if processor.Id not in self._profiler_latency_gauges:
+			self._profiler_latency_gauges[processor.Id] = self._create_latency_gauge("bspump.pipeline.latency", {
+				'processor': processor.Id,
+				'pipeline': self.Id,
+			})
+
+	def compile(self):
+		"""
+		Precomputes the execution plan of the :meth:`Pipeline <bspump.Pipeline()>` from its :meth:`Processors <bspump.Processor()>`,
+		so that the processing of an event does no lookups and type checks.
+		Each step of the plan holds a processor, its bound `process` and `process_batch` methods,
+		its profiler counter and latency histogram and the metrics that count an event consumed by the processor.
+
+		The plan is recompiled automatically when a :meth:`Processor <bspump.Processor()>` is added or removed.
+
+		:hint: Call this method when the :meth:`Processors <bspump.Processor()>` or their profiler counters are modified directly.
+
+		"""
+		plan = []
+		last_depth = len(self.Processors) - 1
+
+		for depth, processors in enumerate(self.Processors):
+			steps = []
+
+			for processor in processors:
+				if depth != last_depth:
+					consumed = None  # The event continues in the next depth
+				elif isinstance(processor, Sink):
+					consumed = ('eps.out', 'event.out')
+				else:
+					consumed = ('eps.drop', 'event.drop')
+
+				if type(processor).process_batch is ProcessorBase.process_batch:
+					process_batch = None
+				else:
+					process_batch = processor.process_batch
+
+				steps.append((
+					processor,
+					processor.process,
+					process_batch,
+					self.ProfilerCounter.get(processor.Id),
+					self.ProfilerHistogram.get(processor.Id),
+					consumed,
+				))
+
+			plan.append(tuple(steps))
+
+		self._execution_plan = plan
+
 	def build(self, source, *processors):
 		"""
 		This method enables to add sources, :meth:`Processors <bspump.Processor()>`, and sink to create the structure of the :meth:`Pipeline <bspump.Pipeline()>`.
@@ -829,9 +1212,22 @@ class Pipeline(abc.ABC, asab.ConfigObject):
 			'Sources': self.Sources,
 			'Processors': [],
 			'Metrics': self.MetricsService.Storage.Metrics,
+			'Latency': {
+				'Pipeline': self.LatencyHistogram.summary(),
+				'Processors': {
+					processor_id: histogram.summary()
+					for processor_id, histogram in self.ProfilerHistogram.items()
+				},
+			},
 			'Log': [record.__dict__ for record in self.L.Deque]
 		}
 
+		if self.LatencyTracing:
+			rest['Latency']['Trace'] = {
+				'Pipeline': self.TraceHistogram.summary(),
+				'Origin': self.TraceOriginHistogram.summary(),
+			}
+
 		for processors in self.Processors:
 			rest['Processors'].append(processors)
 
@@ -67,7 +67,7 @@ class PumpBuilder(object):
 		else:
 			with open(definition) as f:
 				if definition.endswith(".yaml"):
-					self.Definition = yaml.load(f)
+					self.Definition = yaml.safe_load(f)
 				else:
 					self.Definition = json.load(f)
 
@@ -144,7 +144,7 @@ class PumpBuilder(object):
 	def construct_pipeline(self, app, svc, pipeline_definition):
 		svc = app.get_service("bspump.PumpService")
 		pipeline_id = pipeline_definition["id"]
-		pipeline = Pipeline(app, pipeline_id)
+		pipeline = Pipeline(app, pipeline_id, config=pipeline_definition.get("config"))
 
 		sources_definition = pipeline_definition["sources"]
 		processors_definition = pipeline_definition.get("processors")
@@ -1,6 +1,8 @@
 import logging
-import asyncio
 import random
+
+import asab
+
 from ..abc.source import TriggerSource
 
 
@@ -25,8 +27,6 @@ class RandomSource(TriggerSource):
 		'number': 1000,
 		'lower_bound': 0,
 		'upper_bound': 1000,
-		'event_idle_time': 0.01,
-		'events_till_idle': 10000,
 	}
 
 	def __init__(self, app, pipeline, choice=None, id=None, config=None):
@@ -34,9 +34,6 @@ class RandomSource(TriggerSource):
 		self.Number = int(self.Config['number'])
 		self.LowerBound = int(self.Config['lower_bound'])
 		self.UpperBound = int(self.Config['upper_bound'])
-		self.EventIdleTime = float(self.Config['event_idle_time'])
-		self.EventsTillIdle = int(self.Config['events_till_idle'])
-		self.EventCounter = 0
 		self.Choice = None
 		self.Field = None
 		if choice is not None:
@@ -45,6 +42,13 @@ class RandomSource(TriggerSource):
 		if self.Config['field'] != '':
 			self.Field = self.Config['field']
 
+		# The pipeline yields to the event loop by its scheduler, see `cycle()`
+		for option in ("event_idle_time", "events_till_idle"):
+			if option in self.Config:
+				asab.LogObsolete.warning(
+					"The '{}' option of '{}' is ignored, configure the time budget in [bspump:scheduler] instead.".format(option, self.Id)
+				)
+
 
 	def generate_random(self):
 		'''
@@ -65,9 +69,5 @@ class RandomSource(TriggerSource):
 	async def cycle(self):
 		for i in range(0, self.Number):
 			event = self.generate_random()
+			# The pipeline yields to the event loop when its time slice is exhausted
 			await self.process(event)
-			if self.EventCounter >= self.EventsTillIdle:
-				await asyncio.sleep(self.EventIdleTime)
-				self.EventCounter = 0
-
-			self.EventCounter += 1
@@ -0,0 +1,108 @@
+import asyncio
+import logging
+
+import asab
+
+#
+
+L = logging.getLogger(__name__)
+
+#
+
+asab.Config.add_defaults(
+	{
+		"bspump:scheduler": {
+			"time_budget": 0.005,  # Seconds, a source yields to the event loop when it runs longer than that
+			"min_time_budget": 0.0005,  # Seconds, the lower limit of the budget when the event loop lags
+			"lag_probe_interval": 0.1,  # Seconds, how often the event loop lag is measured
+		},
+	}
+)
+
+
+class Scheduler(asab.Service):
+	"""
+	Scheduler shares the event loop fairly among sources of all pipelines.
+
+	Pipelines measure the wall time of their processing slices and yield to the event loop
+	when the time budget of the slice is exhausted, see `Pipeline.ready()`.
+	The scheduler measures the lag of the event loop, i.e. how late are timers executed,
+	and it adapts the budget: it is halved when the lag exceeds the configured budget,
+	and it grows back to the configured value when the loop keeps up.
+
+	"""
+
+	def __init__(self, app, service_name="bspump.Scheduler"):
+		super().__init__(app, service_name)
+
+		config = asab.Config["bspump:scheduler"]
+		self.MaxTimeBudget = config.getfloat("time_budget")
+		self.MinTimeBudget = min(config.getfloat("min_time_budget"), self.MaxTimeBudget)
+		self.LagProbeInterval = config.getfloat("lag_probe_interval")
+
+		self.TimeBudget = self.MaxTimeBudget  # The current, adapted budget
+		self.Lag = 0.0
+
+		self._lag_max = 0.0
+		self._yields = 0
+		self._probe_handle = None
+
+		self.Loop = app.Loop
+
+		# The application may run without metrics, e.g. when it is not a BSPumpApplication
+		self.Gauge = None
+		metrics_service = app.get_service('asab.MetricsService')
+		if metrics_service is not None:
+			self.Gauge = metrics_service.create_gauge(
+				"bspump.scheduler",
+				init_values={
+					"loop.lag": 0.0,
+					"loop.lag.max": 0.0,
+					"time_budget": self.TimeBudget,
+					"yields": 0,
+				}
+			)
+			app.PubSub.subscribe("Metrics.flush!", self._on_metrics_flush)
+
+
+	async def initialize(self, app):
+		self._probe_handle = self.Loop.call_later(self.LagProbeInterval, self._on_probe, self.Loop.time() + self.LagProbeInterval)
+
+
+	async def finalize(self, app):
+		if self._probe_handle is not None:
+			self._probe_handle.cancel()
+			self._probe_handle = None
+
+
+	async def yield_slice(self):
+		"""
+		Yields to the event loop, so timers and other tasks can run.
+
+		"""
+		self._yields += 1
+		await asyncio.sleep(0)
+
+
+	def _on_probe(self, expected):
+		now = self.Loop.time()
+		self.Lag = max(now - expected, 0.0)
+		if self.Lag > self._lag_max:
+			self._lag_max = self.Lag
+
+		if self.Lag > self.MaxTimeBudget:
+			self.TimeBudget = max(self.TimeBudget / 2, self.MinTimeBudget)
+		elif self.TimeBudget < self.MaxTimeBudget:
+			self.TimeBudget = min(self.TimeBudget * 2, self.MaxTimeBudget)
+
+		self._probe_handle = self.Loop.call_later(self.LagProbeInterval, self._on_probe, now + self.LagProbeInterval)
+
+
+	def _on_metrics_flush(self, event_name):
+		self.Gauge.set("loop.lag", self.Lag)
+		self.Gauge.set("loop.lag.max", self._lag_max)
+		self.Gauge.set("time_budget", self.TimeBudget)
+		self.Gauge.set("yields", self._yields)
+
+		self._lag_max = 0.0
+		self._yields = 0
@@ -342,11 +342,35 @@ class BSPumpService(asab.Service):
 		if len(lookup_update_tasks) > 0:
 			done, pending = await asyncio.wait(lookup_update_tasks)
 
-		# Start all pipelines
+		# Start all pipelines that run in this process
 		for pipeline in self.Pipelines.values():
+			if not self._is_pipeline_local(app, pipeline):
+				continue
+			if getattr(app, "ShardId", None) is not None:
+				self._check_shard_split(pipeline)
 			pipeline.start()
 
 
+	def _is_pipeline_local(self, app, pipeline):
+		# Sharded pipelines run in shard workers, the others in the shard supervisor
+		if getattr(app, "ShardSupervisor", None) is not None:
+			return not pipeline.Sharded
+		if getattr(app, "ShardId", None) is not None:
+			return pipeline.Sharded
+		return True
+
+
+	def _check_shard_split(self, pipeline):
+		# A source that does not split its input delivers all events to every shard worker
+		for source in pipeline.Sources:
+			if not source.ShardSplit:
+				L.warning(
+					"Source '{}' does not split its input between shard workers, all of them ingest every event; "
+					"set 'shard=no' for the pipeline or split the input in the source".format(source.Id),
+					struct_data={'pipeline': pipeline.Id}
+				)
+
+
 	async def finalize(self, app):
 		"""
 		Stops all the pipelines
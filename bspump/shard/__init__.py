@@ -0,0 +1,7 @@
+from .supervisor import ShardSupervisor
+from .worker import ShardWorker
+
+__all__ = (
+	'ShardSupervisor',
+	'ShardWorker',
+)
@@ -0,0 +1,206 @@
+import asyncio
+import json
+import logging
+import os
+import sys
+
+import asab
+
+#
+
+L = logging.getLogger(__name__)
+
+#
+
+
+class ShardSupervisor(asab.Service):
+	"""
+	ShardSupervisor runs the application in `workers` shard worker processes.
+
+	Each worker is a new instance of the same program with environment variables
+	`BSPUMP_SHARD_ID` and `BSPUMP_SHARD_COUNT`, it runs pipelines that are sharded (see the `shard` option of the pipeline),
+	while the supervisor runs the remaining pipelines and the web API.
+	Workers that terminate unexpectedly are restarted.
+
+	The input of a sharded pipeline has to be split by its source, so every event is received by one worker only.
+	`KafkaSource` workers are members of the same consumer group, so Kafka assigns them distinct partitions.
+	`FileABCSource` locks a file before it is read, so every file is read by one worker.
+	Other sources deliver the same input to all workers, see `Source.ShardSplit`; such pipelines should have `shard=no`.
+
+	Events are not routed between workers by a key, so key affinity is not guaranteed.
+	Messages of the same Kafka key stay in one partition, but a rebalance of the consumer group
+	moves partitions, and thus keys, to other workers. Stateful analyzers, e.g. `TimeWindowAnalyzer` or `SessionAnalyzer`,
+	in a sharded pipeline keep only the state of events their worker received; keep them in pipelines with `shard=no`
+	when they need all events of a key.
+
+	Metrics counters reported by workers are added to the counters of the supervisor with the same name and tags,
+	so the metrics of sharded pipelines are available in the supervisor as if they were processed by a single process.
+
+	.. code:: ini
+
+		[bspump:sharding]
+		workers=4
+
+	"""
+
+	def __init__(self, app, workers, service_name="bspump.ShardSupervisor"):
+		super().__init__(app, service_name)
+
+		self.WorkerCount = workers
+		self.RestartDelay = float(asab.Config["bspump:sharding"]["restart_delay"])
+		self.MetricsService = app.get_service('asab.MetricsService')
+
+		self.Workers = {}  # shard id -> asyncio.subprocess.Process
+		self.WorkerTasks = []
+		self.Stopping = False
+
+		self._metrics_index = None
+
+
+	async def initialize(self, app):
+		for shard_id in range(self.WorkerCount):
+			self.WorkerTasks.append(
+				asyncio.ensure_future(self._supervise(shard_id))
+			)
+
+
+	async def finalize(self, app):
+		self.Stopping = True
+
+		for process in self.Workers.values():
+			if process.returncode is None:
+				process.terminate()
+
+		if len(self.WorkerTasks) > 0:
+			await asyncio.gather(*self.WorkerTasks, return_exceptions=True)
+
+
+	def _get_argv(self):
+		# `sys.orig_argv` preserves e.g. `python -m mymodule`
+		orig_argv = getattr(sys, "orig_argv", None)
+		if orig_argv is not None:
+			return [sys.executable] + orig_argv[1:]
+		return [sys.executable] + sys.argv
+
+
+	async def _supervise(self, shard_id):
+		while not self.Stopping:
+			read_fd, write_fd = os.pipe()
+
+			env = os.environ.copy()
+			env["BSPUMP_SHARD_ID"] = str(shard_id)
+			env["BSPUMP_SHARD_COUNT"] = str(self.WorkerCount)
+			env["BSPUMP_SHARD_METRICS_FD"] = str(write_fd)
+
+			try:
+				process = await asyncio.create_subprocess_exec(
+					*self._get_argv(),
+					env=env,
+					pass_fds=(write_fd,),
+				)
+			except Exception:
+				L.exception("Cannot start shard worker", struct_data={'shard': shard_id})
+				os.close(read_fd)
+				os.close(write_fd)
+				await asyncio.sleep(self.RestartDelay)
+				continue
+
+			os.close(write_fd)
+			self.Workers[shard_id] = process
+			L.log(asab.LOG_NOTICE, "Shard worker started", struct_data={'shard': shard_id, 'pid': process.pid})
+
+			reader = _MetricsReader(self, shard_id, read_fd)
+			self.App.Loop.add_reader(read_fd, reader.read)
+
+			try:
+				returncode = await process.wait()
+			finally:
+				self.App.Loop.remove_reader(read_fd)
+				reader.read_all()  # Read the final report of the worker
+				os.close(read_fd)
+
+			if self.Stopping:
+				break
+
+			L.error("Shard worker terminated, restarting", struct_data={'shard': shard_id, 'returncode': returncode})
+			await asyncio.sleep(self.RestartDelay)
+
+
+	def _locate_metric(self, name, tags):
+		if self._metrics_index is None or len(self._metrics_index) != len(self.MetricsService.MetricToNameAndTags):
+			self._metrics_index = {
+				(metric_name, frozenset(metric_tags.items())): metric
+				for metric, (metric_name, metric_tags) in self.MetricsService.MetricToNameAndTags.items()
+			}
+
+		return self._metrics_index.get((name, frozenset(tags.items())))
+
+
+	def apply_report(self, shard_id, report):
+		"""
+		Adds increments of counters reported by a shard worker to the counters of the supervisor.
+
+		"""
+		for item in report:
+			metric = self._locate_metric(item["name"], item["tags"])
+
+			if metric is None:
+				# The metric has been created dynamically in the worker, global tags are added by the MetricsService
+				tags = {key: value for key, value in item["tags"].items() if key not in self.MetricsService.Tags}
+				if item["type"] == "EPSCounter":
+					metric = self.MetricsService.create_eps_counter(item["name"], tags=tags, reset=item["reset"])
+				else:
+					metric = self.MetricsService.create_counter(item["name"], tags=tags, reset=item["reset"])
+
+			for key, value in item["values"].items():
+				metric.add(key, value)
+
+
+class _MetricsReader(object):
+
+	def __init__(self, supervisor, shard_id, fd):
+		self.Supervisor = supervisor
+		self.ShardId = shard_id
+		self.Fd = fd
+		self.Buffer = b''
+		os.set_blocking(fd, False)
+
+
+	def read(self):
+		"""
+		Reads available data from the pipe, returns False when the pipe is closed or empty.
+
+		"""
+		try:
+			data = os.read(self.Fd, 65536)
+		except BlockingIOError:
+			return False
+		except OSError as e:
+			L.warning("Cannot read metrics of the shard worker: {}".format(e), struct_data={'shard': self.ShardId})
+			return False
+
+		if len(data) == 0:
+			return False
+
+		self.Buffer += data
+
+		while True:
+			pos = self.Buffer.find(b'\n')
+			if pos < 0:
+				break
+
+			line = self.Buffer[:pos]
+			self.Buffer = self.Buffer[pos + 1:]
+
+			try:
+				report = json.loads(line)
+				self.Supervisor.apply_report(self.ShardId, report)
+			except Exception:
+				L.exception("Invalid metrics report of the shard worker", struct_data={'shard': self.ShardId})
+
+		return True
+
+
+	def read_all(self):
+		while self.read():
+			pass
@@ -0,0 +1,106 @@
+import json
+import logging
+import os
+
+import asab
+import asab.metrics.metrics
+
+#
+
+L = logging.getLogger(__name__)
+
+#
+
+
+class ShardWorker(asab.Service):
+	"""
+	ShardWorker runs in a shard worker process and reports its metrics counters to the supervisor.
+
+	The report contains increments of counters since the last report, so the supervisor
+	can simply add them to its own counters with the same name and tags.
+
+	"""
+
+	def __init__(self, app, metrics_fd, service_name="bspump.ShardWorker"):
+		super().__init__(app, service_name)
+
+		self.MetricsService = app.get_service('asab.MetricsService')
+		self.MetricsFd = metrics_fd
+		self.Reported = {}  # Last reported actual values of metrics
+
+		app.PubSub.subscribe("Application.tick/10!", self._on_tick)
+		# Published before the metrics are flushed, so the last increments of resetting counters are not lost
+		app.PubSub.subscribe("Metrics.flush!", self._on_metrics_flush)
+
+
+	async def finalize(self, app):
+		self.report(flush=True)
+		os.close(self.MetricsFd)
+
+
+	def _on_tick(self, event_name):
+		self.report(flush=False)
+
+
+	def _on_metrics_flush(self, event_name):
+		self.report(flush=True)
+
+
+	def collect(self, flush):
+		"""
+		Returns increments of counters since the last call.
+
+		"""
+		report = []
+
+		for metric in list(self.MetricsService.Metrics):
+			if not isinstance(metric, asab.metrics.metrics.Counter):
+				continue  # Only counters can be summed
+			if isinstance(metric, asab.metrics.metrics.AggregationCounter):
+				continue
+
+			name, tags = self.MetricsService.MetricToNameAndTags[metric]
+			reported = self.Reported.get(metric, {})
+
+			actuals = {}
+			for field in metric.Storage["fieldset"]:
+				actuals.update(field["actuals"])
+
+			increments = {}
+			for key, value in actuals.items():
+				increment = value - reported.get(key, 0)
+				if increment != 0:
+					increments[key] = increment
+
+			if flush and metric.Storage.get("reset"):
+				# Actual values of the metric are going to be reset
+				self.Reported[metric] = {}
+			else:
+				self.Reported[metric] = actuals
+
+			if len(increments) == 0:
+				continue
+
+			report.append({
+				"name": name,
+				"tags": tags,
+				"type": metric.__class__.__name__,
+				"reset": metric.Storage.get("reset"),
+				"values": increments,
+			})
+
+		return report
+
+
+	def report(self, flush):
+		report = self.collect(flush)
+		if len(report) == 0:
+			return
+
+		data = (json.dumps(report) + '\n').encode('utf-8')
+		try:
+			while len(data) > 0:
+				written = os.write(self.MetricsFd, data)
+				data = data[written:]
+		except OSError as e:
+			L.warning("Cannot report metrics to the shard supervisor: {}".format(e))
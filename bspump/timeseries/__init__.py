@@ -1,5 +1,9 @@
-from .analyzer import TimeSeriesPredictor   # noqa: F401
+from ..lazy import lazy_import
+
+__getattr__, __dir__ = lazy_import(__name__, {
+	"TimeSeriesPredictor": ".analyzer",
+})
 
 __all__ = (
-	"TimeSeriesPredictor"
+	"TimeSeriesPredictor",
 )
@@ -1,6 +1,7 @@
 from .pipeline import UnitTestPipeline
 from .sink import UnitTestSink
 from .source import UnitTestSource
+from .benchmark_case import ProcessorBenchmarkCase
 from .unit_test_case import ProcessorTestCase
 from .unit_test_case import TestCase
 
@@ -8,6 +9,7 @@ __all__ = (
 	'UnitTestPipeline',
 	'UnitTestSink',
 	'UnitTestSource',
+	'ProcessorBenchmarkCase',
 	'ProcessorTestCase',
 	'TestCase',
 )
@@ -0,0 +1,175 @@
+import copy
+import gc
+import json
+import math
+import os
+import statistics
+import sys
+import time
+
+from .unit_test_case import TestCase
+from ..abc.processor import Processor
+from ..pipeline import Pipeline
+
+
+class ProcessorBenchmarkCase(TestCase):
+	"""
+	A class whose instances are single processor benchmarks.
+
+	Unlike `ProcessorTestCase`, the benchmark does not run the application,
+	it calls `process()` of the processor directly in a tight loop over the given events.
+	Each benchmark runs several rounds, every round lasts at least `MinRoundTime` seconds,
+	and the time per event of the best round is reported.
+
+	Results can be tracked over time by environment variables:
+
+	* `BSPUMP_BENCHMARK_RESULTS` - path to a JSON file, which results are stored into
+	* `BSPUMP_BENCHMARK_BASELINE` - path to results of an earlier run, a benchmark fails when it is slower
+	* `BSPUMP_BENCHMARK_TOLERANCE` - relative slowdown against the baseline that is not a regression, 0.2 by default
+
+	Example of use:
+
+	.. code-block:: python
+
+		class MyProcessorBenchmark(ProcessorBenchmarkCase):
+
+			def test_my_processor(self):
+				self.set_up_processor(my_project.processors.MyProcessor)
+				self.benchmark([(None, {'foo': 'bar'})])  # Context, event
+
+	"""
+
+	Rounds = 5
+	MinRoundTime = 0.05  # Seconds
+
+	_Baseline = None  # Loaded once for all benchmarks
+
+
+	def set_up_processor(self, processor: type(Processor), *args, **kwargs) -> Processor:
+		"""
+		Constructs the processor in a pipeline that is never started.
+
+		:param processor: Processor you want to benchmark
+		:param args: Optional arguments for processor
+		:param kwargs: Optional key-word arguments for processor
+		:return: the processor, available also as `self.Processor`
+		"""
+		if getattr(self, 'Pipeline', None) is None:
+			self.Pipeline = Pipeline(self.App, "BenchmarkPipeline")
+
+		self.Processor = processor(self.App, self.Pipeline, *args, **kwargs)
+		return self.Processor
+
+
+	def benchmark(self, events: list, name: str = None, fresh: bool = False) -> dict:
+		"""
+		Benchmarks `process()` of the processor created by `set_up_processor`.
+
+		:param events: list of (context, event) tuples, they are processed repeatedly
+		:param name: suffix of the benchmark name, which is the ID of the test by default
+		:param fresh: if True, every processed event is a deep copy of the given one, for processors that modify events,
+			the copies are made before the timed loop
+		:return: dictionary with the `best` and `median` time per event in seconds, `eps` of the best round and `runs`
+		"""
+		return self.benchmark_callable(self.Processor.process, events, name=name, fresh=fresh)
+
+
+	def benchmark_batch(self, events: list, batch_size: int = 1000, name: str = None, fresh: bool = False) -> dict:
+		"""
+		Benchmarks `process_batch()` of the processor created by `set_up_processor`.
+
+		Events are repeated to fill a batch of `batch_size` events, all events of the batch share the context of the first one.
+		The reported time is per event, so it can be compared with the result of `benchmark`.
+
+		See `benchmark` for the description of other parameters.
+		"""
+		assert len(events) > 0
+		context = events[0][0]
+		batch = [events[i % len(events)][1] for i in range(batch_size)]
+		return self.benchmark_callable(self.Processor.process_batch, [(context, batch)], name=name, fresh=fresh, weight=batch_size)
+
+
+	def benchmark_callable(self, function, events: list, name: str = None, fresh: bool = False, weight: int = 1) -> dict:
+		"""
+		Benchmarks a `function(context, event)`, e.g. a declarative expression.
+
+		`weight` is the number of events processed by one call of the function, e.g. the size of a batch.
+		See `benchmark` for the description of other parameters.
+		"""
+		assert len(events) > 0
+
+		# Calibration, the number of loops over events to fill a round
+		loops = 1
+		while True:
+			duration = self._round(function, events, loops, fresh)
+			if duration >= self.MinRoundTime:
+				break
+			loops = max(loops * 2, math.ceil(loops * 1.2 * self.MinRoundTime / max(duration, 1e-6)))
+
+		durations = [duration]
+		for _ in range(self.Rounds - 1):
+			durations.append(self._round(function, events, loops, fresh))
+
+		runs = loops * len(events) * weight
+		best = min(durations) / runs
+		result = {
+			'best': best,
+			'median': statistics.median(durations) / runs,
+			'eps': 1.0 / best if best > 0 else 0.0,
+			'runs': runs,
+		}
+
+		name = self.id() if name is None else "{}.{}".format(self.id(), name)
+		print("{:<80} {:>10.3f} us {:>12.0f} EPS".format(name, best * 1e6, result['eps']), file=sys.stderr)
+
+		self._track(name, result)
+		return result
+
+
+	def _round(self, function, events, loops, fresh):
+		if fresh:
+			batch = [(context, copy.deepcopy(event)) for _ in range(loops) for context, event in events]
+			loops = 1
+		else:
+			batch = events
+
+		gc_enabled = gc.isenabled()
+		gc.disable()
+		try:
+			start = time.perf_counter()
+			for _ in range(loops):
+				for context, event in batch:
+					function(context, event)
+			return time.perf_counter() - start
+		finally:
+			if gc_enabled:
+				gc.enable()
+
+
+	def _track(self, name, result):
+		results_path = os.environ.get('BSPUMP_BENCHMARK_RESULTS')
+		if results_path:
+			try:
+				with open(results_path) as f:
+					results = json.load(f)
+			except FileNotFoundError:
+				results = {}
+			results[name] = result
+			with open(results_path, 'w') as f:
+				json.dump(results, f, indent=2, sort_keys=True)
+
+		baseline_path = os.environ.get('BSPUMP_BENCHMARK_BASELINE')
+		if baseline_path:
+			if ProcessorBenchmarkCase._Baseline is None:
+				with open(baseline_path) as f:
+					ProcessorBenchmarkCase._Baseline = json.load(f)
+
+			baseline = ProcessorBenchmarkCase._Baseline.get(name)
+			if baseline is not None:
+				tolerance = float(os.environ.get('BSPUMP_BENCHMARK_TOLERANCE', 0.2))
+				self.assertLessEqual(
+					result['best'], baseline['best'] * (1 + tolerance),
+					"Benchmark '{}' regressed: {:.3f} us per event, the baseline is {:.3f} us".format(
+						name, result['best'] * 1e6, baseline['best'] * 1e6
+					)
+				)
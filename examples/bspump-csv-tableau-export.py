@@ -25,6 +25,7 @@ class MyApplication(BSPumpApplication):
 		svc.add_pipeline(SecondaryPipelineTableauSession(self))
 		# svc.add_pipeline(SecondaryPipelineCSVTimeWindow(self))
 		# svc.add_pipeline(SecondaryPipelineTableauTimeWindow(self))
+		# svc.add_pipeline(SecondaryPipelineNDJSONSession(self))
 		
 		
 
@@ -92,6 +93,19 @@ class SecondaryPipelineCSVSession(Pipeline):
 			bspump.file.FileCSVSink(app, self, config={'path':'sess.csv'})
 		)
 
+class SecondaryPipelineNDJSONSession(Pipeline):
+	def __init__(self, app, pipeline_id=None):
+		super().__init__(app, pipeline_id)
+		self.build(
+			bspump.matrix.MatrixSource(app,
+				self,
+				"MySessionAnalyzerMatrix").on(bspump.trigger.PubSubTrigger(app, "Export!")
+			),
+			# Chunks of the exported file are appended to the file
+			bspump.matrix.MatrixExportGenerator(app, self, config={'format': 'ndjson'}),
+			bspump.file.FileBlockSink(app, self, config={'path': 'sess.ndjson', 'mode': 'ab'})
+		)
+
 class SecondaryPipelineTableauSession(Pipeline):
 	def __init__(self, app, pipeline_id=None):
 		super().__init__(app, pipeline_id)
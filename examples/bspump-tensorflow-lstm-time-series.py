@@ -64,10 +64,12 @@ class MyTimeSeriesPredictor(bspump.timeseries.TimeSeriesPredictor):
 		self.TimeWindow.add_row('One and only row')
 
 	def get_sample(self, column):
-		if (column - self.Model.WindowSize) < 0:
+		columns = self.TimeWindow.get_ordered_columns()
+		position = int(np.where(columns == column)[0][0])
+		if (position - self.Model.WindowSize) < 0:
 			return None
 		
-		sample = self.TimeWindow.Array[0, (column - self.Model.WindowSize):column]
+		sample = self.TimeWindow.Array[0, columns[(position - self.Model.WindowSize):position]]
 		# if np.any(sample['count'] == 0): # not ready
 		# 	return None
 
@@ -100,7 +102,7 @@ class MyTimeSeriesPredictor(bspump.timeseries.TimeSeriesPredictor):
 	async def analyze(self, message_type):
 		print("Analyzing...")
 		self.alarm()
-		predicted = self.TimeWindow.Array[0, :]['predicted'].tolist()
+		predicted = self.TimeWindow.Array[0, self.TimeWindow.get_ordered_columns()]['predicted'].tolist()
 		with open("examples/timeseries/exported.json", "w") as f:
 			json.dump({'predicted': predicted}, f)
 		
@@ -131,8 +131,8 @@ class MyTimeWindowAnalyzer(bspump.analyzer.TimeWindowAnalyzer):
 		if self.TimeWindow.Array.shape[0] == 0:
 			return
 
-		# selecting part of matrix specified in configuration
-		x = self.TimeWindow.Array[:, :]
+		# selecting part of matrix specified in configuration, columns from the oldest to the newest time slot
+		x = self.TimeWindow.Array[:, self.TimeWindow.get_ordered_columns()]
 
 		# if any of time slots is 0
 		if np.any(x == 0):
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import subprocess
+import sys
+
+###
+
+# Modules that must not be loaded by importing a package, they are loaded when a component that needs them is used
+HEAVY_MODULES = (
+	"numpy",
+	"pandas",
+	"pyarrow",
+	"confluent_kafka",
+	"fastavro",
+	"cysimdjson",
+	"aiohttp",
+	"yaml",
+	"motor",
+	"mongoquery",
+	"cryptography",
+)
+
+PACKAGES = (
+	"bspump",
+	"bspump.common",
+	"bspump.analyzer",
+	"bspump.aggregation",
+	"bspump.matrix",
+	"bspump.lookup",
+	"bspump.timeseries",
+	"bspump.kafka",
+	"bspump.avro",
+	"bspump.parquet",
+	"bspump.crypto",
+	"bspump.filter",
+	"bspump.mongodb",
+	"bspump.elasticsearch",
+	"bspump.declarative",
+)
+
+# Runs in a fresh interpreter, so modules imported by an earlier measurement do not hide the cost of the next one
+PROBE = """
+import sys, time, json
+baseline = set(sys.modules)
+start = time.perf_counter()
+import {package}
+duration = time.perf_counter() - start
+print(json.dumps({{"time": duration, "modules": sorted(set(sys.modules) - baseline)}}))
+"""
+
+###
+
+
+def measure(package, repeat):
+	best = None
+	for _ in range(repeat):
+		output = subprocess.check_output([sys.executable, "-c", PROBE.format(package=package)])
+		result = json.loads(output)
+		if best is None or result["time"] < best["time"]:
+			best = result
+
+	heavy = sorted(set(
+		module.partition('.')[0] for module in best["modules"] if module.partition('.')[0] in HEAVY_MODULES
+	))
+	return {
+		"time": best["time"],
+		"modules": len(best["modules"]),
+		"heavy": heavy,
+	}
+
+
+def main():
+	parser = argparse.ArgumentParser(description="Measures the import time of BSPump packages.")
+	parser.add_argument("packages", nargs="*", default=PACKAGES, help="packages to import, all lazy packages by default")
+	parser.add_argument("-r", "--repeat", type=int, default=5, help="number of imports of each package, the best one is reported")
+	parser.add_argument("-m", "--max-time", type=float, help="import time limit of each package in milliseconds")
+	args = parser.parse_args()
+
+	failures = []
+	print("{:<28} {:>10} {:>8}  {}".format("package", "time", "modules", "heavy dependencies"))
+	for package in args.packages:
+		result = measure(package, args.repeat)
+		print("{:<28} {:>7.1f} ms {:>8}  {}".format(
+			package, result["time"] * 1000, result["modules"], ", ".join(result["heavy"]) or "-"
+		))
+
+		if len(result["heavy"]) > 0:
+			failures.append("'{}' imports {}".format(package, ", ".join(result["heavy"])))
+		if args.max_time is not None and result["time"] * 1000 > args.max_time:
+			failures.append("'{}' takes {:.1f} ms to import, the limit is {:.1f} ms".format(
+				package, result["time"] * 1000, args.max_time
+			))
+
+	for failure in failures:
+		print("FAILED: {}".format(failure), file=sys.stderr)
+
+	return 1 if len(failures) > 0 else 0
+
+
+if __name__ == '__main__':
+	sys.exit(main())
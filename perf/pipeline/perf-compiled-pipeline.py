@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+import time
+
+import bspump
+import bspump.common
+from bspump.abc.sink import Sink
+
+###
+
+EVENTS = 200000
+PROCESSORS = 5
+ROUNDS = 10
+
+###
+
+
+class PassProcessor(bspump.Processor):
+
+	def process(self, context, event):
+		return event
+
+
+class CompiledPipeline(bspump.Pipeline):
+
+	def __init__(self, app, pipeline_id, config=None):
+		super().__init__(app, pipeline_id, config=config)
+		self.build(
+			bspump.common.IteratorSource(app, self, iterator=iter(())),
+			*[PassProcessor(app, self, id="PassProcessor{}".format(i)) for i in range(PROCESSORS)],
+			bspump.common.NullSink(app, self)
+		)
+
+
+class LegacyPipeline(CompiledPipeline):
+	"""
+	The processing loop of the pipeline before the execution plan was introduced.
+	"""
+
+	def _do_process(self, event, depth, context):
+		for processor in self.Processors[depth]:
+
+			t0 = time.perf_counter()
+			try:
+				event = processor.process(context, event)
+
+			except BaseException as e:
+				if depth > 0:
+					raise
+				self.set_error(context, event, e)
+				event = None
+
+			finally:
+				self.ProfilerCounter[processor.Id].add('duration', time.perf_counter() - t0)
+				self.ProfilerCounter[processor.Id].add('run', 1)
+
+			if event is None:
+				if len(self.Processors) == (depth + 1):
+					if isinstance(processor, Sink):
+						self.MetricsEPSCounter.add('eps.out', 1)
+						self.MetricsCounter.add('event.out', 1)
+					else:
+						self.MetricsEPSCounter.add('eps.drop', 1)
+						self.MetricsCounter.add('event.drop', 1)
+				return
+
+
+def measure(pipeline):
+	event = {"name": "Chuck Norris"}
+	stime = time.perf_counter()
+	for _ in range(EVENTS):
+		pipeline.inject(None, event, 0)
+	etime = time.perf_counter()
+	return EVENTS / (etime - stime)
+
+
+if __name__ == '__main__':
+	app = bspump.BSPumpApplication(args=[])
+
+	legacy = LegacyPipeline(app, 'LegacyPipeline')
+	compiled = CompiledPipeline(app, 'CompiledPipeline')
+	sampled = CompiledPipeline(app, 'SampledPipeline', config={'profiler': 'sampled:100'})
+
+	# The best of several alternating rounds reduces the noise of the measurement
+	legacy_eps = 0
+	compiled_eps = 0
+	sampled_eps = 0
+	for _ in range(ROUNDS):
+		legacy_eps = max(legacy_eps, measure(legacy))
+		compiled_eps = max(compiled_eps, measure(compiled))
+		sampled_eps = max(sampled_eps, measure(sampled))
+
+	print("Legacy loop:                         {:.0f} EPS".format(legacy_eps))
+	print("Compiled plan:                       {:.0f} EPS ({:+.1f} %)".format(compiled_eps, (compiled_eps / legacy_eps - 1) * 100))
+	print("Compiled plan, sampled:100 profiler: {:.0f} EPS ({:+.1f} %)".format(sampled_eps, (sampled_eps / legacy_eps - 1) * 100))
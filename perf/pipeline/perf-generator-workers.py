@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+import asyncio
+import time
+
+import bspump
+import bspump.common
+
+###
+
+EVENTS = 100000
+ROUNDS = 5
+
+###
+
+
+class PassGenerator(bspump.Generator):
+
+	async def generate(self, context, event, depth):
+		self.Pipeline.inject(context, event, depth)
+
+
+class GeneratorPipeline(bspump.Pipeline):
+
+	def __init__(self, app, pipeline_id, generator_config=None):
+		super().__init__(app, pipeline_id, config={'async_concurency_limit': EVENTS * 2})
+		self.build(
+			bspump.common.IteratorSource(app, self, iterator=iter(())),
+			PassGenerator(app, self, config=generator_config),
+			bspump.common.NullSink(app, self)
+		)
+
+
+async def measure(pipeline):
+	event = {"name": "Chuck Norris"}
+	stime = time.perf_counter()
+	for _ in range(EVENTS):
+		pipeline.inject(None, event, 0)
+
+	# Wait until all events are generated
+	generator = pipeline.Processors[0][0]
+	while generator.InFlight > 0:
+		await asyncio.sleep(0)
+
+	etime = time.perf_counter()
+	return EVENTS / (etime - stime)
+
+
+async def main(app):
+	tasks = GeneratorPipeline(app, 'TaskPipeline')
+	workers = GeneratorPipeline(app, 'WorkerPipeline', generator_config={'workers': 8})
+
+	# The best of several alternating rounds reduces the noise of the measurement
+	tasks_eps = 0
+	workers_eps = 0
+	for _ in range(ROUNDS):
+		tasks_eps = max(tasks_eps, await measure(tasks))
+		workers_eps = max(workers_eps, await measure(workers))
+
+	# Let the worker tasks finish
+	await tasks.stop()
+	await workers.stop()
+
+	print("Task per event:    {:.0f} EPS".format(tasks_eps))
+	print("8 worker tasks:    {:.0f} EPS ({:+.1f} %)".format(workers_eps, (workers_eps / tasks_eps - 1) * 100))
+
+
+if __name__ == '__main__':
+	app = bspump.BSPumpApplication(args=[])
+	app.Loop.run_until_complete(main(app))
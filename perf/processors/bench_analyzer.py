@@ -0,0 +1,29 @@
+import time
+
+import bspump.analyzer
+import bspump.unittest
+
+
+def events(count=1000, servers=100):
+	now = time.time()
+	return [
+		(None, {"server": "server{}".format(i % servers), "load": float(i), "@timestamp": now - (i % 600)})
+		for i in range(count)
+	]
+
+
+class BenchThresholdAnalyzer(bspump.unittest.ProcessorBenchmarkCase):
+
+	def set_up_analyzer(self):
+		self.set_up_processor(bspump.analyzer.ThresholdAnalyzer, config={
+			'event_attribute': 'server',
+			'event_value': 'load',
+		})
+
+	def test_threshold_analyzer(self):
+		self.set_up_analyzer()
+		self.benchmark(events())
+
+	def test_threshold_analyzer_batch(self):
+		self.set_up_analyzer()
+		self.benchmark_batch(events(), batch_size=1000)
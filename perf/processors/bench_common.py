@@ -0,0 +1,103 @@
+import datetime
+import json
+import os
+
+import bspump.common
+import bspump.unittest
+
+
+EVENT = {
+	"@timestamp": 1600000000.0,
+	"user": {"name": "alice", "id": 1234, "roles": ["admin", "dev"]},
+	"source": {"ip": "10.0.0.1", "port": 51234, "geo": {"country": "CZ", "city": "Prague"}},
+	"http": {"method": "GET", "status": 200, "url": "/index.html", "bytes": 5120},
+	"message": "GET /index.html HTTP/1.1",
+}
+
+EVENT_JSON = json.dumps(EVENT)
+EVENT_BYTES = EVENT_JSON.encode('utf-8')
+
+
+class UTCNormalizer(bspump.common.TimeZoneNormalizer):
+
+	def process(self, context, event):
+		event["@timestamp"] = self.normalize(event["@timestamp"])
+		return event
+
+
+class UpperTransformator(bspump.common.MappingTransformator):
+
+	def build(self, app):
+		return {
+			"message": lambda key, value: (key, value.upper()),
+		}
+
+
+class BenchCommon(bspump.unittest.ProcessorBenchmarkCase):
+
+	def test_bytes_to_string(self):
+		self.set_up_processor(bspump.common.BytesToStringParser)
+		self.benchmark([(None, EVENT_BYTES)])
+
+	def test_string_to_bytes(self):
+		self.set_up_processor(bspump.common.StringToBytesParser)
+		self.benchmark([(None, EVENT_JSON)])
+
+	def test_flatten_dict(self):
+		self.set_up_processor(bspump.common.FlattenDictProcessor)
+		self.benchmark([(None, EVENT)])
+
+	def test_hexlify(self):
+		self.set_up_processor(bspump.common.HexlifyProcessor)
+		self.benchmark([(None, EVENT_BYTES)])
+
+	def test_cysimdjson_parser(self):
+		self.set_up_processor(bspump.common.CySimdJsonParser)
+		self.benchmark([(None, EVENT_BYTES)])
+
+	def test_std_json_to_dict(self):
+		self.set_up_processor(bspump.common.StdJsonToDictParser)
+		self.benchmark([(None, EVENT_JSON)])
+
+	def test_std_dict_to_json(self):
+		self.set_up_processor(bspump.common.StdDictToJsonParser)
+		self.benchmark([(None, EVENT)])
+
+	def test_dict_to_json_bytes(self):
+		self.set_up_processor(bspump.common.DictToJsonBytesParser)
+		self.benchmark([(None, EVENT)])
+
+	def test_mapping_keys(self):
+		self.set_up_processor(bspump.common.MappingKeysProcessor)
+		self.benchmark([(None, EVENT)])
+
+	def test_mapping_values(self):
+		self.set_up_processor(bspump.common.MappingValuesProcessor)
+		self.benchmark([(None, EVENT)])
+
+	def test_mapping_items(self):
+		self.set_up_processor(bspump.common.MappingItemsProcessor)
+		self.benchmark([(None, EVENT)])
+
+	def test_null_sink(self):
+		self.set_up_processor(bspump.common.NullSink)
+		self.benchmark([(None, EVENT)])
+
+	def test_print(self):
+		# Printing is measured without the terminal
+		with open(os.devnull, 'w') as stream:
+			for processor in (
+				bspump.common.PrintSink, bspump.common.PPrintSink,
+				bspump.common.PrintProcessor, bspump.common.PPrintProcessor,
+				bspump.common.PrintContextProcessor, bspump.common.PPrintContextProcessor,
+			):
+				self.set_up_processor(processor, stream=stream)
+				self.benchmark([({"source": "bench"}, EVENT)], name=processor.__name__)
+
+	def test_time_zone_normalizer(self):
+		self.set_up_processor(UTCNormalizer, config={"timezone": "Europe/Prague"})
+		self.benchmark([(None, {"@timestamp": datetime.datetime(2020, 3, 31, 4, 29, 44)})], fresh=True)
+
+	def test_mapping_transformator(self):
+		self.set_up_processor(UpperTransformator)
+		self.benchmark([(None, EVENT)])
@@ -0,0 +1,35 @@
+import os
+
+import bspump.crypto
+import bspump.unittest
+
+
+KEY = "000102030405060708090a0b0c0d0e0f"
+
+SMALL = os.urandom(100)
+LARGE = os.urandom(10000)
+
+
+class BenchCrypto(bspump.unittest.ProcessorBenchmarkCase):
+
+	def test_encrypt_aes(self):
+		self.set_up_processor(bspump.crypto.EncryptAESProcessor, config={"key": KEY})
+		self.benchmark([(None, SMALL)], name="100B")
+		self.benchmark([(None, LARGE)], name="10kB")
+
+	def test_decrypt_aes(self):
+		encryptor = self.set_up_processor(bspump.crypto.EncryptAESProcessor, config={"key": KEY})
+		small, large = encryptor.process(None, SMALL), encryptor.process(None, LARGE)
+
+		self.set_up_processor(bspump.crypto.DecryptAESProcessor, config={"key": KEY})
+		self.benchmark([(None, small)], name="100B")
+		self.benchmark([(None, large)], name="10kB")
+
+	def test_hashing(self):
+		for algorithm in ("sha256", "sha1", "md5", "blake2b"):
+			self.set_up_processor(bspump.crypto.HashingProcessor, config={"algorithm": algorithm})
+			self.benchmark([(None, SMALL)], name=algorithm)
+
+	def test_cohashing(self):
+		self.set_up_processor(bspump.crypto.CoHashingProcessor)
+		self.benchmark([({}, SMALL)])
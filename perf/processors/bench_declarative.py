@@ -0,0 +1,156 @@
+import datetime
+
+import bspump
+import bspump.declarative
+import bspump.unittest
+
+
+EVENT = {
+	"user": "Alice",
+	"action": "login",
+	"status": 200,
+	"bytes": 5120,
+	"duration": 1.5,
+	"ip": "10.0.0.1",
+	"ip_int": 167772161,
+	"url": "/shop/index.html?item=1&color=red",
+	"message": "user=alice action=login status=200",
+	"kvdqs": 'user="alice" action="login" status="200"',
+	"timestamp": "2020-03-31 04:29:44",
+	"datetime": datetime.datetime(2020, 3, 31, 4, 29, 44, tzinfo=datetime.timezone.utc),
+	"roles": ["admin", "dev", "ops"],
+}
+
+CONTEXT = {
+	"tenant": "default",
+	"brain": {"idea": "benchmark"},
+}
+
+
+# Every expression class of `bspump.declarative.expression` with a typical declaration
+DECLARATIONS = {
+	# Arithmetic
+	"ADD": "!ADD [!ITEM EVENT bytes, 1024, 1]",
+	"SUB": "!SUB [!ITEM EVENT bytes, 1024]",
+	"MUL": "!MUL [!ITEM EVENT bytes, 8]",
+	"DIV": "!DIV [!ITEM EVENT bytes, 1024]",
+	"MOD": "!MOD [!ITEM EVENT bytes, 1000]",
+	"POW": "!POW [!ITEM EVENT status, 2]",
+
+	# Logical
+	"AND": "!AND [!EQ [!ITEM EVENT status, 200], !EQ [!ITEM EVENT action, login]]",
+	"OR": "!OR [!EQ [!ITEM EVENT status, 500], !EQ [!ITEM EVENT action, login]]",
+	"NOT": "!NOT {what: !EQ [!ITEM EVENT status, 500]}",
+
+	# Comparison
+	"LT": "!LT [!ITEM EVENT status, 300]",
+	"LE": "!LE [200, !ITEM EVENT status, 300]",
+	"EQ": "!EQ [!ITEM EVENT action, login]",
+	"NE": "!NE [!ITEM EVENT action, logout]",
+	"GE": "!GE [!ITEM EVENT status, 200]",
+	"GT": "!GT [!ITEM EVENT bytes, 1024]",
+	"IS": "!IS [!ITEM EVENT action, login]",
+	"ISNOT": "!ISNOT [!ITEM EVENT action, logout]",
+
+	# Statements
+	"IF": "!IF {test: !EQ [!ITEM EVENT status, 200], then: ok, else: failed}",
+	"WHEN": """!WHEN
+- test: !EQ [!ITEM EVENT status, 500]
+  then: error
+- test: !EQ [!ITEM EVENT status, 200]
+  then: ok
+- else: unknown""",
+	"FOR": "!FOR {each: !ITEM EVENT roles, do: !UPPER {what: !ARG }}",
+	"FIRST": "!FIRST [!ITEM EVENT nonexistent, !ITEM EVENT user]",
+	"FUNCTION": "!FUNCTION {apply: !UPPER {what: !ITEM EVENT user}}",
+
+	# String
+	"STARTSWITH": "!STARTSWITH {what: !ITEM EVENT url, prefix: /shop}",
+	"ENDSWITH": "!ENDSWITH {what: !ITEM EVENT url, postfix: red}",
+	"SUBSTRING": "!SUBSTRING {what: !ITEM EVENT url, from: 1, to: 5}",
+	"UPPER": "!UPPER {what: !ITEM EVENT user}",
+	"LOWER": "!LOWER {what: !ITEM EVENT user}",
+	"JOIN": "!JOIN {items: [!ITEM EVENT user, !ITEM EVENT action, !ITEM EVENT status], delimiter: ':'}",
+	"CUT": "!CUT {what: !ITEM EVENT message, delimiter: ' ', field: 1}",
+	"CONTAINS": "!CONTAINS {what: !ITEM EVENT message, substring: login}",
+	"SPLIT": "!SPLIT {value: !ITEM EVENT message, separator: ' '}",
+	"REGEX": "!REGEX {what: !ITEM EVENT url, regex: '^/shop/'}",
+	"REGEX.PARSE": "!REGEX.PARSE {what: !ITEM EVENT message, regex: '^user=(\\\\w+) action=(\\\\w+)', items: [user, action]}",
+	"REGEX.REPLACE": "!REGEX.REPLACE {what: !ITEM EVENT url, regex: '\\\\d+', replace: N}",
+	"REGEX.SPLIT": "!REGEX.SPLIT {what: !ITEM EVENT message, regex: '[ =]'}",
+	"REGEX.FINDALL": "!REGEX.FINDALL {what: !ITEM EVENT message, regex: '\\\\w+='}",
+
+	# Data structures
+	"DICT": "!DICT {set: {user: !ITEM EVENT user, status: !ITEM EVENT status, tenant: !ITEM CONTEXT tenant}}",
+	"DICT.PARSE.kvs": "!DICT.PARSE {what: !ITEM EVENT message, type: kvs}",
+	"DICT.PARSE.kvdqs": "!DICT.PARSE {what: !ITEM EVENT kvdqs, type: kvdqs}",
+	"DICT.PARSE.qs": "!DICT.PARSE {what: !ITEM EVENT url, type: qs}",
+	"TUPLE": "!TUPLE [!ITEM EVENT user, !ITEM EVENT status]",
+	"LIST": "!LIST {append: [!ITEM EVENT user, !ITEM EVENT status]}",
+	"ITEM.EVENT": "!ITEM EVENT user",
+	"ITEM.CONTEXT": "!ITEM CONTEXT brain.idea",
+
+	# Values
+	"VALUE": "!VALUE 'constant'",
+	"EVENT": "!EVENT",
+	"CONTEXT": "!CONTEXT",
+	"CONTEXT.SET": "!CONTEXT.SET {set: {user: !ITEM EVENT user}}",
+	"HASH": "!HASH {what: !CAST {what: !ITEM EVENT status, type: int}}",
+
+	# Lookup
+	"LOOKUP.GET": "!LOOKUP.GET {in: BenchmarkLookup, what: !ITEM EVENT user}",
+	"LOOKUP.CONTAINS": "!LOOKUP.CONTAINS {in: BenchmarkLookup, what: !ITEM EVENT user}",
+
+	# Test
+	"IN": "!IN {what: !ITEM EVENT action, where: [login, logout, register]}",
+
+	# IP
+	"IP.PARSE": "!IP.PARSE {value: !ITEM EVENT ip}",
+	"IP.FORMAT": "!IP.FORMAT {what: !ITEM EVENT ip_int}",
+	"IP.INSUBNET": "!IP.INSUBNET {what: !ITEM EVENT ip, subnet: 10.0.0.0/8}",
+
+	# Utility
+	"CAST": "!CAST {what: !ITEM EVENT status, type: str}",
+	"MAP": "!MAP {what: !ITEM EVENT status, in: {200: ok, 404: missing}, else: unknown}",
+
+	# Date/time
+	"NOW": "!NOW",
+	"DATETIME.FORMAT": "!DATETIME.FORMAT {with: !ITEM EVENT datetime, format: '%Y-%m-%d %H:%M:%S'}",
+	"DATETIME.PARSE": "!DATETIME.PARSE {what: !ITEM EVENT timestamp, format: '%Y-%m-%d %H:%M:%S'}",
+	"DATETIME.GET": "!DATETIME.GET {with: !ITEM EVENT datetime, what: hour}",
+}
+
+
+class BenchDeclarative(bspump.unittest.ProcessorBenchmarkCase):
+
+	def setUp(self):
+		super().setUp()
+		self.Builder = bspump.declarative.ExpressionBuilder(self.App)
+
+		lookup = bspump.DictionaryLookup(self.App, "BenchmarkLookup")
+		lookup.set({"Alice": "Administrator", "Bob": "Developer"})
+		self.App.get_service("bspump.PumpService").add_lookup(lookup)
+
+
+	def parse(self, declaration):
+		return self.App.Loop.run_until_complete(self.Builder.parse("---\n" + declaration))[0]
+
+
+	def test_expressions(self):
+		for name, declaration in DECLARATIONS.items():
+			with self.subTest(expression=name):
+				expression = self.parse(declaration)
+				self.benchmark_callable(expression, [(CONTEXT, EVENT)], name=name, fresh=name == "CONTEXT.SET")
+
+
+	def test_nested_declaration(self):
+		# A typical parsing declaration combines many expressions
+		expression = self.parse("""!DICT
+set:
+  user: !LOWER {what: !ITEM EVENT user}
+  outcome: !IF {test: !LT [!ITEM EVENT status, 400], then: success, else: failure}
+  kbytes: !DIV [!ITEM EVENT bytes, 1024]
+  private: !IP.INSUBNET {what: !ITEM EVENT ip, subnet: 10.0.0.0/8}
+  admin: !IN {what: admin, where: !ITEM EVENT roles}
+""")
+		self.benchmark_callable(expression, [(CONTEXT, EVENT)])
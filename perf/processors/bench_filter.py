@@ -0,0 +1,50 @@
+import time
+
+import bspump.filter
+import bspump.unittest
+
+
+EVENT = {
+	"user": "alice",
+	"action": "login",
+	"status": 200,
+	"source.ip": "10.0.0.1",
+	"source.port": 51234,
+	"message": "User alice logged in",
+}
+
+
+class PrivateAttributeFilter(bspump.filter.AttributeFilter):
+
+	def get_fields(self, event):
+		return {"source.ip", "source.port"}
+
+
+class BenchFilter(bspump.unittest.ProcessorBenchmarkCase):
+
+	def test_attribute_filter(self):
+		self.set_up_processor(PrivateAttributeFilter)
+		self.benchmark([(None, EVENT)], fresh=True)
+
+	def test_attribute_filter_inclusive(self):
+		self.set_up_processor(PrivateAttributeFilter, inclusive=True)
+		self.benchmark([(None, EVENT)], fresh=True)
+
+	def test_content_filter(self):
+		self.set_up_processor(bspump.filter.ContentFilter, query={
+			"action": {"$in": ["login", "logout"]},
+			"status": {"$gte": 200, "$lt": 300},
+		})
+		self.benchmark([
+			(None, EVENT),
+			(None, dict(EVENT, status=500)),
+		])
+
+	def test_time_drift_filter(self):
+		self.set_up_processor(bspump.filter.TimeDriftFilter)
+		now = time.time()
+		self.benchmark([
+			(None, {"@timestamp": now}),
+			(None, {"@timestamp": now - 3600}),
+			(None, {}),
+		])
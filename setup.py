@@ -66,6 +66,8 @@ setup(
 		'Programming Language :: Python :: 3.11',
 	],
 	packages=find_packages(),
+	# Lazy imports of packages (bspump.lazy) need module `__getattr__` (PEP 562)
+	python_requires='>=3.7',
 	package_data={
 		'bspump.web': [
 			'static/*.html',
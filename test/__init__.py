@@ -5,7 +5,20 @@ from .file import *
 from .filter import *
 from .kafka import *
 from .matrix import *
+from .shard import *
 from .declarative import *
 from .integrity import *
+from .test_bench import *
+from .test_benchmark_case import *
 from .test_config_defaults import *
+from .test_context import *
+from .test_frozen import *
+from .test_histogram import *
+from .test_hyperloglog import *
+from .test_lazy import *
 from .test_metrics_service import *
+from .test_pipeline_batch import *
+from .test_pipeline_compile import *
+from .test_pipeline_generator import *
+from .test_pipeline_profiler import *
+from .test_scheduler import *
@@ -1,6 +1,7 @@
 from .test_analyzer import *
 from .test_geoanalyzer import *
 from .test_latch import *
+from .test_thresholdanalyzer import *
 from .test_timedriftanalyzer import *
 from .test_timewindowanalyzer import *
 from .test_sessionanalyzer import *
@@ -20,3 +20,24 @@ class TestSessionAnalyzer(bspump.unittest.ProcessorTestCase):
 		)
 
 		# TODO test self.Pipeline.Processor.Matrix
+
+
+	def test_process_batch(self):
+		class BatchSessionAnalyzer(bspump.analyzer.SessionAnalyzer):
+			def evaluate_batch(self, context, events):
+				rows = self.Sessions.resolve_rows([event['id'] for event in events])
+				self.Sessions.store_events(rows, events, keys=['a', 'b'])
+
+		self.set_up_processor(BatchSessionAnalyzer, dtype=[('a', 'i8'), ('b', 'f8')])
+		analyzer = self.Pipeline.Processor
+
+		events = [{"id": str(i % 10), "a": i, "b": i / 2} for i in range(100)]
+		output = analyzer.process_batch(None, events)
+		self.assertEqual(output, events)
+
+		matrix = analyzer.Sessions
+		self.assertEqual(len(matrix.Index), 10)
+		columns = matrix.decode_rows(matrix.resolve_rows([str(i) for i in range(10)]))
+		self.assertEqual(columns['id'], [str(i) for i in range(10)])
+		self.assertEqual(columns['a'].tolist(), list(range(90, 100)))  # The last event of a session is stored
+		self.assertEqual(columns['b'].tolist(), [i / 2 for i in range(90, 100)])
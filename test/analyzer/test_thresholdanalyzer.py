@@ -0,0 +1,69 @@
+import time
+
+import numpy as np
+
+import bspump.analyzer
+import bspump.unittest
+
+
+class TestThresholdAnalyzer(bspump.unittest.ProcessorTestCase):
+
+	def test_process_batch(self):
+		self.set_up_processor(bspump.analyzer.ThresholdAnalyzer, config={
+			'event_attribute': 'server',
+			'event_value': 'load',
+		})
+		analyzer = self.Pipeline.Processor
+
+		now = time.time()
+		events = [
+			{"server": "alpha", "load": 1.5, "@timestamp": now - 30},
+			{"server": "beta", "load": 2.5, "@timestamp": now - 90},
+			{"server": "alpha", "load": 3.5, "@timestamp": now - 90},
+			{"load": 4.5, "@timestamp": now - 30},  # Not evaluated
+			{"server": "gamma", "load": 5.5, "@timestamp": now - 3600},  # Too late
+		]
+
+		output = analyzer.process_batch(None, events)
+		self.assertEqual(output, events)
+
+		matrix = analyzer.TimeWindow
+		# The row is added, the same as by evaluate(), but the value is not stored
+		gamma = matrix.get_row_index("gamma")
+		self.assertIsNotNone(gamma)
+		self.assertNotIn(5.5, matrix.Array[gamma].tolist())
+		for event in events[:3]:
+			row = matrix.get_row_index(event["server"])
+			column = matrix.get_column(event["@timestamp"])
+			self.assertEqual(matrix.Array[row, column], event["load"])
+
+		# The same result as evaluation of every event
+		array = matrix.Array.copy()
+		for event in events:
+			analyzer.process(None, event)
+		np.testing.assert_array_equal(array, matrix.Array)
+
+
+	def test_analyze_ordered_columns(self):
+		self.set_up_processor(bspump.analyzer.ThresholdAnalyzer, config={
+			'event_attribute': 'server',
+			'event_value': 'load',
+			'upper_bound': 10,
+		})
+		analyzer = self.Pipeline.Processor
+		matrix = analyzer.TimeWindow
+
+		row = matrix.add_row("alpha")
+		matrix.Array[row] = 0
+		for _ in range(3):
+			matrix.advance(matrix.TimeConfig.get_start())
+		self.assertEqual(3, matrix.Head)
+
+		# The two newest time slots exceed the threshold
+		matrix.Array[row, matrix.get_ordered_columns()[-2:]] = 20
+
+		alarms = []
+		analyzer.alarm = lambda x, y, count, index: alarms.append((x[index], y[index - 1], y[index], count))
+		analyzer.analyze()
+		columns = matrix.Array.shape[1]
+		self.assertEqual([(row, columns - 2, columns - 1, 2)], alarms)
@@ -6,7 +6,8 @@ from .test_json import *
 # from .test_jsonbytes import *
 from .test_mapping import *
 from .test_null import *
+from .test_offload import *
 from .test_print import *
-# TODO test_routing
+from .test_routing import *
 # TODO test_tee
 from .test_time import *
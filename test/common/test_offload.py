@@ -0,0 +1,79 @@
+import functools
+
+import bspump.common
+import bspump.unittest
+import bspump.trigger
+
+
+class SquareProcessor(bspump.Processor):
+
+	def process(self, context, event):
+		if event == 13:
+			raise ValueError("Unlucky event")
+		context["squared"] = True
+		return event * event
+
+
+class Power(object):
+
+	def __init__(self, exponent):
+		self.Exponent = exponent
+
+	def process(self, context, event):
+		return event ** self.Exponent
+
+
+class TestOffloadProcessor(bspump.unittest.ProcessorTestCase):
+
+	def run_offload(self, events, inner_processor=None, **kwargs):
+		svc = self.App.get_service("bspump.PumpService")
+
+		pipeline = bspump.Pipeline(app=self.App)
+		pipeline.handle_error = lambda exception, context, event: True
+
+		source = bspump.unittest.UnitTestSource(self.App, pipeline).on(
+			bspump.trigger.PubSubTrigger(self.App, "Application.run!", self.App.PubSub)
+		)
+		source.Input = [({}, event) for event in events]
+		offload = bspump.common.OffloadProcessor(
+			self.App, pipeline, inner_processor if inner_processor is not None else SquareProcessor(self.App, pipeline),
+			config={'batch_size': 3, 'max_workers': 2},
+			**kwargs
+		)
+		pipeline.Sink = sink = bspump.unittest.UnitTestSink(self.App, pipeline)
+		pipeline.build(source, offload, sink)
+
+		pipeline.PubSub.subscribe("bspump.pipeline.cycle_end!", self._on_finished)
+
+		svc.add_pipeline(pipeline)
+		self.App.run()
+
+		return pipeline, offload
+
+	def _on_finished(self, event_name, pipeline):
+		self.App.stop()
+
+	def test_thread_ordered(self):
+		pipeline, offload = self.run_offload(range(10), executor="thread", max_inflight=2)
+
+		self.assertEqual([i * i for i in range(10)], [event for context, event in pipeline.Sink.Output])
+		self.assertTrue(all(context["squared"] for context, event in pipeline.Sink.Output))
+		self.assertEqual(0, offload.InFlight)
+		self.assertNotIn(offload, pipeline._throttles)
+
+	def test_process_unordered(self):
+		pipeline, offload = self.run_offload(range(10), functools.partial(Power, 2), executor="process", ordered=False)
+
+		self.assertEqual(sorted(i * i for i in range(10)), sorted(event for context, event in pipeline.Sink.Output))
+		self.assertIsNone(offload.Pool)
+
+	def test_process_requires_factory(self):
+		pipeline = bspump.Pipeline(app=self.App)
+		with self.assertRaises(TypeError):
+			bspump.common.OffloadProcessor(self.App, pipeline, SquareProcessor(self.App, pipeline), executor="process")
+
+	def test_error(self):
+		pipeline, offload = self.run_offload([12, 13, 14], executor="thread")
+
+		self.assertEqual([144, 196], [event for context, event in pipeline.Sink.Output])
+		self.assertEqual(1, pipeline.MetricsCounter.Storage["fieldset"][0]["values"]["warning"])
@@ -0,0 +1,204 @@
+import bspump
+import bspump.common
+import bspump.unittest
+import bspump.trigger
+
+
+class UnitTestRouterSink(bspump.common.RouterSink):
+
+	def process(self, context, event):
+		self.route(context, event, "DownstreamPipeline.*InternalSource")
+
+
+class StoppingSink(bspump.unittest.UnitTestSink):
+
+	def process(self, context, event):
+		super().process(context, event)
+		if len(self.Output) == 5:
+			self.Pipeline.App.stop()
+
+
+class TestInternalSourceTracing(bspump.unittest.TestCase):
+
+	def test_latency_tracing(self):
+		svc = self.App.get_service("bspump.PumpService")
+		config = {"latency_tracing": True, "reset_profiler": False}
+
+		downstream = bspump.Pipeline(self.App, "DownstreamPipeline", config=config)
+		downstream.build(
+			bspump.common.InternalSource(self.App, downstream),
+			StoppingSink(self.App, downstream),
+		)
+
+		upstream = bspump.Pipeline(self.App, "UpstreamPipeline", config=config)
+		source = bspump.unittest.UnitTestSource(self.App, upstream).on(
+			bspump.trigger.PubSubTrigger(self.App, "Application.run!", self.App.PubSub)
+		)
+		source.Input = [({}, i) for i in range(5)]
+		upstream.build(source, UnitTestRouterSink(self.App, upstream))
+
+		downstream.Sink = downstream.Processors[0][-1]
+
+		svc.add_pipeline(downstream)
+		svc.add_pipeline(upstream)
+		self.App.run()
+
+		self.assertEqual(5, len(downstream.Sink.Output))
+		for context, event in downstream.Sink.Output:
+			self.assertGreaterEqual(context["ingress_time"], context["origin_time"])
+			self.assertEqual(context["ancestor"]["origin_time"], context["origin_time"])
+
+		self.assertEqual(5, upstream.TraceHistogram.Count)
+		self.assertEqual(5, downstream.TraceHistogram.Count)
+		self.assertEqual(5, downstream.TraceOriginHistogram.Count)
+		self.assertGreaterEqual(downstream.TraceOriginHistogram.Max, downstream.TraceHistogram.Max)
+
+		internal_source = downstream.Sources[0]
+		self.assertEqual(5, internal_source.QueueWaitHistogram.Count)
+		self.assertIn("QueueWait", internal_source.rest_get())
+
+	def test_tracing_disabled(self):
+		pipeline = bspump.Pipeline(self.App, "UntracedPipeline")
+		internal_source = bspump.common.InternalSource(self.App, pipeline)
+		self.assertIsNone(internal_source.QueueWaitHistogram)
+		self.assertNotIn("Trace", pipeline.rest_get()["Latency"])
+
+
+class CountingSink(StoppingSink):
+
+	Expected = 2000
+
+	def process(self, context, event):
+		self.Output.append(event)
+		if len(self.Output) == self.Expected:
+			self.Pipeline.App.stop()
+
+
+class TestInternalSourceFlowControl(bspump.unittest.TestCase):
+
+	def run_topology(self, source_config):
+		svc = self.App.get_service("bspump.PumpService")
+
+		downstream = bspump.Pipeline(self.App, "DownstreamPipeline")
+		internal_source = bspump.common.InternalSource(self.App, downstream, config=source_config)
+		sink = CountingSink(self.App, downstream)
+		downstream.build(internal_source, sink)
+
+		upstream = bspump.Pipeline(self.App, "UpstreamPipeline")
+		source = bspump.unittest.UnitTestSource(self.App, upstream).on(
+			bspump.trigger.PubSubTrigger(self.App, "Application.run!", self.App.PubSub)
+		)
+		source.Input = [({}, i) for i in range(CountingSink.Expected)]
+		upstream.build(source, UnitTestRouterSink(self.App, upstream))
+
+		self.Throttled = 0
+		upstream.PubSub.subscribe("bspump.pipeline.not_ready!", self._on_not_ready)
+
+		svc.add_pipeline(downstream)
+		svc.add_pipeline(upstream)
+		self.App.run()
+
+		self.assertEqual(list(range(CountingSink.Expected)), sink.Output)
+		return upstream, internal_source
+
+	def _on_not_ready(self, event_name, pipeline):
+		self.Throttled += 1
+
+	def test_credits(self):
+		upstream, internal_source = self.run_topology({"credits": 1000, "credit_batch": 100})
+
+		# The pipeline is throttled only when all 1000 credits are spent
+		self.assertLessEqual(self.Throttled, 2)
+		self.assertGreaterEqual(internal_source.Credits, 0)
+		self.assertLessEqual(internal_source.Credits, 1000)
+		self.assertEqual(0, internal_source.Queue.maxsize)
+
+	def test_credits_exhausted(self):
+		upstream, internal_source = self.run_topology({"credits": 10, "credit_batch": 5})
+
+		# The queue never holds more events than the credits allow
+		self.assertGreater(self.Throttled, 0)
+		self.assertEqual(0, len(upstream._throttles))
+
+	def test_backpressure(self):
+		upstream, internal_source = self.run_topology({"queue_max_size": 10})
+		self.assertGreater(self.Throttled, 0)
+
+	def test_credits_idle_router(self):
+		svc = self.App.get_service("bspump.PumpService")
+
+		downstream = bspump.Pipeline(self.App, "DownstreamPipeline")
+		internal_source = bspump.common.InternalSource(self.App, downstream, config={"credits": 10, "credit_batch": 10})
+		downstream.build(internal_source, bspump.common.NullSink(self.App, downstream))
+		svc.add_pipeline(downstream)
+
+		routers = []
+		for i in range(2):
+			pipeline = bspump.Pipeline(self.App, "UpstreamPipeline{}".format(i))
+			routers.append(UnitTestRouterSink(self.App, pipeline))
+			pipeline.build(bspump.unittest.UnitTestSource(self.App, pipeline), routers[-1])
+
+		# The first router takes all credits and becomes idle, the second one waits for them
+		routers[0].locate("DownstreamPipeline.*InternalSource")
+		routers[1].process({}, 1)
+		self.assertEqual(0, internal_source.Credits)
+		self.assertIn(internal_source, routers[1].Pipeline._throttles)
+
+		self.App.PubSub.publish("Application.tick!")
+		self.assertEqual(0, routers[0]._credits[internal_source])
+		self.assertNotIn(internal_source, routers[1].Pipeline._throttles)
+		self.assertEqual(9, routers[1]._credits[internal_source])
+
+		# The second router keeps credits while it routes events
+		routers[1].process({}, 2)
+		self.App.PubSub.publish("Application.tick!")
+		self.assertEqual(8, routers[1]._credits[internal_source])
+
+
+class TestRouterCopyPolicy(bspump.unittest.ProcessorTestCase):
+
+	def route(self, config=None):
+		self.set_up_processor(bspump.common.TeeProcessor, config=config)
+		tee = self.Pipeline.Processors[0][0]
+		svc = self.App.get_service("bspump.PumpService")
+
+		sources = []
+		for i in range(2):
+			pipeline = bspump.Pipeline(self.App, "TargetPipeline{}".format(i))
+			sources.append(bspump.common.InternalSource(self.App, pipeline))
+			pipeline.build(sources[-1], bspump.common.NullSink(self.App, pipeline))
+			svc.add_pipeline(pipeline)
+			tee.bind("TargetPipeline{}.*InternalSource".format(i))
+
+		event = {"a": {"b": 1}}
+		output = tee.process({}, event)
+		return event, output, [source.Queue.get_nowait()[1] for source in sources]
+
+	def test_deep(self):
+		event, output, routed = self.route()
+		self.assertIs(event, output)
+		for routed_event in routed:
+			self.assertEqual(event, routed_event)
+			self.assertIsNot(event["a"], routed_event["a"])
+
+	def test_shallow(self):
+		event, output, routed = self.route(config={"copy_event": "shallow"})
+		for routed_event in routed:
+			self.assertIsNot(event, routed_event)
+			self.assertIs(event["a"], routed_event["a"])
+
+	def test_share(self):
+		event, output, routed = self.route(config={"copy_event": "share"})
+		for routed_event in routed:
+			self.assertIs(event, routed_event)
+
+	def test_freeze(self):
+		event, output, routed = self.route(config={"freeze": True})
+		self.assertIsInstance(output, bspump.FrozenDict)
+		self.assertEqual(event, output)
+		for routed_event in routed:
+			self.assertIs(output, routed_event)
+
+	def test_unknown_policy(self):
+		with self.assertRaises(ValueError):
+			self.route(config={"copy_event": "clone"})
@@ -5,3 +5,8 @@ from .test_session_matrix import *
 from .test_time_window_matrix import *
 
 
+from .test_matrix_changes import *
+from .test_closed_rows import *
+from .test_hash_index import *
+from .test_snapshot import *
+from .test_matrix_export import *
@@ -0,0 +1,92 @@
+import os
+import shutil
+import tempfile
+
+import bspump
+import bspump.matrix
+import bspump.unittest
+from bspump.matrix.utils import ClosedRows, PersistentClosedRows
+
+
+class TestClosedRows(bspump.unittest.TestCase):
+
+	def test_closed_rows(self):
+		closed_rows = ClosedRows()
+		closed_rows.extend(0, 10)
+		self.assertEqual(len(closed_rows), 10)
+		self.assertEqual(closed_rows.get_rows().tolist(), list(range(10)))
+
+		# The lowest rows are used first
+		self.assertEqual([closed_rows.pop() for _ in range(3)], [0, 1, 2])
+		self.assertNotIn(1, closed_rows)
+		self.assertIn(3, closed_rows)
+		self.assertNotIn(None, closed_rows)
+		self.assertNotIn(100, closed_rows)
+
+		closed_rows.add(1)
+		closed_rows.add(1)
+		self.assertEqual(len(closed_rows), 8)
+		self.assertEqual(closed_rows.pop(), 1)
+
+		# Rows closed by add() are reused last in, first out
+		closed_rows.add(0)
+		closed_rows.add(2)
+		self.assertEqual([closed_rows.pop() for _ in range(2)], [2, 0])
+
+		closed_rows.add(20)  # Beyond the current capacity
+		self.assertEqual(closed_rows.serialize(), list(range(3, 10)) + [20])
+
+		restored = ClosedRows()
+		restored.deserialize(closed_rows.serialize())
+		self.assertEqual(restored.get_rows().tolist(), closed_rows.get_rows().tolist())
+		self.assertEqual(restored.pop(), 3)
+
+		closed_rows.flush()
+		self.assertEqual(len(closed_rows), 0)
+		with self.assertRaises(KeyError):
+			closed_rows.pop()
+
+
+	def test_persistent_closed_rows(self):
+		path = tempfile.mkdtemp()
+		try:
+			file_path = os.path.join(path, 'closed_rows.dat')
+			closed_rows = PersistentClosedRows(file_path, size=1)
+			self.assertEqual(closed_rows.get_rows().tolist(), [0])
+
+			closed_rows.extend(1, 10)
+			for _ in range(10):
+				closed_rows.pop()
+			closed_rows.add(4)
+			closed_rows.add(7)
+			closed_rows.CRBit.flush()
+
+			reopened = PersistentClosedRows(file_path)
+			self.assertEqual(reopened.get_rows().tolist(), [4, 7])
+			self.assertEqual(reopened.pop(), 4)
+			self.assertEqual(reopened.CRBit.tolist(), [1] * 7 + [0] + [1] * 2)
+		finally:
+			shutil.rmtree(path)
+
+
+	def test_named_matrix_flush(self):
+		matrix = bspump.matrix.NamedMatrix(app=self.App, config={'max_closed_rows_capacity': 1.0})
+		for i in range(20):
+			row_index = matrix.add_row(str(i))
+			matrix.Array[row_index] = i
+
+		for i in range(0, 20, 3):
+			matrix.close_row(str(i))
+		row_index = matrix.add_row("reused")  # Takes a closed row, so rows are not ordered by names
+		matrix.Array[row_index] = 100
+
+		matrix.flush()
+		self.assertEqual(len(matrix.ClosedRows), 0)
+		self.assertEqual(matrix.Array.shape[0], len(matrix.Index))
+		for i in range(20):
+			row_index = matrix.get_row_index(str(i))
+			if i % 3 == 0:
+				self.assertIsNone(row_index)
+			else:
+				self.assertEqual(matrix.Array[row_index], i)
+		self.assertEqual(matrix.Array[matrix.get_row_index("reused")], 100)
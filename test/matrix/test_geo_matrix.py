@@ -5,6 +5,7 @@ import numpy as np
 import bspump
 import bspump.matrix
 import bspump.unittest
+from bspump.matrix.utils import GeoIndex, haversine
 
 
 class TestGeoMatrix(bspump.unittest.TestCase):
@@ -45,3 +46,55 @@ class TestGeoMatrix(bspump.unittest.TestCase):
 			row_, column_ =  matrix.project_equirectangular(lat, lon)
 			self.assertEqual(row_, row)
 			self.assertEqual(column_, column)
+
+
+	def test_matrix_project_many(self):
+		bbox = {"min_lon": 14.259097, "max_lon": 14.589601, "min_lat": 49.974702, "max_lat": 50.160150}
+		matrix = bspump.matrix.GeoMatrix(app=self.App, bbox=bbox, resolution=0.5)
+
+		rng = np.random.default_rng(0)
+		lats = rng.uniform(49.9, 50.2, 1000)
+		lons = rng.uniform(14.2, 14.6, 1000)
+		rows, columns = matrix.project_many(lats, lons)
+		for lat, lon, row, column in zip(lats, lons, rows, columns):
+			if matrix.is_in_boundaries(lat, lon):
+				self.assertEqual((row, column), matrix.project_equirectangular(lat, lon))
+			else:
+				self.assertEqual((row, column), (-1, -1))
+
+		rows, columns = matrix.project_many([90, -90], [-180, 180], clip=True)
+		self.assertEqual(rows.tolist(), [0, matrix.MapHeight - 1])
+		self.assertEqual(columns.tolist(), [0, matrix.MapWidth - 1])
+
+		distances = matrix.get_gps_distance(lats[0], lons[0], lats, lons)
+		for i in (0, 10, 100):
+			self.assertAlmostEqual(distances[i], matrix.get_gps_distance(lats[0], lons[0], lats[i], lons[i]))
+
+
+	def test_geo_index(self):
+		bbox = {"min_lon": 14.259097, "max_lon": 14.589601, "min_lat": 49.974702, "max_lat": 50.160150}
+		matrix = bspump.matrix.GeoMatrix(app=self.App, bbox=bbox, resolution=0.5)
+		index = GeoIndex(matrix, size=0)
+
+		rng = np.random.default_rng(1)
+		ids = ["vehicle-{}".format(i) for i in range(5000)]
+		lats = rng.uniform(49.95, 50.18, 5000)
+		lons = rng.uniform(14.24, 14.6, 5000)
+		index.update(ids, lats, lons)
+		index.remove(ids[:100])
+		lats[:100] = np.nan
+		# Moved entities
+		lats[100:200] = rng.uniform(49.98, 50.15, 100)
+		index.update(ids[100:200], lats[100:200], lons[100:200])
+
+		self.assertEqual(len(index), 4900)
+		self.assertNotIn("vehicle-0", index)
+		self.assertEqual(index.get_position("vehicle-150"), (lats[150], lons[150]))
+
+		inside = np.array([matrix.is_in_boundaries(lat, lon) for lat, lon in zip(lats, lons)])
+		for lat, lon, radius in ((50.07, 14.42, 2), (50.0, 14.3, 5), (50.2, 14.6, 3), (50.07, 14.42, 0.1)):
+			found, distances = index.query_radius(lat, lon, radius)
+			all_distances = haversine(lat, lon, lats, lons)
+			expected = np.flatnonzero(inside & (all_distances <= radius))
+			self.assertEqual(sorted(found), sorted(ids[i] for i in expected))
+			self.assertTrue(np.all(np.diff(distances) >= 0))
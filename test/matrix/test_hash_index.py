@@ -0,0 +1,125 @@
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+import bspump
+import bspump.matrix
+import bspump.unittest
+from bspump.matrix.utils import HashIndex, PersistentHashIndex
+
+
+class TestHashIndex(bspump.unittest.TestCase):
+
+	def setUp(self) -> None:
+		super().setUp()
+		self.Path = tempfile.mkdtemp()
+
+
+	def tearDown(self) -> None:
+		shutil.rmtree(self.Path)
+		super().tearDown()
+
+
+	def test_hash_index(self):
+		index = HashIndex(10)
+		names = {"row-{}".format(i): i for i in range(1000)}
+		names["čeština"] = 1000
+		for name, row_index in names.items():
+			index.add_row(name, row_index)
+
+		self.assertEqual(len(index), 1001)
+		self.assertEqual(index.get_row_index("čeština"), 1000)
+		self.assertEqual(index.get_row_name(1000), "čeština")
+		self.assertIsNone(index.get_row_index("unknown"))
+		self.assertIsNone(index.get_row_name(5000))
+
+		for i in range(0, 1000, 2):
+			self.assertTrue(index.pop_index(i))
+			del names["row-{}".format(i)]
+		self.assertFalse(index.pop_index(0))
+		self.assertNotIn("row-0", index)
+		self.assertIn("row-1", index)
+		self.assertEqual(index.get_rows().tolist(), sorted(names.values()))
+
+		# A removed name can be added again, to another row
+		index.add_row("row-0", 0)
+		index.add_row("row-0", 2)
+		self.assertEqual(index.get_row_index("row-0"), 2)
+		self.assertIsNone(index.get_row_name(0))
+		names["row-0"] = 2
+
+		closed = np.array([0, 4, 6, 8], dtype='i8')
+		index.flush(closed)
+		self.assertEqual(len(index), len(names))
+		for name, row_index in names.items():
+			row_index = row_index - int(np.searchsorted(closed, row_index))
+			self.assertEqual(index.get_row_index(name), row_index)
+			self.assertEqual(index.get_row_name(row_index), name)
+
+		restored = HashIndex()
+		restored.deserialize(index.serialize())
+		for name in names:
+			self.assertEqual(restored.get_row_index(name), index.get_row_index(name))
+
+
+	def test_persistent_hash_index(self):
+		path = os.path.join(self.Path, 'index')
+		index = PersistentHashIndex(path, 10)
+		for i in range(100):
+			index.add_row("row-{}".format(i), i)
+		index.pop_index(50)
+
+		reopened = PersistentHashIndex(path, None)
+		self.assertEqual(len(reopened), 99)
+		self.assertEqual(reopened.get_row_index("row-99"), 99)
+		self.assertIsNone(reopened.get_row_index("row-50"))
+
+		reopened.add_row("new", 50)
+		self.assertEqual(reopened.get_row_name(50), "new")
+		self.assertEqual(reopened.get_row_index("row-10"), 10)
+
+
+	def test_named_matrix(self):
+		matrix = bspump.matrix.NamedMatrix(app=self.App, config={'index': 'hash'})
+		self.assertIsInstance(matrix.Index, HashIndex)
+
+		for i in range(100):
+			row_index = matrix.add_row(str(i))
+			matrix.Array[row_index] = i
+
+		for i in range(0, 40):
+			matrix.close_row(str(i))
+		matrix.flush()
+
+		self.assertEqual(len(matrix.Index), 60)
+		for i in range(40, 100):
+			self.assertEqual(matrix.Array[matrix.get_row_index(str(i))], i)
+
+
+	def test_persistent_named_matrix(self):
+		matrix = bspump.matrix.PersistentNamedMatrix(app=self.App, dtype='i8', config={'path': self.Path})
+		for i in range(20):
+			row_index = matrix.add_row(str(i))
+			matrix.Array[row_index] = i
+		matrix.close_row("5")
+
+		reopened = bspump.matrix.PersistentNamedMatrix(app=self.App, dtype='i8', config={'path': self.Path})
+		self.assertIsNone(reopened.get_row_index("5"))
+		for i in range(6, 20):
+			self.assertEqual(reopened.Array[reopened.get_row_index(str(i))], i)
+
+
+	def test_persistent_named_matrix_migration(self):
+		names = np.memmap(os.path.join(self.Path, 'map.dat'), dtype='U30', mode='w+', shape=(3,))
+		names[:] = ["a", "", "c"]
+		names.flush()
+		array = np.memmap(os.path.join(self.Path, 'array.dat'), dtype='i8', mode='w+', shape=(3,))
+		array[:] = [1, 0, 3]
+		array.flush()
+
+		matrix = bspump.matrix.PersistentNamedMatrix(app=self.App, dtype='i8', config={'path': self.Path})
+		self.assertEqual(matrix.get_row_index("a"), 0)
+		self.assertEqual(matrix.get_row_index("c"), 2)
+		self.assertIsNone(matrix.get_row_name(1))
@@ -0,0 +1,96 @@
+import bspump
+import bspump.lookup
+import bspump.matrix
+import bspump.unittest
+
+
+class TestMatrixChanges(bspump.unittest.TestCase):
+
+	def setUp(self) -> None:
+		super().setUp()
+		self.Matrix = bspump.matrix.NamedMatrix(
+			app=self.App,
+			dtype=[('start', 'i8'), ('end', 'i8'), ('color', 'U10')],
+			id="TestMatrixChanges",
+			config={'max_closed_rows_capacity': 1.0},  # Closing of rows does not flush the matrix
+		)
+		svc = self.App.get_service("bspump.PumpService")
+		svc.add_matrix(self.Matrix)
+
+		self.Notifications = []
+		self.Matrix.PubSub.subscribe("Matrix changed!", self._on_matrix_changed)
+
+
+	def _on_matrix_changed(self, message_type):
+		self.Notifications.append(self.Matrix.Changes)
+
+
+	def add_row(self, name, start, end, color):
+		row_index = self.Matrix.add_row(name)
+		self.Matrix.Array[row_index] = (start, end, color)
+		return row_index
+
+
+	def test_coalesced_notification(self):
+		rows = [self.add_row(str(i), i, i + 1, "red") for i in range(10)]
+		self.Matrix.close_row("0")
+		self.Matrix.close_row("1")
+		self.assertEqual(len(self.Notifications), 0)
+
+		self.Matrix.flush_changes()
+		self.assertEqual(len(self.Notifications), 1)
+		changes = self.Notifications[0]
+		self.assertEqual(changes.added_rows.tolist(), sorted(rows[2:]))
+		self.assertEqual(changes.removed_rows.tolist(), [])
+		self.assertFalse(changes.reindexed)
+
+		# Nothing has changed since the last notification
+		self.Matrix.flush_changes()
+		self.assertEqual(len(self.Notifications), 1)
+
+		self.Matrix.close_row("2")
+		self.Matrix.flush_changes()
+		self.assertEqual(self.Notifications[1].removed_rows.tolist(), [rows[2]])
+
+		self.Matrix.flush()
+		self.Matrix.flush_changes()
+		self.assertTrue(self.Notifications[2].reindexed)
+
+
+	def test_incremental_indexes(self):
+		lookup = bspump.lookup.MatrixLookup(
+			self.App,
+			matrix_id="TestMatrixChanges",
+			id="TestMatrixChangesLookup",
+			config={'source_url': "/dev/null"},  # A lookup with a local source is the master, it maintains its indexes
+		)
+		self.assertTrue(lookup.is_master())
+		for i in range(20):
+			self.add_row(str(i), 10 * i, 10 * (i + 1), ("red", "green", "blue")[i % 3])
+		self.Matrix.flush_changes()
+
+		bitmap = lookup.create_index(bspump.lookup.BitMapIndex, 'color', self.Matrix)
+		tree = lookup.create_index(bspump.lookup.TreeRangeIndex, 'start', 'end', self.Matrix)
+		slices = lookup.create_index(bspump.lookup.SliceIndex, 'start', 'end', self.Matrix, resolution=5)
+
+		for i in range(0, 20, 4):
+			self.Matrix.close_row(str(i))
+		self.add_row("20", 40, 50, "yellow")  # Takes the index of a closed row, within existing ranges
+		self.Matrix.flush_changes()
+
+		expected_bitmap = bspump.lookup.BitMapIndex('color', self.Matrix)
+		for color in ("red", "green", "blue", "yellow"):
+			self.assertEqual(bitmap.search(color), expected_bitmap.search(color))
+
+		expected_tree = bspump.lookup.TreeRangeIndex('start', 'end', self.Matrix)
+		expected_slices = bspump.lookup.SliceIndex('start', 'end', self.Matrix, resolution=5)
+		for value in range(-5, 205, 5):
+			self.assertEqual(tree.search(value), expected_tree.search(value))
+			self.assertEqual(slices.search(value), expected_slices.search(value))
+
+		# A range outside of the indexed ones rebuilds the index
+		row_index = self.add_row("21", 200, 220, "red")
+		self.Matrix.flush_changes()
+		self.assertEqual(tree.search(210), {row_index})
+		self.assertEqual(slices.search(215), {row_index})
+		self.assertIn(row_index, bitmap.search("red"))
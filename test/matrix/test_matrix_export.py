@@ -0,0 +1,103 @@
+import csv
+import io
+import json
+import unittest
+
+import numpy as np
+
+import bspump
+import bspump.matrix
+import bspump.unittest
+
+try:
+	import pyarrow.parquet
+except ImportError:
+	pyarrow = None
+
+
+class TestMatrixExport(bspump.unittest.ProcessorTestCase):
+
+	def setUp(self) -> None:
+		super().setUp()
+		self.Matrix = bspump.matrix.SessionMatrix(
+			app=self.App,
+			dtype=[('name', 'U10'), ('count', 'i8'), ('fractions', '(2,2)f8'), ('flag', 'b1')],
+		)
+		for i in range(10):
+			row_index = self.Matrix.add_row("row-{}".format(i))
+			self.Matrix.Array[row_index] = ('a "{}", b'.format(i), i, np.full((2, 2), i / 4), i % 2 == 0)
+		self.Matrix.close_row("row-3")
+
+
+	def export(self, processor, config):
+		self.set_up_processor(processor, config=config)
+		output = self.execute([(None, self.Matrix)])
+		return [event for context, event in output]
+
+
+	def test_csv(self):
+		output = self.export(bspump.matrix.MatrixExportGenerator, {'chunk_size': 4})
+		self.assertEqual(len(output), 3)  # 9 rows
+
+		rows = list(csv.DictReader(io.StringIO(b''.join(output).decode('utf-8'))))
+		self.assertEqual(
+			list(rows[0].keys()),
+			['id', 'name', 'count', 'fractions_0_0', 'fractions_0_1', 'fractions_1_0', 'fractions_1_1', 'flag']
+		)
+		self.assertEqual([row['id'] for row in rows], ["row-{}".format(i) for i in range(10) if i != 3])
+		self.assertEqual(rows[1]['name'], 'a "1", b')
+		self.assertEqual(rows[1]['count'], '1')
+		self.assertEqual(rows[1]['fractions_1_0'], '0.25')
+		self.assertEqual(rows[1]['flag'], 'False')
+
+
+	def test_ndjson(self):
+		self.Matrix.Array['fractions'][0, 0, 0] = np.nan
+		output = self.export(bspump.matrix.MatrixExportGenerator, {'format': 'ndjson'})
+		rows = [json.loads(line) for line in b''.join(output).decode('utf-8').splitlines()]
+		self.assertEqual(len(rows), 9)
+		self.assertEqual(rows[0]['fractions_0_0'], None)
+		self.assertEqual(rows[2], {
+			'id': 'row-2', 'name': 'a "2", b', 'count': 2, 'fractions_0_0': 0.5,
+			'fractions_0_1': 0.5, 'fractions_1_0': 0.5, 'fractions_1_1': 0.5, 'flag': True,
+		})
+
+
+	def test_empty(self):
+		self.Matrix = bspump.matrix.SessionMatrix(app=self.App, dtype=[('count', 'i8')])
+		output = self.export(bspump.matrix.MatrixExportGenerator, {})
+		self.assertEqual(output, [b'"id","count"\n'])
+
+
+	@unittest.skipIf(pyarrow is None, "pyarrow is not installed")
+	def test_parquet(self):
+		output = self.export(bspump.matrix.MatrixExportGenerator, {'format': 'parquet', 'chunk_size': 4})
+		table = pyarrow.parquet.read_table(io.BytesIO(b''.join(output)))
+		self.assertEqual(table.num_rows, 9)
+		self.assertEqual(table.column('count').to_pylist(), [i for i in range(10) if i != 3])
+
+
+	def test_time_window_matrix(self):
+		self.Matrix = bspump.matrix.TimeWindowMatrix(app=self.App, dtype='f8', start_time=1000, resolution=10, columns=3)
+		for name in ("a", "b"):
+			row_index = self.Matrix.add_row(name)
+			self.Matrix.Array[row_index] = [1, 2, 3]
+		self.Matrix.advance(self.Matrix.TimeConfig.get_start())
+
+		output = self.export(bspump.matrix.TimeWindowMatrixExportGenerator, {'format': 'ndjson'})
+		rows = [json.loads(line) for line in b''.join(output).decode('utf-8').splitlines()]
+		end = self.Matrix.TimeConfig.get_end()
+		self.assertEqual(rows[:3], [
+			{'id': 'a', 'timestamp': end, 'value': 2.0},
+			{'id': 'a', 'timestamp': end + 10, 'value': 3.0},
+			{'id': 'a', 'timestamp': end + 20, 'value': None},
+		])
+		self.assertEqual(len(rows), 6)
+
+
+	def test_csv_generator(self):
+		output = self.export(bspump.matrix.SessionMatrixExportCSVGenerator, {'chunk_size': 4})
+		self.assertEqual(len(output), 9)
+		self.assertEqual(output[0]['id'], "row-0")
+		self.assertEqual(output[4]['count'], 5)
+		self.assertEqual(output[4]['fractions_0_1'], 1.25)
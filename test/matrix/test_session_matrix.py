@@ -101,4 +101,47 @@ class TestSessionMatrix(bspump.unittest.TestCase):
 		self.assertEqual(event['f0'], matrix.Array[index]['f0'])
 
 
+	def test_matrix_store_events(self):
+		dtype = [
+			('f1', 'U20'),
+			('f2', 'i8'),
+			('f3', 'f8'),
+		]
+		matrix = bspump.matrix.SessionMatrix(app=self.App, dtype=dtype)
+		events = [{'id': str(i), 'f0': i, 'f1': 'event' + str(i), 'f2': i, 'f3': i / 4} for i in range(20)]
+		rows = matrix.resolve_rows([event['id'] for event in events])
+
+		matrix.store_events(rows, events)
+		for row_index, event in zip(rows, events):
+			for key in ('f1', 'f2', 'f3'):
+				self.assertEqual(matrix.Array[row_index][key], event[key])
 
+		# The same result as storing events one by one
+		array = matrix.Array.copy()
+		matrix.Array[:] = np.zeros(1, dtype=dtype)
+		for row_index, event in zip(rows, events):
+			matrix.store_event(row_index, event)
+		np.testing.assert_array_equal(matrix.Array, array)
+
+		matrix.store_events(rows[:2], [{'f2': -1}, {'f2': -2}], keys=['f2', 'f5'])
+		self.assertEqual(matrix.Array['f2'][rows[:3]].tolist(), [-1, -2, 2])
+		self.assertEqual(matrix.Array['f1'][rows[0]], 'event0')
+
+
+	def test_matrix_decode_rows(self):
+		dtype = [
+			('f0', 'U3'),
+			('f1', 'i8'),
+		]
+		matrix = bspump.matrix.SessionMatrix(app=self.App, dtype=dtype, config={'primary_name': 'event_id'})
+		rows = matrix.resolve_rows(['a', 'b', 'c'])
+		matrix.Array['f0'][rows] = ['aaa', 'bbb', 'ccc']
+		matrix.Array['f1'][rows] = [1, 2, 3]
+
+		columns = matrix.decode_rows(rows[::-1])
+		self.assertEqual(columns['event_id'], ['c', 'b', 'a'])
+		self.assertEqual(columns['f0'].tolist(), ['ccc', 'bbb', 'aaa'])
+		self.assertEqual(columns['f1'].tolist(), [3, 2, 1])
+
+		columns = matrix.decode_rows(rows[:1], keys=['f1'])
+		self.assertEqual(columns, {'f1': [1], 'event_id': ['a']})
@@ -0,0 +1,129 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+import bspump
+import bspump.lookup
+import bspump.matrix
+import bspump.unittest
+from bspump.matrix.utils import write_snapshot, read_snapshot, open_snapshot, is_snapshot
+
+
+class TestSnapshot(bspump.unittest.TestCase):
+
+	def setUp(self) -> None:
+		super().setUp()
+		self.Path = tempfile.mkdtemp()
+
+
+	def tearDown(self) -> None:
+		shutil.rmtree(self.Path)
+		super().tearDown()
+
+
+	def test_snapshot(self):
+		array = np.zeros((100, 3), dtype=[('count', 'i8'), ('name', 'U10')])
+		array['count'] = np.arange(300).reshape(100, 3)
+		array['name'][5] = "five"
+
+		for compression in (None, 'zlib'):
+			f = io.BytesIO()
+			write_snapshot(f, array, metadata={'foo': 'bar'}, compression=compression)
+			data = f.getvalue()
+			self.assertTrue(is_snapshot(data))
+
+			loaded, metadata = read_snapshot(data)
+			self.assertEqual(metadata, {'foo': 'bar'})
+			self.assertEqual(loaded.dtype, array.dtype)
+			np.testing.assert_array_equal(loaded, array)
+
+			path = os.path.join(self.Path, 'snapshot.bin')
+			with open(path, 'wb') as f:
+				f.write(data)
+			loaded, _ = open_snapshot(path)
+			np.testing.assert_array_equal(loaded, array)
+
+		self.assertFalse(is_snapshot(b'{"Matrix": {}}'))
+		with self.assertRaises(ValueError):
+			write_snapshot(io.BytesIO(), array, compression='unknown')
+
+
+	def test_snapshot_zero_copy(self):
+		array = np.arange(1000, dtype='f8')
+		f = io.BytesIO()
+		write_snapshot(f, array)
+		data = bytearray(f.getvalue())
+
+		loaded, _ = read_snapshot(data)
+		data[-8:] = np.array([-1.0]).tobytes()
+		self.assertEqual(loaded[-1], -1.0)
+
+
+	def test_named_matrix_snapshot(self):
+		matrix = bspump.matrix.NamedMatrix(app=self.App, dtype=[('count', 'i8'), ('name', 'U10')])
+		for i in range(50):
+			row_index = matrix.add_row("row-{}".format(i))
+			matrix.Array[row_index] = (i, str(i))
+		closed_row = matrix.get_row_index("row-7")
+		matrix.close_row("row-7")
+
+		path = os.path.join(self.Path, 'matrix.bin')
+		with open(path, 'wb') as f:
+			matrix.snapshot(f, compression='zlib', metadata={'foo': 'bar'})
+
+		for index in ('dict', 'hash'):
+			loaded = bspump.matrix.NamedMatrix(app=self.App, config={'index': index})
+			self.assertEqual(loaded.load_snapshot(path)['foo'], 'bar')
+			self.assertIsNone(loaded.get_row_index("row-7"))
+			self.assertIn(closed_row, loaded.ClosedRows)
+			for i in range(8, 50):
+				row_index = loaded.get_row_index("row-{}".format(i))
+				self.assertEqual(row_index, matrix.get_row_index("row-{}".format(i)))
+				self.assertEqual(loaded.Array[row_index]['count'], i)
+
+		persistent = bspump.matrix.PersistentNamedMatrix(
+			app=self.App,
+			dtype=[('count', 'i8'), ('name', 'U10')],
+			config={'path': os.path.join(self.Path, 'persistent')},
+		)
+		persistent.load_snapshot(path)
+		reopened = bspump.matrix.PersistentNamedMatrix(
+			app=self.App,
+			dtype=[('count', 'i8'), ('name', 'U10')],
+			config={'path': os.path.join(self.Path, 'persistent')},
+		)
+		self.assertEqual(reopened.Array[reopened.get_row_index("row-20")]['name'], "20")
+		self.assertIsNone(reopened.get_row_index("row-7"))
+		self.assertIn(closed_row, reopened.ClosedRows)
+
+
+	def test_matrix_lookup(self):
+		svc = self.App.get_service("bspump.PumpService")
+		for matrix_id in ("MasterMatrix", "SlaveMatrix"):
+			svc.add_matrix(bspump.matrix.NamedMatrix(app=self.App, dtype=[('color', 'U10')], id=matrix_id))
+
+		master = bspump.lookup.MatrixLookup(
+			self.App, matrix_id="MasterMatrix", id="MasterLookup", config={'source_url': "/dev/null", 'compression': "zlib"}
+		)
+		for i in range(10):
+			row_index = master.Matrix.add_row(str(i))
+			master.Matrix.Array[row_index] = ("red" if i % 2 else "blue",)
+		master.create_index(bspump.lookup.BitMapIndex, 'color', master.Matrix, id="color")
+
+		slave = bspump.lookup.MatrixLookup(self.App, matrix_id="SlaveMatrix", id="SlaveLookup")
+		slave.create_index(bspump.lookup.BitMapIndex, 'color', slave.Matrix, id="color")
+
+		data = master.serialize()
+		self.assertTrue(is_snapshot(data))
+		slave.deserialize(data)
+		self.assertEqual(slave.Matrix.get_row_index("3"), master.Matrix.get_row_index("3"))
+		self.assertEqual(slave.Indexes["color"].search("red"), master.Indexes["color"].search("red"))
+
+		# JSON of older versions
+		legacy = json.dumps({'Matrix': master.Matrix.serialize()}).encode('utf-8')
+		slave.deserialize(legacy)
+		self.assertEqual(slave.Matrix.get_row_index("5"), master.Matrix.get_row_index("5"))
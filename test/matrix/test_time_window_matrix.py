@@ -1,5 +1,7 @@
 import time
 
+import numpy as np
+
 import bspump
 import bspump.analyzer
 import bspump.unittest
@@ -25,18 +27,48 @@ class TestTimeWindowMatrix(bspump.unittest.TestCase):
 		matrix.Array[row_index, 1] = second_col
 		matrix.Array[row_index, 2] = third_col
 		num_columns = matrix.Array.shape[1]
+		array = matrix.Array
 		matrix.add_column()
 
 		self.assertEqual(matrix.TimeConfig.get_start(), start + matrix.Resolution)
 		self.assertEqual(matrix.TimeConfig.get_end(), end + matrix.Resolution)
 		self.assertEqual(matrix.WarmingUpCount.WUC[0], warming_up - 1)
 
-		self.assertEqual(matrix.Array[row_index, 0], second_col)
-		self.assertEqual(matrix.Array[row_index, 1], third_col)
-		self.assertEqual(matrix.Array[row_index, 2], 0)
+		# The oldest column is reused in place
+		self.assertIs(matrix.Array, array)
+		self.assertEqual(matrix.Head, 1)
+		ordered = matrix.Array[row_index, matrix.get_ordered_columns()]
+		self.assertEqual(ordered[0], second_col)
+		self.assertEqual(ordered[1], third_col)
+		self.assertTrue(np.isnan(ordered[2]))
 		self.assertEqual(matrix.Array.shape[1], num_columns)
 
 
+	def test_matrix_ring_buffer(self):
+		columns = 4
+		matrix = bspump.matrix.TimeWindowMatrix(app=self.App, start_time=1000, resolution=10, columns=columns, clock_driven=False)
+		row_index = matrix.add_row("abc")
+		for i in range(14):  # The matrix is full, closing a row does not flush it
+			matrix.add_row("row{}".format(i))
+		closed_index = matrix.add_row("closed")
+		matrix.close_row("closed")
+		self.assertIn(closed_index, matrix.ClosedRows)
+		closed_warming_up = matrix.WarmingUpCount.WUC[closed_index]
+
+		# Advance over more than the whole window, every new time slot gets its timestamp
+		for i in range(2 * columns + 1):
+			matrix.add_column()
+			column = matrix.get_column(matrix.Start - 5)
+			self.assertEqual(column, (i + columns) % columns)
+			matrix.Array[row_index, column] = i
+
+		self.assertEqual(matrix.Head, (2 * columns + 1) % columns)
+		self.assertEqual(matrix.Array[row_index, matrix.get_ordered_columns()].tolist(), [5, 6, 7, 8])
+		self.assertEqual(matrix.get_column(matrix.End + 5), matrix.Head)
+		self.assertEqual(matrix.WarmingUpCount.WUC[row_index], 0)
+		self.assertEqual(matrix.WarmingUpCount.WUC[closed_index], closed_warming_up)
+
+
 	def test_matrix_add_row(self):
 		matrix = bspump.matrix.TimeWindowMatrix(app=self.App, columns=3, clock_driven=False)
 		row_index = matrix.add_row("abc")
@@ -88,3 +120,51 @@ class TestTimeWindowMatrix(bspump.unittest.TestCase):
 		target_ts = matrix.TimeConfig.get_start() + 0.5 * matrix.Resolution
 		added = matrix.advance(target_ts)
 		self.assertGreater(added, 0)
+
+
+	def test_matrix_update_batch(self):
+		matrix = bspump.matrix.TimeWindowMatrix(app=self.App, start_time=1000, resolution=10, columns=4, clock_driven=False)
+		matrix.add_column()  # The head of the ring buffer is moved
+
+		# The window covers 980 - 1020
+		columns = matrix.get_columns([985, 995, 1019.5, 1020, 980, float('nan')])
+		self.assertEqual(columns.tolist(), [matrix.get_column(985), matrix.get_column(995), matrix.get_column(1019.5), -1, -1, -1])
+
+		stored = matrix.update_batch(["a", "b", "a", "a", "c"], [985, 995, 995, 1500, 900], [1, 2, 3, 4, 5])
+		self.assertEqual(stored, 3)
+		self.assertIsNone(matrix.get_row_index("c"))
+
+		a = matrix.get_row_index("a")
+		b = matrix.get_row_index("b")
+		self.assertEqual(matrix.Array[a, matrix.get_column(985)], 1)
+		self.assertEqual(matrix.Array[a, matrix.get_column(995)], 3)
+		self.assertEqual(matrix.Array[b, matrix.get_column(995)], 2)
+
+		# Values falling into the same cell are all accounted
+		matrix.update_batch(["a", "a", "b"], [985, 989, 995], 1, np.add)
+		self.assertEqual(matrix.Array[a, matrix.get_column(985)], 3)
+		self.assertEqual(matrix.Array[b, matrix.get_column(995)], 3)
+
+
+	def test_matrix_resolve_rows(self):
+		matrix = bspump.matrix.TimeWindowMatrix(app=self.App, columns=3, clock_driven=False)
+		existing = matrix.add_row("a")
+
+		changes = []
+
+		def on_change(message_type):  # PubSub keeps only a weak reference
+			changes.append(message_type)
+
+		matrix.PubSub.subscribe("Matrix changed!", on_change)
+
+		rows = matrix.resolve_rows(["a", "b", "c", "b", "a"])
+		self.assertEqual(rows.tolist(), [existing, matrix.get_row_index("b"), matrix.get_row_index("c"), rows[1], existing])
+		self.assertEqual(len(set(rows.tolist())), 3)
+		self.assertEqual(len(changes), 0)  # The notification is sent in the next iteration of the event loop
+		matrix.flush_changes()
+		self.assertEqual(len(changes), 1)
+		self.assertEqual(matrix.WarmingUpCount.WUC[rows[2]], 3)
+
+		matrix.resolve_rows(["a", "b"])
+		matrix.flush_changes()
+		self.assertEqual(len(changes), 1)
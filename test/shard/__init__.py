@@ -0,0 +1,2 @@
+from .test_worker import *
+from .test_supervisor import *
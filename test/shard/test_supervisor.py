@@ -0,0 +1,87 @@
+import asyncio
+import json
+import sys
+
+import asab
+
+import bspump.unittest
+import bspump.shard
+
+
+# Reports one run of the worker with its shard and exits, so the supervisor has to restart it
+WORKER = '''
+import json, os, sys
+tags = json.loads(sys.argv[1])
+tags.update(shard=os.environ["BSPUMP_SHARD_ID"], count=os.environ["BSPUMP_SHARD_COUNT"])
+report = [{"name": "test.worker", "tags": tags, "type": "Counter", "reset": True, "values": {"runs": 1}}]
+os.write(int(os.environ["BSPUMP_SHARD_METRICS_FD"]), json.dumps(report).encode("utf-8") + b"\\n")
+sys.exit(1)
+'''
+
+
+class WorkerSupervisor(bspump.shard.ShardSupervisor):
+
+	def _get_argv(self):
+		return [sys.executable, "-c", WORKER, json.dumps(self.MetricsService.Tags)]
+
+
+class TestShardSupervisor(bspump.unittest.TestCase):
+
+	def setUp(self) -> None:
+		super().setUp()
+		self.MetricsService = self.App.get_service("asab.MetricsService")
+
+
+	def get_actuals(self, name):
+		for metric, (metric_name, tags) in self.MetricsService.MetricToNameAndTags.items():
+			if metric_name == name:
+				return tags, metric.Storage["fieldset"][0]["actuals"]
+		return None, None
+
+
+	def test_apply_report(self):
+		supervisor = bspump.shard.ShardSupervisor(self.App, 2, service_name="bspump.TestShardSupervisor")
+		counter = self.MetricsService.create_counter("test.shard", tags={"pipeline": "P"}, init_values={"event.in": 0})
+
+		tags = dict(self.MetricsService.Tags, pipeline="P")
+		supervisor.apply_report(0, [
+			{"name": "test.shard", "tags": tags, "type": "Counter", "reset": True, "values": {"event.in": 5}},
+			{"name": "test.dynamic", "tags": tags, "type": "EPSCounter", "reset": True, "values": {"eps": 3}},
+		])
+		supervisor.apply_report(1, [
+			{"name": "test.shard", "tags": tags, "type": "Counter", "reset": True, "values": {"event.in": 2}},
+			{"name": "test.dynamic", "tags": tags, "type": "EPSCounter", "reset": True, "values": {"eps": 1}},
+		])
+
+		self.assertEqual({"event.in": 7}, counter.Storage["fieldset"][0]["actuals"])
+
+		# The counter created by a worker is created once, with the same tags
+		dynamic = [metric for metric, (name, _) in self.MetricsService.MetricToNameAndTags.items() if name == "test.dynamic"]
+		self.assertEqual(1, len(dynamic))
+		self.assertIsInstance(dynamic[0], asab.metrics.metrics.EPSCounter)
+		self.assertEqual(tags, self.MetricsService.MetricToNameAndTags[dynamic[0]][1])
+		self.assertEqual({"eps": 4}, dynamic[0].Storage["fieldset"][0]["actuals"])
+
+
+	def test_restart_worker(self):
+		supervisor = WorkerSupervisor(self.App, 1, service_name="bspump.TestShardSupervisor")
+		supervisor.RestartDelay = 0.01
+
+		async def run():
+			await supervisor.initialize(self.App)
+			try:
+				for _ in range(1000):
+					tags, actuals = self.get_actuals("test.worker")
+					if actuals is not None and actuals["runs"] >= 2:
+						break
+					await asyncio.sleep(0.01)
+			finally:
+				await supervisor.finalize(self.App)
+
+		self.App.Loop.run_until_complete(run())
+
+		tags, actuals = self.get_actuals("test.worker")
+		self.assertGreaterEqual(actuals["runs"], 2)
+		self.assertEqual("0", tags["shard"])
+		self.assertEqual("1", tags["count"])
+		self.assertEqual([], [task for task in supervisor.WorkerTasks if not task.done()])
@@ -0,0 +1,33 @@
+import json
+import os
+
+import bspump.unittest
+import bspump.shard
+
+
+class TestShardWorker(bspump.unittest.TestCase):
+
+	def test_worker_report(self):
+		read_fd, write_fd = os.pipe()
+		worker = bspump.shard.ShardWorker(self.App, write_fd, service_name="bspump.TestShardWorker")
+
+		metrics_service = self.App.get_service("asab.MetricsService")
+		counter = metrics_service.create_counter("test.shard", tags={"pipeline": "P"}, init_values={"event.in": 0})
+
+		counter.add("event.in", 5)
+		worker.report(flush=False)
+		counter.add("event.in", 2)
+		worker.report(flush=True)
+		counter.add("event.in", 1)  # Not reported
+
+		os.close(write_fd)
+		with os.fdopen(read_fd, "rb") as f:
+			reports = [json.loads(line) for line in f]
+
+		increments = [
+			item["values"]
+			for report in reports
+			for item in report
+			if item["name"] == "test.shard"
+		]
+		self.assertEqual([{"event.in": 5}, {"event.in": 2}], increments)
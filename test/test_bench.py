@@ -0,0 +1,90 @@
+import unittest
+
+import asab
+
+import bspump.bench
+import bspump.common
+import bspump.unittest
+
+
+def generate_events():
+	return [{"value": i} for i in range(10)]
+
+
+class BenchRouterSink(bspump.common.RouterSink):
+
+	def process(self, context, event):
+		self.route(context, event, "DownstreamPipeline.*InternalSource")
+
+
+DEFINITION = {
+	"bench": {
+		"events": 500,
+		"warmup": 50,
+	},
+	"pipelines": [
+		{
+			"id": "DownstreamPipeline",
+			"sources": [{"module": "bspump.common", "class": "InternalSource"}],
+			"sink": {"module": "bspump.common", "class": "NullSink"},
+		},
+		{
+			"id": "EntryPipeline",
+			"sources": [],
+			"processors": [
+				{"module": "bspump.common", "class": "FlattenDictProcessor"},
+			],
+			"sink": {"module": __name__, "class": "BenchRouterSink"},
+		},
+	]
+}
+
+
+class TestBenchmarkRunner(bspump.unittest.TestCase):
+
+	def test_run(self):
+		runner = bspump.bench.BenchmarkRunner(DEFINITION, pipeline="EntryPipeline", generator=generate_events)
+		results = runner.run()
+
+		self.assertEqual("EntryPipeline", results["pipeline"])
+		self.assertEqual(500, results["events"])
+		self.assertGreater(results["eps"], 0)
+		self.assertEqual(500, results["latency"]["count"])
+
+		processors = results["pipelines"]["EntryPipeline"]["processors"]
+		self.assertEqual(500, processors["FlattenDictProcessor"]["count"])
+		self.assertGreater(processors["FlattenDictProcessor"]["time"], 0)
+
+		# The profiling is configured for pipelines of the benchmark only
+		self.assertNotIn("pipeline:EntryPipeline", asab.Config)
+
+		# Routed events are processed before the measurement ends
+		downstream = results["pipelines"]["DownstreamPipeline"]["processors"]
+		self.assertEqual(500, downstream["NullSink"]["count"])
+
+	def test_invalid_definition(self):
+		with self.assertRaises(ValueError):
+			bspump.bench.BenchmarkRunner(DEFINITION, pipeline="UnknownPipeline")
+		with self.assertRaises(ValueError):
+			bspump.bench.BenchmarkRunner(DEFINITION, sample="sample.txt", generator=generate_events)
+		with self.assertRaises(ValueError):
+			bspump.bench.BenchmarkRunner(DEFINITION)
+
+
+class TestBenchmarkCompare(unittest.TestCase):
+
+	def test_compare(self):
+		baseline = {
+			"eps": 1000.0, "events": 100, "cpu_time": 1.0, "latency": {"p50": 1.0, "p99": 2.0},
+			"pipelines": {"P": {"processors": {"A": {"mean": 1.0}}}},
+		}
+		results = {
+			"eps": 950.0, "events": 100, "cpu_time": 1.0, "latency": {"p50": 1.0, "p99": 3.0},
+			"pipelines": {"P": {"processors": {"A": {"mean": 1.5}, "B": {"mean": 1.0}}}},
+		}
+
+		regressions = bspump.bench.compare(results, baseline, tolerance=0.1)
+		self.assertEqual(["latency.p99", "P.A.mean"], [regression["metric"] for regression in regressions])
+		self.assertAlmostEqual(0.5, regressions[0]["change"])
+
+		self.assertEqual([], bspump.bench.compare(baseline, baseline))
@@ -0,0 +1,56 @@
+import json
+import os
+import tempfile
+import unittest.mock
+
+import bspump.common
+import bspump.unittest
+
+
+class TestProcessorBenchmarkCase(bspump.unittest.ProcessorBenchmarkCase):
+
+	Rounds = 2
+	MinRoundTime = 0.001
+
+	def test_benchmark(self):
+		self.set_up_processor(bspump.common.FlattenDictProcessor)
+		result = self.benchmark([(None, {"a": {"b": 1}})])
+
+		self.assertGreater(result["best"], 0)
+		self.assertLessEqual(result["best"], result["median"])
+		self.assertGreater(result["runs"], 0)
+
+	def test_benchmark_batch(self):
+		self.set_up_processor(bspump.common.FlattenDictProcessor)
+		result = self.benchmark_batch([(None, {"a": {"b": 1}})], batch_size=10)
+
+		self.assertGreater(result["best"], 0)
+		self.assertEqual(result["runs"] % 10, 0)
+
+	def test_fresh_events(self):
+		events = []
+		self.benchmark_callable(lambda context, event: events.append(event), [(None, {"a": 1})], fresh=True)
+		self.assertGreater(len(events), 1)
+		self.assertIsNot(events[0], events[1])
+
+	def test_tracking(self):
+		self.set_up_processor(bspump.common.NullSink)
+		with tempfile.TemporaryDirectory() as directory:
+			results_path = os.path.join(directory, "results.json")
+			baseline_path = os.path.join(directory, "baseline.json")
+			with open(baseline_path, "w") as f:
+				json.dump({"{}.fast".format(self.id()): {"best": 1e-12}}, f)
+
+			with unittest.mock.patch.dict(os.environ, {
+				"BSPUMP_BENCHMARK_RESULTS": results_path,
+				"BSPUMP_BENCHMARK_BASELINE": baseline_path,
+			}):
+				self.benchmark([(None, {})], name="slow")
+				with self.assertRaises(AssertionError):
+					self.benchmark([(None, {})], name="fast")
+
+			bspump.unittest.ProcessorBenchmarkCase._Baseline = None
+
+			with open(results_path) as f:
+				results = json.load(f)
+			self.assertEqual({"{}.slow".format(self.id()), "{}.fast".format(self.id())}, set(results.keys()))
@@ -1,7 +1,9 @@
+import importlib
 import inspect
-import sys
+import pkgutil
 
 import asab
+import bspump
 from bspump import unittest
 
 
@@ -9,21 +11,25 @@ class TestConfigDefaults(unittest.TestCase):
 
 	def test_default_value_is_not_none(self):
 		to_inspect = []
-		# For BSPump modules
-		for _, module in inspect.getmembers(sys.modules['bspump'], inspect.ismodule):
-			for _, klass in inspect.getmembers(module, inspect.isclass):
-				if issubclass(klass, asab.ConfigObject):
+		# For classes of all BSPump modules, imported explicitly, because packages export their components lazily
+		for module_info in pkgutil.walk_packages(bspump.__path__, prefix="bspump.", onerror=lambda name: None):
+			if module_info.name.endswith(".__main__"):
+				continue  # Runs the application
+
+			try:
+				module = importlib.import_module(module_info.name)
+			except ImportError as e:
+				if e.name is None or e.name == "bspump" or e.name.startswith("bspump."):
+					raise
+				continue  # Optional dependency of the module is not installed
+
+			for klass in list(vars(module).values()):
+				if inspect.isclass(klass) and issubclass(klass, asab.ConfigObject):
 					to_inspect.append(klass)
 
-		# For BSPump classes
-		for _, klass in inspect.getmembers(sys.modules['bspump'], inspect.isclass):
-			if issubclass(klass, asab.ConfigObject):
-				to_inspect.append(klass)
-
 		# Make unique
 		to_inspect = list(set(to_inspect))
 
 		for klass in to_inspect:
 			for key, value in klass.ConfigDefaults.items():
 				self.assertIsNotNone(value, f"None found for key {key} in {klass}")
-
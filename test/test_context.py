@@ -0,0 +1,47 @@
+import copy
+import unittest
+
+from bspump import Context
+
+
+class TestContext(unittest.TestCase):
+
+	def test_context_layers(self):
+		pipeline_context = {"a": 1}
+		source_context = {"a": 0, "b": 2}
+		context = Context(pipeline_context, source_context)
+
+		self.assertEqual(1, context["a"])
+		self.assertEqual(2, context.get("b"))
+		self.assertIsNone(context.get("c"))
+		self.assertEqual({"a": 1, "b": 2}, context)
+		self.assertEqual(2, len(context))
+
+	def test_context_copy_on_write(self):
+		source_context = {"a": 1, "b": 2}
+		context = Context(source_context)
+
+		context["a"] = 10
+		context["c"] = 3
+		del context["b"]
+
+		self.assertEqual({"a": 10, "c": 3}, context)
+		self.assertNotIn("b", context)
+		self.assertEqual({"a": 1, "b": 2}, source_context)
+
+		with self.assertRaises(KeyError):
+			del context["b"]
+
+		context["b"] = 20
+		self.assertEqual(20, context["b"])
+
+	def test_context_copy(self):
+		context = Context({"a": [1]})
+		context["b"] = 2
+
+		self.assertEqual({"a": [1], "b": 2}, context.copy())
+		self.assertIsInstance(context.copy(), dict)
+
+		deep = copy.deepcopy(context)
+		deep["a"].append(2)
+		self.assertEqual([1], context["a"])
@@ -0,0 +1,47 @@
+import copy
+import json
+import pickle
+import unittest
+
+from bspump import Context, FrozenDict, freeze
+
+
+class TestFrozen(unittest.TestCase):
+
+	def test_freeze(self):
+		event = freeze({"a": 1, "b": [1, {"c": 2}], "d": {3}})
+
+		self.assertIsInstance(event, FrozenDict)
+		self.assertEqual((1, {"c": 2}), event["b"])
+		self.assertIsInstance(event["b"][1], FrozenDict)
+		self.assertEqual(frozenset({3}), event["d"])
+		self.assertIs(event, freeze(event))
+		self.assertEqual("abc", freeze("abc"))
+
+	def test_read_only(self):
+		event = freeze({"a": 1})
+
+		with self.assertRaises(TypeError):
+			event["a"] = 2
+		with self.assertRaises(TypeError):
+			del event["a"]
+		with self.assertRaises(TypeError):
+			event.update({"b": 2})
+		with self.assertRaises(TypeError):
+			event.pop("a")
+
+		self.assertEqual({"a": 1}, event)
+
+	def test_copy(self):
+		event = freeze({"a": [1, 2]})
+
+		self.assertIs(event, copy.copy(event))
+		self.assertIs(event, copy.deepcopy(event))
+		self.assertEqual(event, pickle.loads(pickle.dumps(event)))
+		self.assertEqual('{"a": [1, 2]}', json.dumps(event))
+
+		# Copy-on-write view of a frozen event
+		view = Context(event)
+		view["a"] = 3
+		self.assertEqual({"a": 3}, view)
+		self.assertEqual((1, 2), event["a"])
@@ -0,0 +1,45 @@
+import unittest
+
+from bspump import LatencyHistogram
+
+
+class TestLatencyHistogram(unittest.TestCase):
+
+	def test_percentiles(self):
+		histogram = LatencyHistogram()
+		for i in range(1, 1001):
+			histogram.record(i / 1000.0)  # 1 ms - 1 s
+
+		self.assertEqual(1000, histogram.Count)
+		self.assertEqual(1.0, histogram.Max)
+		self.assertAlmostEqual(0.5005, histogram.summary()["mean"])
+
+		# The relative error is bounded by the number of sub-buckets
+		for percent in (50, 90, 99):
+			expected = percent / 100.0
+			value = histogram.percentile(percent)
+			self.assertGreaterEqual(value, expected)
+			self.assertLessEqual(value, expected * (1 + 1 / LatencyHistogram.SubBuckets))
+
+		self.assertEqual(1.0, histogram.percentile(100))
+
+	def test_weight_and_range(self):
+		histogram = LatencyHistogram()
+		histogram.record(0.0)
+		histogram.record(1e-12)
+		histogram.record(0.001, weight=98)
+		histogram.record(1e6)
+
+		self.assertEqual(101, histogram.Count)
+		self.assertLessEqual(histogram.percentile(1), 1e-7)
+		self.assertAlmostEqual(0.001, histogram.percentile(50), delta=0.001 / LatencyHistogram.SubBuckets)
+		self.assertEqual(1e6, histogram.percentile(100))
+
+	def test_reset(self):
+		histogram = LatencyHistogram()
+		histogram.record(0.5)
+		histogram.reset()
+
+		self.assertEqual(0, histogram.Count)
+		self.assertEqual(0.0, histogram.percentile(99))
+		self.assertEqual(0, sum(histogram.Counts))
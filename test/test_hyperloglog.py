@@ -0,0 +1,79 @@
+import unittest
+import zlib
+
+import numpy as np
+
+from bspump.aggregation import HyperLogLog
+
+
+class TestHyperLogLog(unittest.TestCase):
+
+	def test_add_many(self):
+		for num_bits in (32, 64):
+			hll = HyperLogLog(num_bits=num_bits)
+			values = ["key-{}".format(i) for i in range(5000)]
+
+			registers = np.zeros(hll.m, dtype='u1')
+			hll.add_many(values + values[:1000], registers)
+			expected = np.zeros(hll.m, dtype='i2')
+			for value in values:
+				hll.add(value, expected)
+			np.testing.assert_array_equal(registers, expected)
+
+		self.assertLess(hll.compute_error(5000, hll.count(registers)), 5)
+
+		hll = HyperLogLog(num_bits=64)
+		registers = np.zeros(hll.m, dtype='u1')
+		hll.add_many(np.arange(100000), registers)
+		self.assertLess(hll.compute_error(100000, hll.count(registers)), 10)
+		self.assertEqual(hll.hash_data(7), hll.hash_many(np.arange(10))[7])
+		self.assertEqual(hll.hash_data("čeština"), hll.hash_many(["čeština", "a"])[0])
+		self.assertEqual(hll.hash_data(b"abc"), hll.hash_many([b"abc", b"abcdefghijk"])[0])
+
+
+	def test_legacy_default(self):
+		# Registers of previous versions are filled by the CRC32 hash
+		hll = HyperLogLog()
+		self.assertEqual(32, hll.num_bits)
+		self.assertEqual(zlib.crc32(b"key"), hll.hash_data("key"))
+
+		with self.assertRaises(ValueError):
+			HyperLogLog(num_bits=64).deserialize(hll.serialize(np.zeros(hll.m, dtype='u1')))
+
+
+	def test_legacy_rho(self):
+		hll = HyperLogLog(num_bits=32)
+		for value in (0, 1, 2, 3, 255, 2 ** 31, 2 ** 32 - 1):
+			# The loop of previous versions
+			x, rho = value, 32
+			while x > 1:
+				x = x >> 1
+				rho -= 1
+
+			self.assertEqual(hll._compute_rho(value), rho)
+			self.assertEqual(hll._compute_rhos(np.array([value], dtype='u8'))[0], rho)
+
+
+	def test_merge_and_serialize(self):
+		hll = HyperLogLog(num_bits=64)
+		shards = [np.zeros(hll.m, dtype='u1') for _ in range(3)]
+		for i, shard in enumerate(shards):
+			hll.add_many(np.arange(i * 10000, (i + 2) * 10000), shard)
+
+		union = np.zeros(hll.m, dtype='u1')
+		hll.add_many(np.arange(40000), union)
+		merged = hll.merge(np.zeros(hll.m, dtype='i2'), *shards)
+		np.testing.assert_array_equal(merged, union)
+
+		restored = hll.deserialize(hll.serialize(merged))
+		np.testing.assert_array_equal(restored, union)
+		row = np.zeros(hll.m, dtype='i2')
+		self.assertIs(hll.deserialize(hll.serialize(merged), row), row)
+		self.assertEqual(hll.count(row), hll.count(union))
+
+		with self.assertRaises(ValueError):
+			HyperLogLog(m=1024, num_bits=64).deserialize(hll.serialize(merged))
+		with self.assertRaises(ValueError):
+			hll.deserialize(b"not a sketch")
+		with self.assertRaises(ValueError):
+			hll.merge(union, np.zeros(16))
@@ -0,0 +1,32 @@
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+import bspump
+import bspump.common
+import bspump.matrix
+
+
+class TestLazyImport(unittest.TestCase):
+
+	def test_exports(self):
+		for package in (bspump, bspump.common, bspump.matrix):
+			for name in package.__all__:
+				self.assertTrue(hasattr(package, name), "{}.{}".format(package.__name__, name))
+			self.assertLessEqual(set(package.__all__) - {"__version__", "__build__"}, set(dir(package)))
+
+		self.assertIs(bspump.common.InternalSource, bspump.common.routing.InternalSource)
+
+		with self.assertRaises(AttributeError):
+			bspump.common.NoSuchProcessor
+
+	def test_no_heavy_dependencies(self):
+		probe = "import sys, json, bspump, bspump.common, bspump.matrix, bspump.analyzer; print(json.dumps(sorted(sys.modules)))"
+		root = os.path.dirname(os.path.dirname(os.path.abspath(bspump.__file__)))
+		env = dict(os.environ, PYTHONPATH=root)
+		modules = set(json.loads(subprocess.check_output([sys.executable, "-c", probe], env=env)))
+
+		for module in ("numpy", "cysimdjson", "aiohttp", "yaml"):
+			self.assertNotIn(module, modules)
@@ -0,0 +1,82 @@
+import bspump.unittest
+from bspump import Processor, Pipeline
+from bspump.trigger import PubSubTrigger
+from bspump.unittest import UnitTestSource, UnitTestSink
+
+
+class UnitTestBatchSource(UnitTestSource):
+
+	async def cycle(self, *args, **kwags):
+		for context, events in self.Input:
+			await self.process_batch(events, context=context)
+
+
+class UpperProcessor(Processor):
+
+	def process(self, context, event):
+		if event == "error":
+			raise ValueError("Error event")
+		return event.upper()
+
+
+class DropOddBatchProcessor(Processor):
+
+	def __init__(self, app, pipeline, id=None, config=None):
+		super().__init__(app, pipeline, id=id, config=config)
+		self.Batches = []
+
+	def process_batch(self, context, events):
+		self.Batches.append(len(events))
+		return events[::2]
+
+
+class BatchPipeline(Pipeline):
+
+	def __init__(self, app, id=None, config=None):
+		super().__init__(app, id, config)
+		self.PubSub.subscribe("bspump.pipeline.cycle_end!", self._on_finished)
+		self.Source = UnitTestBatchSource(app, self).on(
+			PubSubTrigger(app, "Application.run!", app.PubSub)
+		)
+		self.UpperProcessor = UpperProcessor(app, self)
+		self.DropProcessor = DropOddBatchProcessor(app, self)
+		self.Sink = UnitTestSink(app, self)
+		self.build(
+			self.Source,
+			self.UpperProcessor,
+			self.DropProcessor,
+			self.Sink
+		)
+
+	def handle_error(self, exception, context, event):
+		return True
+
+	def _on_finished(self, event_name, pipeline):
+		self.App.stop()
+
+
+class TestPipelineBatch(bspump.unittest.TestCase):
+
+	def test_process_batch(self):
+		svc = self.App.get_service("bspump.PumpService")
+		pipeline = BatchPipeline(self.App)
+		pipeline.Source.Input = [
+			({"batch": 1}, ["a", "b", "c", "d"]),
+			({"batch": 2}, ["e", "error", "f"]),
+		]
+		svc.add_pipeline(pipeline)
+		self.App.run()
+
+		self.assertEqual(
+			[({"batch": 1}, "A"), ({"batch": 1}, "C"), ({"batch": 2}, "E")],
+			pipeline.Sink.Output
+		)
+
+		# The erroneous event is discarded by the non batch-aware processor only
+		self.assertEqual([4, 2], pipeline.DropProcessor.Batches)
+		self.assertFalse(pipeline.is_error())
+
+		values = pipeline.MetricsCounter.Storage["fieldset"][0]["values"]
+		self.assertEqual(7, values["event.in"])
+		self.assertEqual(3, values["event.out"])
+		self.assertEqual(4, values["event.drop"])
@@ -0,0 +1,50 @@
+import bspump.unittest
+import bspump.common
+from bspump import Processor, Pipeline
+
+
+class AppendProcessor(Processor):
+
+	def __init__(self, app, pipeline, suffix, id=None, config=None):
+		super().__init__(app, pipeline, id=id, config=config)
+		self.Suffix = suffix
+
+	def process(self, context, event):
+		return event + self.Suffix
+
+
+class CollectSink(bspump.Sink):
+
+	def __init__(self, app, pipeline, id=None, config=None):
+		super().__init__(app, pipeline, id=id, config=config)
+		self.Output = []
+
+	def process(self, context, event):
+		self.Output.append(event)
+
+
+class TestPipelineCompile(bspump.unittest.TestCase):
+
+	def test_compile_on_change(self):
+		pipeline = Pipeline(self.App, "CompilePipeline")
+		sink = CollectSink(self.App, pipeline)
+		pipeline.build(
+			bspump.common.IteratorSource(self.App, pipeline, iterator=iter(())),
+			AppendProcessor(self.App, pipeline, "a", id="A"),
+			sink
+		)
+
+		pipeline.inject(None, "", 0)
+		pipeline.insert_after("A", AppendProcessor(self.App, pipeline, "b", id="B"))
+		pipeline.inject(None, "", 0)
+		pipeline.insert_before("A", AppendProcessor(self.App, pipeline, "c", id="C"))
+		pipeline.inject(None, "", 0)
+		gauge = pipeline._profiler_latency_gauges["A"]
+		pipeline.remove_processor("A")
+		pipeline.inject(None, "", 0)
+
+		self.assertEqual(["a", "ab", "cab", "cb"], sink.Output)
+		self.assertNotIn("A", pipeline.ProfilerCounter)
+		self.assertNotIn("A", pipeline._profiler_latency_gauges)
+		metrics_service = self.App.get_service("asab.MetricsService")
+		self.assertNotIn(gauge, metrics_service.Metrics)
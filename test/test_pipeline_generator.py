@@ -0,0 +1,71 @@
+import asyncio
+
+import bspump.unittest
+from bspump import Generator, Pipeline
+from bspump.trigger import PubSubTrigger
+from bspump.unittest import UnitTestSource, UnitTestSink
+
+
+class SleepyGenerator(Generator):
+
+	async def generate(self, context, event, depth):
+		await asyncio.sleep(0.001)
+		if event == "error":
+			raise ValueError("Error event")
+		self.Pipeline.inject(context, event.upper(), depth)
+
+
+class GeneratorPipeline(Pipeline):
+
+	def __init__(self, app, generator_config=None):
+		super().__init__(app, "GeneratorPipeline")
+		self.PubSub.subscribe("bspump.pipeline.cycle_end!", self._on_finished)
+		self.Source = UnitTestSource(app, self).on(
+			PubSubTrigger(app, "Application.run!", app.PubSub)
+		)
+		self.Generator = SleepyGenerator(app, self, config=generator_config)
+		self.Sink = UnitTestSink(app, self)
+		self.build(self.Source, self.Generator, self.Sink)
+
+	def handle_error(self, exception, context, event):
+		return True
+
+	def _on_finished(self, event_name, pipeline):
+		self.App.stop()
+
+
+class TestPipelineGenerator(bspump.unittest.TestCase):
+
+	def run_pipeline(self, generator_config=None):
+		svc = self.App.get_service("bspump.PumpService")
+		pipeline = GeneratorPipeline(self.App, generator_config)
+		pipeline.Source.Input = [({}, event) for event in ("a", "b", "error", "c", "d")]
+		svc.add_pipeline(pipeline)
+		self.App.run()
+		return pipeline
+
+	def test_task_per_event(self):
+		pipeline = self.run_pipeline()
+
+		self.assertEqual(["A", "B", "C", "D"], sorted(event for context, event in pipeline.Sink.Output))
+		self.assertEqual(0, pipeline.Generator.InFlight)
+		self.assertEqual(0, len(pipeline.AsyncFutures))
+
+	def test_workers(self):
+		pipeline = self.run_pipeline({"workers": 2, "concurrency": 2})
+
+		# The failed event does not stop the worker
+		self.assertEqual(["A", "B", "C", "D"], sorted(event for context, event in pipeline.Sink.Output))
+		self.assertEqual(1, pipeline.MetricsCounter.Storage["fieldset"][0]["values"]["warning"])
+		self.assertEqual(0, pipeline.Generator.InFlight)
+		self.assertEqual(0, len(pipeline.AsyncFutures))
+		self.assertNotIn(pipeline.Generator, pipeline._throttles)
+
+	def test_metrics(self):
+		pipeline = self.run_pipeline({"workers": 1})
+		self.App.PubSub.publish("Metrics.flush!")
+
+		values = pipeline.Generator.MetricsGauge.Storage["fieldset"][0]["values"]
+		self.assertEqual(0, values["inflight"])
+		self.assertGreaterEqual(values["inflight.peak"], 1)
+		self.assertGreaterEqual(values["wait.max"], 0.0)
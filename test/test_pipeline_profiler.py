@@ -0,0 +1,72 @@
+import bspump.unittest
+from bspump import Processor, Pipeline
+from bspump.trigger import PubSubTrigger
+from bspump.unittest import UnitTestSource, UnitTestSink
+
+
+class PassProcessor(Processor):
+
+	def process(self, context, event):
+		return event
+
+
+class ProfiledPipeline(Pipeline):
+
+	def __init__(self, app, id=None, config=None):
+		super().__init__(app, id, config)
+		self.PubSub.subscribe("bspump.pipeline.cycle_end!", self._on_finished)
+		self.Source = UnitTestSource(app, self).on(
+			PubSubTrigger(app, "Application.run!", app.PubSub)
+		)
+		self.Processor = PassProcessor(app, self)
+		self.Sink = UnitTestSink(app, self)
+		self.build(
+			self.Source,
+			self.Processor,
+			self.Sink
+		)
+
+	def _on_finished(self, event_name, pipeline):
+		self.App.stop()
+
+
+class TestPipelineProfiler(bspump.unittest.TestCase):
+
+	def _run(self, profiler, count, latency_sampling=50):
+		svc = self.App.get_service("bspump.PumpService")
+		pipeline = ProfiledPipeline(self.App, config={"profiler": profiler, "latency_sampling": latency_sampling})
+		pipeline.Source.Input = [(None, i) for i in range(count)]
+		svc.add_pipeline(pipeline)
+		self.App.run()
+
+		self.assertEqual(count, len(pipeline.Sink.Output))
+		return pipeline.ProfilerCounter["PassProcessor"].Storage["fieldset"][0]["values"]
+
+	def test_profiler_full(self):
+		values = self._run("full", 7)
+		self.assertEqual(7, values["run"])
+
+	def test_profiler_sampled(self):
+		values = self._run("sampled:3", 7)
+		# Every 3rd event is profiled and counted as 3 events
+		self.assertEqual(6, values["run"])
+		self.assertGreater(values["duration"], 0.0)
+
+	def test_profiler_off(self):
+		values = self._run("off", 7)
+		self.assertEqual(0, values["run"])
+		self.assertEqual(0.0, values["duration"])
+
+	def test_latency(self):
+		self._run("full", 7, latency_sampling=1)
+		pipeline = self.App.get_service("bspump.PumpService").locate("ProfiledPipeline")
+
+		# The histograms are reported and reset on the metrics flush when the application exits
+		for gauge in (pipeline.MetricsLatencyGauge, pipeline._profiler_latency_gauges["PassProcessor"]):
+			values = gauge.Storage["fieldset"][0]["values"]
+			self.assertGreater(values["p50"], 0.0)
+			self.assertLessEqual(values["p50"], values["p99"])
+			self.assertLessEqual(values["p99"], values["max"])
+
+		self.assertEqual(0, pipeline.LatencyHistogram.Count)
+		self.assertIn("PassProcessor", pipeline.rest_get()["Latency"]["Processors"])
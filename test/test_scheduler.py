@@ -0,0 +1,62 @@
+import asab
+
+import bspump.random
+import bspump.unittest
+from bspump import Pipeline
+
+
+class TestScheduler(bspump.unittest.TestCase):
+
+	def test_budget_adapts_to_lag(self):
+		scheduler = self.App.get_service("bspump.Scheduler")
+		self.assertEqual(scheduler.MaxTimeBudget, scheduler.TimeBudget)
+
+		# Timer executed 1 second late
+		scheduler._on_probe(self.App.Loop.time() - 1.0)
+		self.assertGreaterEqual(scheduler.Lag, 1.0)
+		self.assertEqual(scheduler.MaxTimeBudget / 2, scheduler.TimeBudget)
+
+		for _ in range(20):
+			scheduler._on_probe(self.App.Loop.time() - 1.0)
+		self.assertEqual(scheduler.MinTimeBudget, scheduler.TimeBudget)
+
+		# The loop keeps up again
+		for _ in range(20):
+			scheduler._on_probe(self.App.Loop.time())
+		self.assertEqual(scheduler.MaxTimeBudget, scheduler.TimeBudget)
+
+		scheduler._probe_handle.cancel()
+
+	def test_pipeline_yields(self):
+		scheduler = self.App.get_service("bspump.Scheduler")
+		pipeline = Pipeline(self.App, "SchedulerPipeline")
+
+		async def process():
+			# The first event starts a time slice, the next ones fit in it
+			for _ in range(10):
+				await pipeline.chillout()
+
+			# Exhausted time budget
+			pipeline._slice_deadline = 0.0
+			await pipeline.chillout()
+
+		self.App.Loop.run_until_complete(process())
+		self.assertEqual(2, scheduler._yields)
+
+	def test_default_scheduler(self):
+		# An application without the scheduler, e.g. other than BSPumpApplication
+		del self.App.Services["bspump.Scheduler"]
+
+		pipeline = Pipeline(self.App, "DefaultSchedulerPipeline")
+		self.assertIsNotNone(pipeline.Scheduler)
+		self.assertIs(pipeline.Scheduler, self.App.get_service("bspump.Scheduler"))
+		self.assertIs(pipeline.Scheduler, Pipeline(self.App, "OtherPipeline").Scheduler)
+
+		self.App.Loop.run_until_complete(pipeline.chillout())
+		self.assertEqual(1, pipeline.Scheduler._yields)
+
+	def test_obsolete_idle_options(self):
+		pipeline = Pipeline(self.App, "ObsoletePipeline")
+		with self.assertLogs(asab.LogObsolete, level="WARNING") as logs:
+			bspump.random.RandomSource(self.App, pipeline, config={"events_till_idle": 100})
+		self.assertIn("events_till_idle", logs.output[0])